@@ -0,0 +1,232 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+Middleware stack benchmark for the MCP endpoint.
+
+Measures the latency of MCP `tools/list` and `tools/call` requests in-process (ASGI
+client, no network) through:
+- the bare MCP app mounted at /pixelle (baseline)
+- each middleware of the Pixelle app wrapped around the baseline on its own
+- the full Pixelle app, with and without the lean MCP stack (`MCP_LEAN_STACK`)
+
+Usage:
+    python benchmarks/middleware_bench.py
+    python benchmarks/middleware_bench.py --save-baseline bench.json
+    python benchmarks/middleware_bench.py --baseline bench.json --threshold 0.25
+    python benchmarks/middleware_bench.py --max-overhead-us 500
+
+Exits with status 1 if a regression check fails.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Mount
+
+MCP_URL = "/pixelle/mcp"
+MCP_HEADERS = {
+    "content-type": "application/json",
+    "accept": "application/json, text/event-stream",
+}
+BASELINE_STACK = "mcp (baseline)"
+FULL_STACK = "full app (lean mcp)"
+
+
+class MCPBenchClient:
+    """Minimal streamable-HTTP MCP client over an in-process ASGI transport"""
+
+    def __init__(self, app):
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+        self.headers = dict(MCP_HEADERS)
+        self._next_id = 0
+
+    async def __aenter__(self):
+        await self.request("initialize", {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {},
+            "clientInfo": {"name": "pixelle-bench", "version": "1.0"},
+        })
+        await self.client.post(MCP_URL, headers=self.headers,
+                               json={"jsonrpc": "2.0", "method": "notifications/initialized"})
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+
+    async def request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        self._next_id += 1
+        response = await self.client.post(MCP_URL, headers=self.headers, json={
+            "jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params,
+        })
+        response.raise_for_status()
+        session_id = response.headers.get("mcp-session-id")
+        if session_id:
+            self.headers["mcp-session-id"] = session_id
+        return self._parse(response)
+
+    def _parse(self, response: httpx.Response) -> Dict[str, Any]:
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            for line in response.text.splitlines():
+                if line.startswith("data:"):
+                    return json.loads(line[5:])
+            raise RuntimeError("Empty event stream response")
+        return response.json()
+
+
+def build_stacks(main) -> List[Tuple[str, Any]]:
+    """Build the ASGI apps to benchmark, all sharing the MCP app of `pixelle.main`"""
+    from pixelle.middleware import (
+        AppJsMiddleware,
+        HTMLCDNReplaceMiddleware,
+        MCPFastPathMiddleware,
+        StaticCacheMiddleware,
+    )
+
+    def mounted():
+        return Starlette(routes=[Mount("/pixelle", app=main.mcp_app)])
+
+    stacks = [(BASELINE_STACK, mounted())]
+    stacks.append(("+ CORSMiddleware", CORSMiddleware(
+        mounted(), allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])))
+    stacks.append(("+ HTMLCDNReplaceMiddleware", HTMLCDNReplaceMiddleware(mounted())))
+    stacks.append(("+ AppJsMiddleware", AppJsMiddleware(mounted())))
+    stacks.append(("+ StaticCacheMiddleware", StaticCacheMiddleware(
+        mounted(), static_paths=['/assets/', '/static/', '/_next/static/'], max_age=31536000, compress=False)))
+    for middleware in main.chainlit_app.user_middleware:
+        stacks.append((f"+ {middleware.cls.__name__} (chainlit)", middleware.cls(mounted(), **middleware.kwargs)))
+
+    # Full app: as configured, and with the MCP fast path removed
+    user_middleware = list(main.app.user_middleware)
+    lean = [m for m in user_middleware if m.cls is MCPFastPathMiddleware]
+    full = [m for m in user_middleware if m.cls is not MCPFastPathMiddleware]
+    try:
+        main.app.user_middleware = full
+        stacks.append(("full app (ui stack)", main.app.build_middleware_stack()))
+        fast_path = lean[0] if lean else None
+        if fast_path is None:
+            from starlette.middleware import Middleware
+            fast_path = Middleware(MCPFastPathMiddleware, mcp_app=main.mcp_app, prefix="/pixelle")
+        main.app.user_middleware = [fast_path] + full
+        stacks.append((FULL_STACK, main.app.build_middleware_stack()))
+    finally:
+        main.app.user_middleware = user_middleware
+    return stacks
+
+
+async def measure(app, iterations: int, warmup: int) -> Dict[str, Dict[str, float]]:
+    """Measure tools/list and tools/call latency (microseconds) through one app"""
+    results = {}
+    async with MCPBenchClient(app) as client:
+        operations = {
+            "tools/list": ("tools/list", {}),
+            "tools/call": ("tools/call", {"name": "bench_echo", "arguments": {"text": "ping"}}),
+        }
+        for op_name, (method, params) in operations.items():
+            for _ in range(warmup):
+                await client.request(method, params)
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                await client.request(method, params)
+                samples.append((time.perf_counter() - start) * 1e6)
+            samples.sort()
+            results[op_name] = {
+                "median_us": statistics.median(samples),
+                "p95_us": samples[int(len(samples) * 0.95) - 1],
+            }
+    return results
+
+
+async def run(iterations: int, warmup: int, rounds: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    from pixelle import main
+
+    @main.mcp.tool(name="bench_echo")
+    def bench_echo(text: str) -> str:
+        """Echo text back (benchmark tool)"""
+        return text
+
+    stacks = build_stacks(main)
+    results = {}
+    async with main.mcp_app.lifespan(main.app):
+        # Warm up schema generation and session handling once before any stack is measured
+        await measure(stacks[0][1], warmup, warmup)
+        # Interleave stacks over several rounds and keep the best round, to damp noise
+        for _ in range(rounds):
+            for name, app in stacks:
+                measured = await measure(app, iterations, warmup)
+                best = results.setdefault(name, measured)
+                for op_name, stats in measured.items():
+                    if stats["median_us"] < best[op_name]["median_us"]:
+                        best[op_name] = stats
+    return results
+
+
+def print_results(results: Dict[str, Dict[str, Dict[str, float]]]):
+    baseline = results[BASELINE_STACK]
+    print(f"{'stack':<52} {'op':<11} {'median µs':>10} {'p95 µs':>10} {'overhead µs':>12}")
+    for name, ops in results.items():
+        for op_name, stats in ops.items():
+            overhead = stats["median_us"] - baseline[op_name]["median_us"]
+            print(f"{name:<52} {op_name:<11} {stats['median_us']:>10.0f} {stats['p95_us']:>10.0f} {overhead:>+12.0f}")
+
+
+def check_regressions(results, baseline_path: Path, threshold: float, max_overhead_us: float) -> List[str]:
+    """Compare against a saved baseline and the latency budget, returns failure messages"""
+    failures = []
+    if baseline_path:
+        saved = json.loads(baseline_path.read_text(encoding="utf-8"))
+        for name, ops in results.items():
+            for op_name, stats in ops.items():
+                previous = saved.get(name, {}).get(op_name)
+                if previous and stats["median_us"] > previous["median_us"] * (1 + threshold):
+                    failures.append(
+                        f"{name} {op_name}: {stats['median_us']:.0f}µs > "
+                        f"baseline {previous['median_us']:.0f}µs +{threshold:.0%}")
+    if max_overhead_us is not None:
+        for op_name, stats in results[FULL_STACK].items():
+            overhead = stats["median_us"] - results[BASELINE_STACK][op_name]["median_us"]
+            if overhead > max_overhead_us:
+                failures.append(f"{FULL_STACK} {op_name}: overhead {overhead:.0f}µs > budget {max_overhead_us:.0f}µs")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the middleware stack in front of the MCP endpoint")
+    parser.add_argument("--iterations", "-n", type=int, default=300, help="Measured requests per stack and operation")
+    parser.add_argument("--warmup", type=int, default=30, help="Unmeasured requests before measuring")
+    parser.add_argument("--rounds", type=int, default=3, help="Measurement rounds, the best round is reported")
+    parser.add_argument("--baseline", type=Path, help="Baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed median slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--max-overhead-us", type=float, help="Latency budget of the full app over the bare MCP app")
+    parser.add_argument("--save-baseline", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.iterations, args.warmup, args.rounds))
+    print_results(results)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    failures = check_regressions(results, args.baseline, args.threshold, args.max_overhead_us)
+    if failures:
+        print("\nRegressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
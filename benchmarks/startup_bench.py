@@ -0,0 +1,199 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+Cold start benchmark.
+
+Runs each scenario in fresh Python processes and reports the median wall time and
+the import time per top-level package (from `python -X importtime`):
+
+- help:      `pixelle --help`
+- status:    `pixelle status`
+- boot:      `python -m pixelle.main` until the server answers HTTP requests
+- boot-mcp:  the same in MCP-only mode (`MCP_ONLY=true`)
+
+With `--history`, results are appended to a JSON lines file and compared with the
+previous run, so startup regressions show up over time.
+
+Usage:
+    python benchmarks/startup_bench.py
+    python benchmarks/startup_bench.py --scenarios help,status --runs 10
+    python benchmarks/startup_bench.py --history benchmarks/startup_history.jsonl
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CLI = [sys.executable, "-m", "pixelle.cli"]
+SERVER = [sys.executable, "-m", "pixelle.main"]
+
+# name -> (command, extra environment, waits for the server to be ready)
+SCENARIOS = {
+    "help": (CLI + ["--help"], {}, False),
+    "status": (CLI + ["status"], {}, False),
+    "boot": (SERVER, {}, True),
+    "boot-mcp": (SERVER, {"MCP_ONLY": "true"}, True),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Self import time in ms per top-level package"""
+    packages: Dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us) / 1000
+    return dict(packages)
+
+
+def wait_ready(process: subprocess.Popen, port: int, timeout: float) -> bool:
+    """Poll the server until it answers or the process exits"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline and process.poll() is None:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return True
+        except urllib.error.HTTPError:
+            return True  # Any HTTP response means the server is serving
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.02)
+    return False
+
+
+def run_once(name: str, importtime: bool, boot_timeout: float) -> Tuple[Optional[float], Dict[str, float]]:
+    """Run a scenario in a fresh process, returns wall time in ms and import breakdown"""
+    command, extra_env, server = SCENARIOS[name]
+    env = {**os.environ, **extra_env, "PYTHONPATH": str(ROOT) + os.pathsep + os.environ.get("PYTHONPATH", "")}
+    if importtime:
+        command = [command[0], "-X", "importtime"] + command[1:]
+
+    if not server:
+        start = time.perf_counter()
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            print(f"  {name} exited with {result.returncode}: {result.stderr.strip()[-300:]}")
+        return elapsed, parse_importtime(result.stderr) if importtime else {}
+
+    port = free_port()
+    env.update(HOST="127.0.0.1", PORT=str(port), LLM_WARMUP_ENABLED="false")
+    # stderr goes to a file, -X importtime output would fill a pipe while the server runs
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as stderr_file:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=stderr_file, text=True)
+        ready = wait_ready(process, port, boot_timeout)
+        elapsed = (time.perf_counter() - start) * 1000
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        stderr_file.seek(0)
+        stderr = stderr_file.read()
+    if not ready:
+        print(f"  {name} did not become ready: {stderr.strip()[-300:]}")
+        return None, {}
+    return elapsed, parse_importtime(stderr) if importtime else {}
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_previous(history: Path) -> Optional[dict]:
+    if not history.exists():
+        return None
+    lines = [line for line in history.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold start of the pixelle CLI and server")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma separated scenarios")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per scenario")
+    parser.add_argument("--top", type=int, default=8, help="Packages shown per import breakdown")
+    parser.add_argument("--boot-timeout", type=float, default=120.0, help="Seconds to wait for the server")
+    parser.add_argument("--history", type=Path, help="JSON lines file to append results to and compare with")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)} (available: {', '.join(SCENARIOS)})")
+
+    results: Dict[str, dict] = {}
+    for name in names:
+        # The import breakdown comes from a separate run, -X importtime slows down imports
+        _, imports = run_once(name, importtime=True, boot_timeout=args.boot_timeout)
+        times: List[float] = []
+        for _ in range(args.runs):
+            elapsed, _ = run_once(name, importtime=False, boot_timeout=args.boot_timeout)
+            if elapsed is not None:
+                times.append(elapsed)
+        if not times:
+            continue
+        top = dict(sorted(imports.items(), key=lambda item: item[1], reverse=True)[:args.top])
+        results[name] = {
+            "median_ms": round(statistics.median(times), 1),
+            "min_ms": round(min(times), 1),
+            "imports_ms": {package: round(ms, 1) for package, ms in top.items()},
+        }
+
+    previous = load_previous(args.history) if args.history else None
+    previous_results = previous["results"] if previous else {}
+
+    print(f"\n{'scenario':<10} {'median ms':>10} {'min ms':>9} {'vs last':>9}")
+    for name, result in results.items():
+        last = previous_results.get(name, {}).get("median_ms")
+        change = f"{(result['median_ms'] - last) / last * 100:+.0f}%" if last else "-"
+        print(f"{name:<10} {result['median_ms']:>10.1f} {result['min_ms']:>9.1f} {change:>9}")
+
+    for name, result in results.items():
+        print(f"\n{name} - import time by package (self, ms):")
+        for package, ms in result["imports_ms"].items():
+            print(f"  {package:<24} {ms:>8.1f}")
+
+    if args.history:
+        record = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+            "results": results,
+        }
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with args.history.open("a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+        print(f"\nAppended results to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+Streaming token batching benchmark.
+
+Replays a simulated LLM stream through `TokenCoalescer` and counts the UI events
+(one socket.io event per `stream_token` call) emitted per response, with batching
+disabled (one event per delta) and with the configured batch windows. Also reports
+how long deltas were held back by batching.
+
+Usage:
+    python benchmarks/stream_bench.py
+    python benchmarks/stream_bench.py --tokens 2000 --token-delay-ms 5 --windows 0,30,60
+    python benchmarks/stream_bench.py --burst 8
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pixelle.web.chat.token_coalescer import TokenCoalescer
+
+WORDS = "the quick brown fox jumps over a lazy dog while generating an image of".split()
+
+
+class CountingMessage:
+    """Stand-in for `cl.Message` that records every emitted event"""
+
+    def __init__(self):
+        self.content = ""
+        self.events: List[Tuple[float, int]] = []  # (emit time, total chars emitted)
+
+    async def stream_token(self, token: str):
+        self.content += token
+        self.events.append((time.perf_counter(), len(self.content)))
+
+
+def make_deltas(tokens: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [(" " if i else "") + rng.choice(WORDS)[: rng.randint(2, 6)] for i in range(tokens)]
+
+
+async def replay(deltas: List[str], token_delay: float, burst: int, interval_ms: int, max_chars: int) -> Dict[str, float]:
+    """Stream deltas through a coalescer, returns event count and hold-back delays"""
+    msg = CountingMessage()
+    stream = TokenCoalescer(msg, interval_ms=interval_ms, max_chars=max_chars)
+    arrivals: List[Tuple[float, int]] = []  # (arrival time, total chars received)
+    received = 0
+
+    for i, delta in enumerate(deltas):
+        # Providers often deliver several deltas per network read
+        if i % burst == 0:
+            await asyncio.sleep(token_delay * burst)
+        received += len(delta)
+        arrivals.append((time.perf_counter(), received))
+        await stream.add(delta)
+    await stream.flush()
+
+    # Delay of each delta = time of the first event containing its last character
+    delays = []
+    event_index = 0
+    for arrived_at, chars in arrivals:
+        while msg.events[event_index][1] < chars:
+            event_index += 1
+        delays.append((msg.events[event_index][0] - arrived_at) * 1000)
+
+    assert msg.content == "".join(deltas)
+    return {
+        "events": len(msg.events),
+        "avg_delay_ms": statistics.mean(delays),
+        "max_delay_ms": max(delays),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark UI events per streamed response with token batching")
+    parser.add_argument("--tokens", type=int, default=600, help="Deltas per simulated response")
+    parser.add_argument("--token-delay-ms", type=float, default=8.0, help="Average delay between deltas")
+    parser.add_argument("--burst", type=int, default=1, help="Deltas arriving together per network read")
+    parser.add_argument("--windows", default="0,15,30,60", help="Comma separated batch windows in ms, 0 = no batching")
+    parser.add_argument("--max-chars", type=int, default=64, help="Max buffered characters per batch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    deltas = make_deltas(args.tokens, args.seed)
+    windows = [int(w) for w in args.windows.split(",")]
+
+    print(f"{args.tokens} deltas, {sum(map(len, deltas))} chars, "
+          f"{args.token_delay_ms}ms between deltas, bursts of {args.burst}\n")
+    print(f"{'window':<14} {'events':>8} {'reduction':>10} {'avg delay ms':>13} {'max delay ms':>13}")
+    baseline = None
+    for window in windows:
+        result = asyncio.run(replay(deltas, args.token_delay_ms / 1000, args.burst, window, args.max_chars))
+        if baseline is None:
+            baseline = result["events"]
+        label = "off" if window == 0 else f"{window}ms/{args.max_chars}c"
+        print(f"{label:<14} {result['events']:>8} {baseline / result['events']:>9.1f}x "
+              f"{result['avg_delay_ms']:>13.1f} {result['max_delay_ms']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -45,5 +45,3 @@ def get_version() -> str:
         return "unknown"
 
 __version__ = get_version()
-
-from .tools import system_tools
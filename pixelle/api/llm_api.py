@@ -0,0 +1,25 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from pixelle.web.utils.llm_clients import llm_clients
+
+# Create router
+router = APIRouter(
+    tags=["llm"],
+)
+
+
+@router.get("/metrics")
+async def get_llm_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Get LLM request metrics per model
+    
+    Returns:
+        Provider, request and error counts, time to first token (p50/p95) and
+        average response duration of each model, over its recent requests
+    """
+    return llm_clients.metrics_snapshot()
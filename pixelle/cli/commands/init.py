@@ -6,20 +6,20 @@
 import typer
 from rich.console import Console
 
-from pixelle.cli.setup.execution_engines import setup_execution_engines_interactive
-from pixelle.cli.setup.service import setup_service_config
-from pixelle.cli.setup.config_saver import save_unified_config
-from pixelle.cli.setup.providers.manager import (
-    setup_multiple_llm_providers,
-    collect_all_selected_models,
-    select_default_model_interactively
-)
-
 console = Console()
 
 
 def init_command():
     """🔄 Initialize/reconfigure Pixelle MCP (non-interactive setup wizard)"""
+    # Setup wizards pull in questionary, only imported when the command runs
+    from pixelle.cli.setup.execution_engines import setup_execution_engines_interactive
+    from pixelle.cli.setup.service import setup_service_config
+    from pixelle.cli.setup.config_saver import save_unified_config
+    from pixelle.cli.setup.providers.manager import (
+        setup_multiple_llm_providers,
+        collect_all_selected_models,
+        select_default_model_interactively
+    )
     
     # Show header information
     from pixelle.cli.utils.display import show_header_info
@@ -3,11 +3,12 @@
 
 """Start command implementation."""
 
+import os
+
 import typer
 from rich.console import Console
 
 from pixelle.cli.utils.command_utils import detect_config_status
-from pixelle.cli.utils.server_utils import start_pixelle_server
 
 console = Console()
 
@@ -15,6 +16,8 @@ console = Console()
 def start_command(
     daemon: bool = typer.Option(False, "--daemon", "-d", help="Run in background daemon mode"),
     force: bool = typer.Option(False, "--force", "-f", help="Force start by terminating existing processes"),
+    dev: bool = typer.Option(False, "--dev", help="Development mode: serve frontend files fresh without caching"),
+    mcp_only: bool = typer.Option(False, "--mcp-only", help="Serve only the MCP server, without the web UI and LLM clients"),
 ):
     """🚀 Start Pixelle MCP server directly (non-interactive)"""
     
@@ -23,7 +26,7 @@ def start_command(
     show_header_info()
     
     # Check if configuration exists
-    config_status = detect_config_status()
+    config_status = detect_config_status(require_llm=not mcp_only)
     
     if config_status == "first_time":
         console.print("❌ [bold red]No configuration found![/bold red]")
@@ -36,5 +39,17 @@ def start_command(
 
         raise typer.Exit(1)
     
-    # Start server directly
+    if dev:
+        # Daemon processes inherit the environment
+        os.environ["DEV_MODE"] = "true"
+        from pixelle.settings import settings
+        settings.dev_mode = True
+    
+    if mcp_only:
+        os.environ["MCP_ONLY"] = "true"
+        from pixelle.settings import settings
+        settings.mcp_only = True
+    
+    # Start server directly (imported here, it loads settings and network helpers)
+    from pixelle.cli.utils.server_utils import start_pixelle_server
     start_pixelle_server(daemon=daemon, force=force)
@@ -16,7 +16,6 @@ from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 from rich.prompt import Confirm
-import questionary
 
 console = Console()
 
@@ -56,6 +55,8 @@ def list_workflows(
     # Get loaded workflow manager info
     try:
         from pixelle.manager.workflow_manager import workflow_manager
+        if not workflow_manager.loaded_workflows:
+            workflow_manager.load_all_workflows_sync()
         loaded_workflows = workflow_manager.loaded_workflows
         total_loaded = len(loaded_workflows)
     except Exception as e:
@@ -137,6 +138,7 @@ def list_workflows(
 def install_examples():
     """📥 Install workflow examples from the built-in collection"""
     
+    import questionary
     from pixelle.utils.os_util import get_src_path, get_data_path
     
     # Get built-in workflows directory from package
@@ -368,8 +370,114 @@ def add_runninghub_workflow(
         raise typer.Exit(1)
 
 
+@workflow_app.command("refresh")
+def refresh_runninghub_workflows(
+    tool_name: Optional[str] = typer.Argument(None, help="Tool name of the RunningHub workflow to refresh (default: all)"),
+    clear: bool = typer.Option(False, "--clear", "-c", help="Only clear the cache, workflows are fetched again on next use"),
+):
+    """🔄 Refresh cached RunningHub workflow metadata"""
+    
+    from pixelle.cli.utils.display import show_header_info
+    show_header_info()
+    
+    from pixelle.utils.os_util import get_data_path
+    from pixelle.comfyui.runninghub_client import close_runninghub_client
+    from pixelle.utils.runninghub_util import (
+        is_runninghub_workflow,
+        get_runninghub_workflow_id,
+        clear_runninghub_workflow_cache,
+        fetch_runninghub_workflow_metadata,
+    )
+    
+    custom_workflows_dir = Path(get_data_path("custom_workflows"))
+    workflow_files = [f for f in sorted(custom_workflows_dir.glob("*.json")) if is_runninghub_workflow(f)]
+    if tool_name:
+        workflow_files = [f for f in workflow_files if f.stem == tool_name]
+    
+    if not workflow_files:
+        target = f"'{tool_name}'" if tool_name else "any"
+        console.print(f"⚠️  [yellow]No RunningHub workflow found for {target} tool[/yellow]")
+        return
+    
+    if clear:
+        removed = 0
+        for workflow_file in workflow_files:
+            removed += clear_runninghub_workflow_cache(get_runninghub_workflow_id(workflow_file))
+        console.print(f"🧹 Cleared {removed} cached RunningHub workflow(s)")
+        return
+    
+    import asyncio
+    
+    async def refresh_all():
+        results = []
+        try:
+            for workflow_file in workflow_files:
+                metadata = await fetch_runninghub_workflow_metadata(workflow_file, workflow_file.stem, refresh=True)
+                results.append((workflow_file, metadata))
+        finally:
+            await close_runninghub_client()
+        return results
+    
+    table = Table(title="🔄 RunningHub Workflow Cache", show_header=True, header_style="bold blue")
+    table.add_column("Tool Name", style="cyan")
+    table.add_column("Workflow ID", style="magenta")
+    table.add_column("Status", width=14)
+    table.add_column("Parameters", style="yellow")
+    
+    failed = 0
+    for workflow_file, metadata in asyncio.run(refresh_all()):
+        workflow_id = get_runninghub_workflow_id(workflow_file) or "-"
+        if metadata:
+            table.add_row(workflow_file.stem, workflow_id, "✅ Refreshed", ", ".join(metadata.params.keys()) or "No params")
+        else:
+            failed += 1
+            table.add_row(workflow_file.stem, workflow_id, "❌ Failed", "-")
+    
+    console.print(table)
+    if failed:
+        console.print(f"⚠️  [yellow]{failed} workflow(s) could not be refreshed, check the RunningHub configuration and logs[/yellow]")
+    console.print("💡 Restart Pixelle service to apply changed tool parameters")
+
+
+@workflow_app.command("jobs")
+def list_jobs(
+    status: Optional[str] = typer.Option(None, "--status", "-s", help="Only show jobs with this status (e.g. running, completed)"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Max number of jobs to show"),
+):
+    """📊 Show recent workflow jobs of all server workers"""
+
+    from pixelle.manager.job_store import job_store
+
+    jobs = job_store.list_jobs_sync(status=status, limit=limit)
+    if not jobs:
+        console.print("📭 [yellow]No workflow jobs recorded[/yellow]")
+        return
+
+    table = Table(title="📊 Workflow Jobs", show_header=True, header_style="bold blue")
+    table.add_column("Job ID", style="dim")
+    table.add_column("Workflow", style="cyan")
+    table.add_column("Status", width=12)
+    table.add_column("Worker", style="magenta")
+    table.add_column("Started", style="green")
+    table.add_column("Duration")
+
+    for job in jobs:
+        duration = "-" if job["status"] == "running" else f"{job['updated_at'] - job['created_at']:.1f}s"
+        table.add_row(
+            job["job_id"][:12],
+            job["workflow"],
+            job["status"],
+            str(job["worker_pid"] or "-"),
+            datetime.fromtimestamp(job["created_at"]).strftime("%Y-%m-%d %H:%M:%S"),
+            duration,
+        )
+
+    console.print(table)
+
+
 def show_workflow_menu():
     """Show interactive workflow management menu"""
+    import questionary
     from pixelle.cli.utils.display import show_header_info
     
     # Show header
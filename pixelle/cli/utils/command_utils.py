@@ -10,8 +10,8 @@ console = Console()
 
 
 
-def detect_config_status() -> str:
-    """Detect current config status"""
+def detect_config_status(require_llm: bool = True) -> str:
+    """Detect current config status, `require_llm=False` for the MCP-only mode"""
     from pixelle.utils.os_util import get_pixelle_root_path
     pixelle_root = get_pixelle_root_path()
     env_file = Path(pixelle_root) / ".env"
@@ -44,4 +44,4 @@ def detect_config_status() -> str:
     
     # Use the centralized config validation logic
     from pixelle.utils.config_util import detect_config_status_from_env
-    return detect_config_status_from_env(env_vars)
+    return detect_config_status_from_env(env_vars, require_llm=require_llm)
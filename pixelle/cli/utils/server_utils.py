@@ -136,7 +136,7 @@ def start_pixelle_server(daemon: bool = False, force: bool = False):
                 f.write(str(process.pid))
             
             console.print(Panel(
-                f"🌐 Web interface: http://localhost:{settings.port}/\n"
+                ("" if settings.mcp_only else f"🌐 Web interface: http://localhost:{settings.port}/\n") +
                 f"🔌 MCP endpoint: http://localhost:{settings.port}/pixelle/mcp\n"
                 f"📁 Loaded workflow directory: data/custom_workflows/\n"
                 f"📋 PID: {process.pid}\n"
@@ -155,7 +155,7 @@ def start_pixelle_server(daemon: bool = False, force: bool = False):
         else:
             # Foreground mode
             console.print(Panel(
-                f"🌐 Web interface: http://localhost:{settings.port}/\n"
+                ("" if settings.mcp_only else f"🌐 Web interface: http://localhost:{settings.port}/\n") +
                 f"🔌 MCP endpoint: http://localhost:{settings.port}/pixelle/mcp\n"
                 f"📁 Loaded workflow directory: data/custom_workflows/",
                 title="🎉 Pixelle MCP is running!",
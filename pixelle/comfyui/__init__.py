@@ -2,7 +2,7 @@
 # This project is licensed under the MIT License (SPDX-License-identifier: MIT).
 
 from .facade import execute_workflow, get_workflow_metadata, ComfyUIClient
-from .runninghub_client import RunningHubClient, get_runninghub_client
+from .runninghub_client import RunningHubClient, get_runninghub_client, close_runninghub_client
 from .runninghub_executor import RunningHubExecutor
 
 __all__ = [
@@ -11,5 +11,6 @@ __all__ = [
     'ComfyUIClient',
     'RunningHubClient',
     'get_runninghub_client',
+    'close_runninghub_client',
     'RunningHubExecutor'
 ]
\ No newline at end of file
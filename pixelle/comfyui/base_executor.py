@@ -1,6 +1,7 @@
 # Copyright (C) 2025 AIDC-AI
 # This project is licensed under the MIT License (SPDX-License-identifier: MIT).
 
+import asyncio
 import os
 import json
 import copy
@@ -16,7 +17,7 @@ import random
 
 from pixelle.logger import logger
 from pixelle.utils.file_util import download_files
-from pixelle.utils.file_uploader import upload
+from pixelle.utils.file_uploader import aupload
 from pixelle.comfyui.workflow_parser import WorkflowParser, WorkflowMetadata
 from pixelle.comfyui.models import ExecuteResult
 from pixelle.utils.os_util import get_data_path
@@ -112,9 +113,8 @@ class ComfyUIExecutor(ABC):
             uncached_urls = [url for url in unique_urls if url not in url_cache]
             if uncached_urls:
                 async with download_files(uncached_urls, cookies=cookies) as temp_files:
-                    for temp_file, url in zip(temp_files, uncached_urls):
-                        new_url = upload(temp_file)
-                        url_cache[url] = new_url
+                    new_urls = await asyncio.gather(*(aupload(temp_file) for temp_file in temp_files))
+                    url_cache.update(zip(uncached_urls, new_urls))
             
             return [url_cache.get(url, url) for url in urls]
 
@@ -12,25 +12,86 @@ from pixelle.logger import logger
 from pixelle.settings import settings
 
 
+# Endpoints that only read state on RunningHub and are safe to retry
+IDEMPOTENT_ENDPOINTS = {
+    "/api/openapi/getJsonApiFormat",
+    "/task/openapi/status",
+    "/task/openapi/outputs",
+}
+
+# Per-endpoint total timeouts in seconds, endpoints not listed use `settings.runninghub_timeout`
+ENDPOINT_TIMEOUTS = {
+    "/api/openapi/getJsonApiFormat": 60,
+    "/task/openapi/create": 60,
+    "/task/openapi/status": 30,
+    "/task/openapi/outputs": 60,
+}
+
+# HTTP status codes that indicate a transient server-side failure
+TRANSIENT_HTTP_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RunningHubTransientError(Exception):
+    """Transient RunningHub failure (rate limit, gateway error, dropped connection) that may be retried"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class RunningHubClient:
-    """RunningHub API client for workflow and file operations"""
+    """RunningHub API client for workflow and file operations
+    
+    The client owns a long-lived pooled `aiohttp.ClientSession` so that keep-alive
+    connections to RunningHub are reused across calls (status polls in particular).
+    Call `close()` when the client is no longer needed.
+    """
     
     def __init__(self, api_key: str = None, base_url: str = None):
         self.api_key = api_key or settings.runninghub_api_key
         self.base_url = (base_url or settings.runninghub_base_url).rstrip('/')
         self.timeout = settings.runninghub_timeout
         self.retry_count = settings.runninghub_retry_count
+        self.max_connections = settings.runninghub_max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
         
         if not self.api_key:
             raise ValueError("RunningHub API key is required")
     
-    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, 
-                          files: Optional[Dict] = None, timeout: Optional[int] = None) -> Dict[str, Any]:
-        """Make HTTP request to RunningHub API with retry logic"""
-        url = f"{self.base_url}{endpoint}"
-        headers = {}
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled session, creating it lazily on the current event loop"""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._session_loop is loop:
+            return self._session
         
-        # Prepare request data
+        # Session belongs to another (e.g. finished CLI) loop, it cannot be reused there
+        if self._session is not None and not self._session.closed and self._session_loop is not loop:
+            logger.debug("RunningHub session was created on another event loop, recreating it")
+        
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections,
+            keepalive_timeout=60,
+            ttl_dns_cache=300,
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
+        self._session_loop = loop
+        return self._session
+    
+    async def close(self):
+        """Close the pooled session"""
+        if self._session is not None and not self._session.closed:
+            try:
+                await self._session.close()
+            except Exception as e:
+                logger.warning(f"Failed to close RunningHub session: {e}")
+        self._session = None
+        self._session_loop = None
+    
+    def _build_request_data(self, data: Optional[Dict], files: Optional[Dict]) -> tuple[Dict[str, str], Any]:
+        """Build headers and body for a request, FormData can only be sent once so this runs per attempt"""
+        headers = {}
         if files:
             # For file upload, don't set Content-Type (let aiohttp handle it)
             request_data = aiohttp.FormData()
@@ -43,33 +104,61 @@ class RunningHubClient:
             # For JSON requests
             headers['Content-Type'] = 'application/json'
             request_data = json.dumps(data) if data else None
+        return headers, request_data
+    
+    async def _send_request(self, method: str, url: str, headers: Dict[str, str], request_data: Any,
+                            timeout: int) -> Dict[str, Any]:
+        """Send a single request over the pooled session"""
+        session = await self._get_session()
+        try:
+            async with session.request(method, url, headers=headers, data=request_data,
+                                       timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status == 200:
+                    result = await response.json(content_type=None)
+                    if result.get('code') == 0:
+                        return result
+                    else:
+                        raise Exception(f"RunningHub API error: {result.get('msg', 'Unknown error')}")
+                
+                response_text = await response.text()
+                if response.status in TRANSIENT_HTTP_STATUSES:
+                    retry_after = None
+                    try:
+                        retry_after = float(response.headers.get('Retry-After', ''))
+                    except ValueError:
+                        pass
+                    raise RunningHubTransientError(f"HTTP {response.status}: {response_text}", retry_after)
+                raise Exception(f"HTTP {response.status}: {response_text}")
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+            raise RunningHubTransientError(f"{type(e).__name__}: {e}") from e
+    
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, 
+                          files: Optional[Dict] = None, timeout: Optional[int] = None) -> Dict[str, Any]:
+        """Make HTTP request to RunningHub API with retry logic
+        
+        Only idempotent endpoints are retried, and only on transient failures
+        (connection errors, timeouts, 429 and 5xx responses).
+        """
+        url = f"{self.base_url}{endpoint}"
+        timeout = timeout or ENDPOINT_TIMEOUTS.get(endpoint, self.timeout)
+        retry_count = self.retry_count if endpoint in IDEMPOTENT_ENDPOINTS else 0
         
         # Retry logic
-        last_exception = None
-        for attempt in range(self.retry_count + 1):
+        for attempt in range(retry_count + 1):
+            headers, request_data = self._build_request_data(data, files)
             try:
-                async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout or self.timeout)) as session:
-                    async with session.request(method, url, headers=headers, data=request_data) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            if result.get('code') == 0:
-                                return result
-                            else:
-                                raise Exception(f"RunningHub API error: {result.get('msg', 'Unknown error')}")
-                        else:
-                            response_text = await response.text()
-                            raise Exception(f"HTTP {response.status}: {response_text}")
-                            
-            except Exception as e:
-                last_exception = e
-                if attempt < self.retry_count:
-                    wait_time = 2 ** attempt  # Exponential backoff
-                    logger.warning(f"Request failed (attempt {attempt + 1}/{self.retry_count + 1}): {e}. Retrying in {wait_time}s...")
+                return await self._send_request(method, url, headers, request_data, timeout)
+            except RunningHubTransientError as e:
+                if attempt < retry_count:
+                    wait_time = e.retry_after if e.retry_after is not None else 2 ** attempt  # Exponential backoff
+                    logger.warning(f"Request failed (attempt {attempt + 1}/{retry_count + 1}): {e}. Retrying in {wait_time}s...")
                     await asyncio.sleep(wait_time)
                 else:
-                    logger.error(f"Request failed after {self.retry_count + 1} attempts: {e}")
-        
-        raise last_exception
+                    logger.error(f"Request failed after {retry_count + 1} attempts: {e}")
+                    raise
+            except Exception as e:
+                logger.error(f"Request failed: {e}")
+                raise
     
     async def get_workflow_json(self, workflow_id: str) -> Dict[str, Any]:
         """Get workflow JSON by workflow ID using getJsonApiFormat API
@@ -264,3 +353,9 @@ def get_runninghub_client() -> RunningHubClient:
     if _runninghub_client is None:
         _runninghub_client = RunningHubClient()
     return _runninghub_client
+
+
+async def close_runninghub_client():
+    """Close the global RunningHub client's pooled session (called on app shutdown)"""
+    if _runninghub_client is not None:
+        await _runninghub_client.close()
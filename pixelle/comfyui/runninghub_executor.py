@@ -3,7 +3,6 @@
 
 import os
 import json
-import time
 import asyncio
 from typing import Dict, Any, Optional, List
 from urllib.parse import urlparse
@@ -11,6 +10,7 @@ from urllib.parse import urlparse
 from pixelle.comfyui.base_executor import ComfyUIExecutor, MEDIA_UPLOAD_NODE_TYPES
 from pixelle.comfyui.models import ExecuteResult
 from pixelle.comfyui.runninghub_client import get_runninghub_client
+from pixelle.comfyui.runninghub_task_tracker import get_runninghub_task_tracker
 from pixelle.logger import logger
 from pixelle.utils.file_util import download_files
 from pixelle.utils.os_util import get_data_path
@@ -45,7 +45,7 @@ class RunningHubExecutor(ComfyUIExecutor):
             # Get workflow metadata using workflow manager (handles RunningHub workflows)
             from pixelle.manager.workflow_manager import workflow_manager
             from pathlib import Path
-            metadata = workflow_manager.parse_workflow_metadata(Path(workflow_file))
+            metadata = await workflow_manager.parse_workflow_metadata(Path(workflow_file))
             if not metadata:
                 return ExecuteResult(status="error", msg="Cannot parse workflow metadata")
             
@@ -169,53 +169,35 @@ class RunningHubExecutor(ComfyUIExecutor):
     
     
     async def _wait_for_task_completion(self, task_id: str, output_id_2_var: Optional[Dict[str, str]] = None, max_wait_time: int = None) -> ExecuteResult:
-        """Wait for RunningHub task completion and return results"""
+        """Wait for RunningHub task completion and return results
+        
+        Status polling is delegated to the shared task tracker, which polls all
+        outstanding tasks on one rate-limited scheduler.
+        """
         max_wait_time = max_wait_time or settings.runninghub_timeout
-        check_interval = 2
-        start_time = time.time()
         
         logger.info(f"Waiting for RunningHub task completion: {task_id}")
         
-        while True:
-            elapsed_time = time.time() - start_time
-            if elapsed_time >= max_wait_time:
-                break
-                
-            try:
-                # Query task status
-                task_status = await self.client.query_task_status(task_id)
-                logger.debug(f"Task {task_id} status: {task_status}")
-                
-                # RunningHub API only returns: ["QUEUED","RUNNING","FAILED","SUCCESS"]
-                if task_status == 'SUCCESS':
-                    # Task completed - get results
-                    result_data = await self.client.query_task_result(task_id)
-                    return await self._process_task_result(task_id, result_data, output_id_2_var)
-                
-                elif task_status == 'FAILED':
-                    # Task failed
-                    return ExecuteResult(
-                        status="error",
-                        prompt_id=task_id,
-                        msg="RunningHub task failed"
-                    )
-                
-                elif task_status in ['QUEUED', 'RUNNING']:
-                    # Task still in progress - wait and check again
-                    logger.info(f"Task {task_id} status: {task_status}, waiting...")
-                    await asyncio.sleep(check_interval)
-                    continue
-                    
-            except Exception as e:
-                logger.error(f"Error checking task status {task_id}: {e}")
-                await asyncio.sleep(check_interval)
-                continue
+        try:
+            # RunningHub API only returns: ["QUEUED","RUNNING","FAILED","SUCCESS"]
+            task_status = await get_runninghub_task_tracker().wait_for_task(task_id, timeout=max_wait_time)
+        except asyncio.TimeoutError:
+            return ExecuteResult(
+                status="error",
+                prompt_id=task_id,
+                msg=f"RunningHub task timeout after {max_wait_time} seconds"
+            )
+        
+        if task_status == 'SUCCESS':
+            # Task completed - get results
+            result_data = await self.client.query_task_result(task_id)
+            return await self._process_task_result(task_id, result_data, output_id_2_var)
         
-        # Timeout
+        # Task failed
         return ExecuteResult(
             status="error",
             prompt_id=task_id,
-            msg=f"RunningHub task timeout after {max_wait_time} seconds"
+            msg="RunningHub task failed"
         )
     
     async def _process_task_result(self, task_id: str, result_data: List[Dict[str, Any]], output_id_2_var: Optional[Dict[str, str]] = None) -> ExecuteResult:
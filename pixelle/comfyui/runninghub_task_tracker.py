@@ -0,0 +1,239 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+Shared RunningHub task tracker - polls all outstanding task IDs on one scheduler
+instead of one polling loop per executing workflow.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Literal
+
+from pixelle.comfyui.runninghub_client import RunningHubClient, RunningHubTransientError, get_runninghub_client
+from pixelle.logger import logger
+from pixelle.settings import settings
+
+TaskStatus = Literal["QUEUED", "RUNNING", "FAILED", "SUCCESS"]
+
+# Final task states returned by RunningHub
+TERMINAL_STATUSES = {"SUCCESS", "FAILED"}
+
+
+@dataclass
+class _TrackedTask:
+    """Bookkeeping for a single outstanding task"""
+    task_id: str
+    future: asyncio.Future
+    next_poll_at: float
+    last_status: Optional[str] = None
+    waiters: int = field(default=1)
+    polling: bool = False
+
+
+class RunningHubTaskTracker:
+    """Poll RunningHub task status for many concurrent tasks on one scheduler
+
+    - At most `max_concurrency` status requests are in flight at once
+    - Status requests are spaced to stay below `rate_limit` requests per second
+    - Poll intervals adapt to the task state (slow while QUEUED, faster while RUNNING) with jitter
+    - A rate-limit response from RunningHub pauses all polling until it is safe to resume
+    """
+
+    def __init__(self, client: RunningHubClient = None,
+                 queued_interval: float = None,
+                 running_interval: float = None,
+                 max_concurrency: int = None,
+                 rate_limit: float = None,
+                 jitter: float = 0.2):
+        self.client = client or get_runninghub_client()
+        self.queued_interval = queued_interval or settings.runninghub_poll_queued_interval
+        self.running_interval = running_interval or settings.runninghub_poll_running_interval
+        self.max_concurrency = max_concurrency or settings.runninghub_poll_concurrency
+        self.rate_limit = rate_limit or settings.runninghub_poll_rate_limit
+        self.jitter = jitter
+
+        self._tasks: Dict[str, _TrackedTask] = {}
+        self._scheduler: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._paused_until = 0.0
+        self._backoff = 0.0
+        self._last_request_at = 0.0
+
+    def _interval_for(self, status: Optional[str]) -> float:
+        """Get the jittered poll interval for a task status"""
+        base = self.running_interval if status == "RUNNING" else self.queued_interval
+        return base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _ensure_scheduler(self):
+        """Start the scheduler loop if it is not running"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    async def wait_for_task(self, task_id: str, timeout: float = None) -> TaskStatus:
+        """Wait until a task reaches a terminal status
+
+        Args:
+            task_id: RunningHub task ID
+            timeout: Max wait time in seconds, defaults to `settings.runninghub_timeout`
+
+        Returns:
+            Final task status: "SUCCESS" or "FAILED"
+
+        Raises:
+            asyncio.TimeoutError: If the task does not finish within timeout
+        """
+        timeout = timeout or settings.runninghub_timeout
+        tracked = self._tasks.get(task_id)
+        if tracked is None:
+            loop = asyncio.get_running_loop()
+            # First poll after the short RUNNING interval so quick tasks finish early, a task
+            # that is still queued then is polled at the queued interval
+            tracked = _TrackedTask(
+                task_id=task_id,
+                future=loop.create_future(),
+                next_poll_at=time.monotonic() + self._interval_for("RUNNING"),
+            )
+            self._tasks[task_id] = tracked
+        else:
+            tracked.waiters += 1
+
+        self._ensure_scheduler()
+        logger.info(f"Tracking RunningHub task {task_id} ({len(self._tasks)} outstanding)")
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(tracked.future), timeout=timeout)
+        finally:
+            tracked.waiters -= 1
+            if tracked.waiters <= 0 and self._tasks.get(task_id) is tracked:
+                # Nobody is waiting anymore (timeout or cancellation), stop polling it
+                del self._tasks[task_id]
+                if not tracked.future.done():
+                    tracked.future.cancel()
+
+    async def _run(self):
+        """Scheduler loop, exits when there are no outstanding tasks"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        in_flight: set[asyncio.Task] = set()
+
+        try:
+            while self._tasks:
+                now = time.monotonic()
+
+                # Global pause after a rate-limit response
+                if now < self._paused_until:
+                    await self._sleep(self._paused_until - now)
+                    continue
+
+                due = [t for t in self._tasks.values()
+                       if t.next_poll_at <= now and not t.polling and not t.future.done()]
+
+                for tracked in sorted(due, key=lambda t: t.next_poll_at):
+                    await semaphore.acquire()
+                    await self._throttle()
+                    if time.monotonic() < self._paused_until:
+                        semaphore.release()
+                        break
+                    tracked.polling = True
+                    poll = asyncio.create_task(self._poll(tracked, semaphore))
+                    in_flight.add(poll)
+                    poll.add_done_callback(in_flight.discard)
+
+                if not self._tasks:
+                    break
+                next_at = min((t.next_poll_at for t in self._tasks.values() if not t.polling),
+                              default=now + self.queued_interval)
+                await self._sleep(max(0.05, next_at - time.monotonic()))
+        finally:
+            for poll in in_flight:
+                poll.cancel()
+
+    async def close(self):
+        """Stop the scheduler and its in-flight polls, waiters get cancelled"""
+        scheduler, self._scheduler = self._scheduler, None
+        if scheduler is not None and not scheduler.done():
+            scheduler.cancel()
+            try:
+                await scheduler
+            except asyncio.CancelledError:
+                pass
+        for tracked in self._tasks.values():
+            if not tracked.future.done():
+                tracked.future.cancel()
+        self._tasks.clear()
+
+    async def _sleep(self, delay: float):
+        """Sleep until delay elapses or a new task is registered"""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _throttle(self):
+        """Space status requests to stay under the configured rate limit"""
+        min_spacing = 1.0 / self.rate_limit if self.rate_limit > 0 else 0
+        wait = self._last_request_at + min_spacing - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_request_at = time.monotonic()
+
+    async def _poll(self, tracked: _TrackedTask, semaphore: asyncio.Semaphore):
+        """Query a single task status and resolve or reschedule it"""
+        try:
+            status = await self.client.query_task_status(tracked.task_id)
+            self._backoff = 0.0
+
+            if status in TERMINAL_STATUSES:
+                self._tasks.pop(tracked.task_id, None)
+                if not tracked.future.done():
+                    tracked.future.set_result(status)
+                return
+
+            if status != tracked.last_status:
+                logger.info(f"Task {tracked.task_id} status: {status}")
+            tracked.last_status = status
+            tracked.next_poll_at = time.monotonic() + self._interval_for(status)
+
+        except RunningHubTransientError as e:
+            # Back off globally so all tasks stop hammering the API
+            self._backoff = min(max(self._backoff * 2, self.running_interval), 60.0)
+            pause = e.retry_after if e.retry_after is not None else self._backoff
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            tracked.next_poll_at = self._paused_until
+            logger.warning(f"RunningHub status polling paused for {pause:.1f}s: {e}")
+
+        except Exception as e:
+            logger.error(f"Error checking task status {tracked.task_id}: {e}")
+            tracked.next_poll_at = time.monotonic() + self._interval_for(tracked.last_status)
+
+        finally:
+            tracked.polling = False
+            semaphore.release()
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+
+# Global task tracker instance
+_task_tracker = None
+_task_tracker_loop = None
+
+def get_runninghub_task_tracker() -> RunningHubTaskTracker:
+    """Get global RunningHub task tracker bound to the current event loop"""
+    global _task_tracker, _task_tracker_loop
+    loop = asyncio.get_running_loop()
+    if _task_tracker is None or _task_tracker_loop is not loop:
+        _task_tracker = RunningHubTaskTracker()
+        _task_tracker_loop = loop
+    return _task_tracker
+
+
+async def close_runninghub_task_tracker():
+    """Stop the global task tracker's scheduler (called on app shutdown)"""
+    if _task_tracker is not None and _task_tracker_loop is asyncio.get_running_loop():
+        await _task_tracker.close()
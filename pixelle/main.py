@@ -4,41 +4,100 @@
 # !!! Don't modify the import order, `settings` module must be imported before other modules !!!
 from pixelle.settings import settings
 
+import asyncio
 from fastapi import FastAPI
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
 from starlette.middleware.cors import CORSMiddleware
-from chainlit.config import load_module, config as chainlit_config
-from chainlit.server import lifespan as chainlit_lifespan
-from chainlit.server import app as chainlit_app
 
 from pixelle.utils.os_util import get_src_path
 from pixelle.utils.openapi_util import create_custom_openapi_function
 from pixelle.mcp_core import mcp
+from pixelle.logger import logger
 from pixelle.api.files_api import router as files_router
-from pixelle.middleware import StaticCacheMiddleware, HTMLCDNReplaceMiddleware, AppJsMiddleware
-
-
-# Modify chainlit config
-chainlit_config.run.host = settings.host
-chainlit_config.run.port = settings.port
-
-# Access chainlit entry file path
-chainlit_entry_file = get_src_path("web/app.py")
-# Load chainlit module
-load_module(chainlit_entry_file)
+from pixelle.middleware import StaticCacheMiddleware, HTMLCDNReplaceMiddleware, AppJsMiddleware, MCPFastPathMiddleware
+from pixelle.middleware.static_compression import StaticCompressionCache
+from pixelle.comfyui.runninghub_client import close_runninghub_client
+from pixelle.comfyui.runninghub_task_tracker import close_runninghub_task_tracker
+
+# MCP-only mode (`pixelle start --mcp-only`) serves just the MCP server:
+# Chainlit, LiteLLM and the LLM provider configuration are never imported
+web_ui_enabled = not settings.mcp_only
+
+# Multiple workers share one listening socket without session affinity:
+# - Chainlit sockets must stay on one worker for their whole life, so skip long-polling
+# - MCP sessions are kept in worker memory, so serve MCP statelessly
+multi_worker = settings.workers > 1
+
+if web_ui_enabled:
+    from chainlit.config import load_module, config as chainlit_config
+    from chainlit.server import lifespan as chainlit_lifespan
+    from chainlit.server import app as chainlit_app
+    
+    from pixelle.api.llm_api import router as llm_router
+    from pixelle.web.utils import llm_util
+    from pixelle.web.utils.llm_clients import llm_clients
+    
+    # Models are resolved on first use, check the LLM configuration before serving
+    llm_util.get_all_models()
+    
+    # Modify chainlit config
+    chainlit_config.run.host = settings.host
+    chainlit_config.run.port = settings.port
+    if multi_worker:
+        chainlit_config.project.transports = ["websocket"]
+    
+    # Access chainlit entry file path
+    chainlit_entry_file = get_src_path("web/app.py")
+    # Load chainlit module
+    load_module(chainlit_entry_file)
+else:
+    logger.info("MCP-only mode: web UI and LLM clients are disabled")
 
 # Create ASGI app of MCP
-mcp_app = mcp.http_app(path='/mcp')
+mcp_app = mcp.http_app(path='/mcp', stateless_http=True if multi_worker else None)
 
 
 # combine multi lifespans
 @asynccontextmanager
 async def combined_lifespan(app: FastAPI):
+    # load workflow tools on the server's event loop before serving requests
+    load_results = await workflow_manager.load_all_workflows()
+    logger.info(f"Initial workflow load results: {load_results}")
+    
+    # jobs of workers that died mid-execution would otherwise stay running forever
+    interrupted = await job_store.mark_interrupted()
+    if interrupted:
+        logger.info(f"Marked {interrupted} jobs of exited workers as interrupted")
+    
+    # watch workflow directory for hot reload, other workers register tools by writing this directory
+    workflow_watcher = None
+    if settings.workflow_watch_enabled or multi_worker:
+        workflow_watcher = WorkflowWatcher(workflow_manager)
+        workflow_watcher.start()
+    
+    # open LLM provider connections in the background, so the first message skips DNS and TLS
+    llm_warmup = None
+    if web_ui_enabled and settings.llm_warmup_enabled:
+        llm_warmup = asyncio.create_task(llm_clients.warm_up_all())
+    
     # start MCP lifespan
     async with mcp_app.lifespan(app):
         # start chainlit lifespan
-        async with chainlit_lifespan(app):
-            yield
+        async with chainlit_lifespan(app) if web_ui_enabled else nullcontext():
+            try:
+                yield
+            finally:
+                if workflow_watcher is not None:
+                    await workflow_watcher.stop()
+                # stop RunningHub polling, then close pooled RunningHub and LLM provider connections
+                await close_runninghub_task_tracker()
+                await close_runninghub_client()
+                if llm_warmup is not None:
+                    llm_warmup.cancel()
+                if web_ui_enabled:
+                    await llm_clients.close()
+                    # drop queued static compression instead of finishing it before exit
+                    static_compression.close()
 
 
 # Create a fastapi application
@@ -57,48 +116,63 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add HTML CDN replace middleware to fix slow CDN loading in China
-# Problem: Chainlit uses jsdelivr.net CDN for KaTeX and fonts.googleapis.com for fonts, which are slow or blocked in China
-# Solution: This middleware intercepts HTML responses and replaces CDN prefixes with China-accessible mirrors
-app.add_middleware(HTMLCDNReplaceMiddleware)
-
-# Add app.js middleware to always serve fresh content (for development)
-app.add_middleware(AppJsMiddleware)
-
-# Add static cache middleware to fix Chainlit's HTTP caching issues
-# Problem: Chainlit/Uvicorn doesn't properly handle conditional HTTP requests (If-None-Match, If-Modified-Since)
-# causing browsers to re-download large JS files even when they haven't changed, leading to slow performance
-# after the server runs for a while.
-# Solution: This middleware intercepts static file requests and implements proper HTTP caching protocol.
-# Add static cache middleware for hashed static files (long cache)
-app.add_middleware(
-    StaticCacheMiddleware,
-    static_paths=['/assets/', '/static/', '/_next/static/'],
-    max_age=31536000,  # 1 year cache - files have content hashes in names, safe for long cache
-)
+if web_ui_enabled:
+    # Add HTML CDN replace middleware to fix slow CDN loading in China
+    # Problem: Chainlit uses jsdelivr.net CDN for KaTeX and fonts.googleapis.com for fonts, which are slow or blocked in China
+    # Solution: This middleware intercepts HTML responses and replaces CDN prefixes with China-accessible mirrors
+    app.add_middleware(HTMLCDNReplaceMiddleware)
+    
+    # Add app.js middleware: cached with ETag revalidation, always fresh in dev mode (`pixelle start --dev`)
+    app.add_middleware(AppJsMiddleware, dev_mode=settings.dev_mode)
+    
+    # Add static cache middleware to fix Chainlit's HTTP caching issues
+    # Problem: Chainlit/Uvicorn doesn't properly handle conditional HTTP requests (If-None-Match, If-Modified-Since)
+    # causing browsers to re-download large JS files even when they haven't changed, leading to slow performance
+    # after the server runs for a while.
+    # Solution: This middleware intercepts static file requests and implements proper HTTP caching protocol.
+    # Add static cache middleware for hashed static files (long cache)
+    static_compression = StaticCompressionCache()
+    app.add_middleware(
+        StaticCacheMiddleware,
+        static_paths=['/assets/', '/static/', '/_next/static/'],
+        max_age=31536000,  # 1 year cache - files have content hashes in names, safe for long cache
+        compression_cache=static_compression,
+    )
 
 
 # Load tools modules manually (avoid loading residual files from old installations)
 from pixelle.tools import i_crop
+from pixelle.tools import system_tools
 from pixelle.tools import workflow_manager_tool
+from pixelle.manager.workflow_manager import workflow_manager
+from pixelle.manager.workflow_watcher import WorkflowWatcher
+from pixelle.manager.job_store import job_store
 
 # Register files router
 app.include_router(files_router, prefix="/files")
+if web_ui_enabled:
+    app.include_router(llm_router, prefix="/llm")
 
 # Mount MCP server to `/pixelle` path
 app.mount("/pixelle", mcp_app)
 
-# Transfer all middleware into our app
-for middleware in chainlit_app.user_middleware:
-    app.add_middleware(middleware.cls, **middleware.kwargs)
+if web_ui_enabled:
+    # Transfer all middleware into our app
+    for middleware in chainlit_app.user_middleware:
+        app.add_middleware(middleware.cls, **middleware.kwargs)
+
+# Send MCP requests straight to the MCP app, skipping all UI middleware (added last = outermost)
+if settings.mcp_lean_stack and web_ui_enabled:
+    app.add_middleware(MCPFastPathMiddleware, mcp_app=mcp_app, prefix="/pixelle")
 
-# Copy all routes that are in Chainlit's app into our app, excluding duplicates
-fastapi_standard_paths = {'/openapi.json', '/docs', '/docs/oauth2-redirect', '/redoc'}
-for route in chainlit_app.routes:
-    # Skip routes that would conflict with FastAPI's standard documentation routes
-    if hasattr(route, 'path') and route.path in fastapi_standard_paths:
-        continue
-    app.router.routes.append(route)
+if web_ui_enabled:
+    # Copy all routes that are in Chainlit's app into our app, excluding duplicates
+    fastapi_standard_paths = {'/openapi.json', '/docs', '/docs/oauth2-redirect', '/redoc'}
+    for route in chainlit_app.routes:
+        # Skip routes that would conflict with FastAPI's standard documentation routes
+        if hasattr(route, 'path') and route.path in fastapi_standard_paths:
+            continue
+        app.router.routes.append(route)
 
 
 # Override the default OpenAPI generation with custom function
@@ -107,7 +181,18 @@ app.openapi = create_custom_openapi_function(app)
 
 def main():
     import uvicorn
-    print("🚀 Start server...")
+    print("🚀 Start server..." if web_ui_enabled else "🚀 Start MCP server (MCP-only mode)...")
+    if multi_worker:
+        # Workers import the app themselves, uvicorn needs the import string
+        print(f"👥 Running {settings.workers} workers")
+        uvicorn.run(
+            "pixelle.main:app",
+            host=settings.host,
+            port=settings.port,
+            reload=False,
+            workers=settings.workers,
+        )
+        return
     uvicorn.run(
         app,
         host=settings.host,
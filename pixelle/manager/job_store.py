@@ -0,0 +1,222 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+Workflow job store - records workflow executions in a SQLite database (WAL mode),
+so job state is shared by all server workers and survives restarts.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pixelle.logger import logger
+from pixelle.settings import settings
+from pixelle.utils.os_util import get_data_path
+
+JOB_STORE_PATH = get_data_path("jobs.db")
+
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_INTERRUPTED = "interrupted"
+
+# Finished jobs are pruned at startup and after every this many created jobs of a worker
+PRUNE_EVERY_JOBS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    workflow TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT,
+    result TEXT,
+    error TEXT,
+    worker_pid INTEGER,
+    worker_started REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at);
+"""
+
+
+def _process_started(pid: int) -> Optional[float]:
+    """Start time of a process, with its PID it identifies the process even if the PID
+    is reused later (e.g. a restarted container gets the same PID again)"""
+    import psutil
+
+    try:
+        return round(psutil.Process(pid).create_time(), 3)
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+
+
+class JobStore:
+    """Shared store of workflow jobs
+
+    Every worker process opens its own connections; SQLite WAL lets readers run
+    concurrently with a single writer, so workers never block each other on reads.
+    """
+
+    def __init__(self, db_path: str | Path = JOB_STORE_PATH):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self._created_jobs = 0
+        # (pid, start time) of the current worker process
+        self._worker: Optional[tuple] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the connection of the current thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(_SCHEMA)
+                    self._initialized = True
+        return conn
+
+    def _worker_identity(self) -> tuple:
+        pid = os.getpid()
+        if self._worker is None or self._worker[0] != pid:
+            self._worker = (pid, _process_started(pid))
+        return self._worker
+
+    def _create_job(self, workflow: str, params: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        worker_pid, worker_started = self._worker_identity()
+        self._connect().execute(
+            "INSERT INTO jobs (job_id, workflow, status, params, worker_pid, worker_started, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, workflow, JOB_STATUS_RUNNING, json.dumps(params, ensure_ascii=False, default=str),
+             worker_pid, worker_started, now, now),
+        )
+        self._created_jobs += 1
+        if self._created_jobs % PRUNE_EVERY_JOBS == 0:
+            self._prune()
+        return job_id
+
+    def _finish_job(self, job_id: str, status: str, result: Optional[str], error: Optional[str]):
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE job_id = ?",
+            (status, result, error, time.time(), job_id),
+        )
+
+    def _get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _list_jobs(self, status: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        if status:
+            rows = self._connect().execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit))
+        else:
+            rows = self._connect().execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows.fetchall()]
+
+    def _mark_interrupted(self) -> int:
+        """Mark running jobs of worker processes that no longer exist as interrupted
+
+        A worker is identified by its PID and start time, a live process that reuses the
+        PID of an exited worker does not keep that worker's jobs running.
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT DISTINCT worker_pid, worker_started FROM jobs WHERE status = ?", (JOB_STATUS_RUNNING,)
+        ).fetchall()
+        count = 0
+        for row in rows:
+            pid, started = row["worker_pid"], row["worker_started"]
+            if pid and started is not None and _process_started(pid) == started:
+                continue
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+                "WHERE status = ? AND worker_pid IS ? AND worker_started IS ?",
+                (JOB_STATUS_INTERRUPTED, "Server worker exited before the job finished", time.time(),
+                 JOB_STATUS_RUNNING, pid, started),
+            )
+            count += cursor.rowcount
+        return count
+
+    def _prune(self) -> int:
+        """Delete finished jobs beyond the configured retention"""
+        conn = self._connect()
+        count = 0
+        if settings.job_retention_days > 0:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status != ? AND created_at < ?",
+                (JOB_STATUS_RUNNING, time.time() - settings.job_retention_days * 86400),
+            )
+            count += cursor.rowcount
+        if settings.job_retention_max_rows > 0:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status != ? AND job_id NOT IN "
+                "(SELECT job_id FROM jobs WHERE status != ? ORDER BY created_at DESC LIMIT ?)",
+                (JOB_STATUS_RUNNING, JOB_STATUS_RUNNING, settings.job_retention_max_rows),
+            )
+            count += cursor.rowcount
+        return count
+
+    async def create_job(self, workflow: str, params: Dict[str, Any]) -> str:
+        """Record a started workflow job
+
+        Returns:
+            Job ID
+        """
+        return await asyncio.to_thread(self._create_job, workflow, params)
+
+    async def finish_job(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None):
+        """Record the final status of a workflow job"""
+        await asyncio.to_thread(self._finish_job, job_id, status, result, error)
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by ID"""
+        return await asyncio.to_thread(self._get_job, job_id)
+
+    async def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """List most recent jobs, optionally filtered by status"""
+        return await asyncio.to_thread(self._list_jobs, status, limit)
+
+    def list_jobs_sync(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """List most recent jobs from synchronous code (CLI)"""
+        return self._list_jobs(status, limit)
+
+    async def mark_interrupted(self) -> int:
+        """Mark running jobs left behind by exited workers as interrupted, and prune
+        finished jobs beyond the retention
+
+        Returns:
+            Number of jobs marked
+        """
+        try:
+            interrupted = await asyncio.to_thread(self._mark_interrupted)
+        except Exception as e:
+            logger.warning(f"Failed to clean up interrupted jobs: {e}")
+            return 0
+        try:
+            pruned = await asyncio.to_thread(self._prune)
+            if pruned:
+                logger.info(f"Pruned {pruned} finished jobs beyond the retention")
+        except Exception as e:
+            logger.warning(f"Failed to prune finished jobs: {e}")
+        return interrupted
+
+
+# Global job store instance
+job_store = JobStore()
@@ -2,141 +2,89 @@
 # This project is licensed under the MIT License (SPDX-License-identifier: MIT).
 
 from datetime import datetime
+import asyncio
 import os
 import time
 import re
 import json
-import tempfile
 from pathlib import Path
 from typing import Dict, Any, Optional
-from pydantic import Field
 from pixelle.logger import logger
-from pixelle.mcp_core import mcp
+from pixelle.mcp_core import WORKFLOW_TOOL_TAG, mcp, notify_tool_list_changed
 from pixelle.utils.os_util import get_data_path
 from pixelle.comfyui.workflow_parser import WorkflowParser, WorkflowMetadata
-from pixelle.comfyui.facade import execute_workflow
+from pixelle.comfyui.runninghub_client import close_runninghub_client
+from pixelle.manager.workflow_manifest import WorkflowManifest
+from pixelle.manager.workflow_tool import WorkflowTool
+from pixelle.settings import settings
 from pixelle.utils.runninghub_util import is_runninghub_workflow, fetch_runninghub_workflow_metadata
 
 CUSTOM_WORKFLOW_DIR = get_data_path("custom_workflows")
 os.makedirs(CUSTOM_WORKFLOW_DIR, exist_ok=True)
 
+WORKFLOW_MANIFEST_PATH = get_data_path("workflow_manifest.json")
+
 class WorkflowManager:
     """Workflow manager, support dynamic loading and hot update"""
     
-    def __init__(self, workflows_dir: str = CUSTOM_WORKFLOW_DIR):
+    def __init__(self, workflows_dir: str = CUSTOM_WORKFLOW_DIR, manifest_path: str = WORKFLOW_MANIFEST_PATH):
         self.workflows_dir = Path(workflows_dir)
         self.loaded_workflows = {}
+        self.manifest = WorkflowManifest(manifest_path)
 
     
-    def parse_workflow_metadata(self, workflow_path: Path, tool_name: str = None) -> Optional[WorkflowMetadata]:
+    async def parse_workflow_metadata(self, workflow_path: Path, tool_name: str = None) -> Optional[WorkflowMetadata]:
         """Parse workflow metadata using new workflow parser"""
         try:
+            tool_name = tool_name or workflow_path.stem
+            
             # Check if this is a RunningHub workflow file
-            if is_runninghub_workflow(workflow_path):
-                # Import asyncio for running async function
-                import asyncio
-
-                tool_name = tool_name or workflow_path.stem
-                # Run the async function
-                try:
-                    loop = asyncio.get_running_loop()
-                    # If we're already in an async context, create a new task
-                    import concurrent.futures
-                    with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future = executor.submit(asyncio.run, fetch_runninghub_workflow_metadata(workflow_path, tool_name))
-                        return future.result()
-                except RuntimeError:
-                    # No running loop, we can use asyncio.run
-                    return asyncio.run(fetch_runninghub_workflow_metadata(workflow_path, tool_name))
-            else:
-                # Standard ComfyUI workflow
+            if await asyncio.to_thread(is_runninghub_workflow, workflow_path):
+                # Uses the local cache when fresh, fetches from RunningHub otherwise.
+                # Not served from the manifest, so the cache TTL and `pixelle workflow refresh` apply.
+                return await fetch_runninghub_workflow_metadata(workflow_path, tool_name)
+            
+            # Only files in the workflow directory are tracked, downloaded temp files are not
+            use_manifest = workflow_path.parent.resolve() == self.workflows_dir.resolve()
+            if use_manifest:
+                metadata = await asyncio.to_thread(self.manifest.lookup, workflow_path, tool_name)
+                if metadata:
+                    logger.debug(f"Workflow unchanged, using manifest metadata: {workflow_path.name}")
+                    self.manifest.refresh_stat(workflow_path)
+                    return metadata
+            
+            # Standard ComfyUI workflow, parsed in a worker thread
+            def parse_local() -> tuple[Optional[WorkflowMetadata], bytes]:
+                content = workflow_path.read_bytes()
                 parser = WorkflowParser()
-                metadata = parser.parse_workflow_file(str(workflow_path), tool_name)
-                return metadata
+                return parser.parse_workflow(json.loads(content), tool_name), content
+            
+            metadata, content = await asyncio.to_thread(parse_local)
+            if metadata and use_manifest:
+                self.manifest.update(workflow_path, metadata, content)
+            return metadata
         except Exception as e:
             logger.error(f"Failed to parse workflow metadata for {workflow_path}: {e}")
             return None
     
     
-    def _generate_params_str(self, params: Dict[str, Any]) -> str:
-        """Generate function parameter string"""
-        # Separate required parameters and optional parameters, ensure parameter order is correct
-        required_params = []
-        optional_params = []
-        
-        for param_name, param in params.items():
-            # Directly use user-provided description
-            description = param.description or ''
-            
-            # Generate Field parameter list
-            field_args = [f"description={repr(description)}"]
-            if param.default is not None:
-                field_args.append(f"default={repr(param.default)}")
-            
-            # Generate complete parameter definition
-            param_str = f"{param_name}: {param.type} = Field({', '.join(field_args)})"
-            
-            # Classify parameters based on whether they have default values
-            if param.default is not None:
-                optional_params.append(param_str)
-            else:
-                required_params.append(param_str)
-        
-        # Required parameters first, optional parameters last
-        return ", ".join(required_params + optional_params)
-    
-    def _generate_workflow_function(self, title: str, params_str: str) -> tuple[str, str]:
-        """Generate the workflow execution function code
-        
-        Returns:
-            tuple: (function_code, workflow_path) - Function code and workflow path
-        """
-        final_workflow_path = os.path.join(CUSTOM_WORKFLOW_DIR, f"{title}.json")
-        
-        template = '''async def {title}({params_str}):
-    try:
-        # Get the passed parameters (excluding special parameters)
-        params = {{k: v for k, v in locals().items() if not k.startswith('_')}}
-        
-        # Execute the workflow - workflow_path is retrieved from the external environment
-        result = await execute_workflow(WORKFLOW_PATH, params)
-        
-        # Convert the result to a format friendly to LLM
-        if result.status == "completed":
-            return result.to_llm_result()
-        else:
-            return "Workflow execution failed: " + str(result.msg or result.status)
-            
-    except Exception as e:
-        logger.error("Workflow execution failed {title_safe}: " + str(e), exc_info=True)
-        return "Workflow execution exception: " + str(e)
-'''
-
-        function_code = template.format(
-            title=title,
-            params_str=params_str,
-            title_safe=repr(title)
-        )
-        
-        return function_code, final_workflow_path
-
-
-    def _register_workflow(self, title: str, workflow_handler, metadata: WorkflowMetadata) -> None:
+    def _register_workflow(self, title: str, workflow_tool: WorkflowTool, metadata: WorkflowMetadata) -> None:
         """Register and record workflow"""
         
         # Register as MCP tool
-        mcp.tool(workflow_handler)
+        mcp.tool(workflow_tool.function, tags={WORKFLOW_TOOL_TAG})
         
         # Record workflow information
         self.loaded_workflows[title] = {
-            "function": workflow_handler,
+            "function": workflow_tool.function,
+            "tool": workflow_tool,
             "metadata": metadata.model_dump(),
             "loaded_at": datetime.now()
         }
         
         logger.info(f"Successfully loaded workflow: {title}")
     
-    def _save_workflow_if_needed(self, workflow_path: Path, title: str):
+    def _save_workflow_if_needed(self, workflow_path: Path, title: str, metadata: WorkflowMetadata):
         """If needed, save workflow file to workflow directory"""
         target_workflow_path = self.workflows_dir / f"{title}.json"
         try:
@@ -152,17 +100,25 @@ class WorkflowManager:
             import shutil
             shutil.copy2(workflow_path, target_workflow_path)
             logger.info(f"Workflow file saved to: {target_workflow_path}")
+            
+            # Record the copy, so the watcher sees it as unchanged instead of loading the tool again.
+            # RunningHub workflows are recorded without metadata, it must come from the RunningHub cache.
+            content = target_workflow_path.read_bytes()
+            if is_runninghub_workflow(target_workflow_path):
+                self.manifest.record_stat(target_workflow_path, content)
+            else:
+                self.manifest.update(target_workflow_path, metadata, content)
         except Exception as e:
             logger.warning(f"Failed to save workflow file: {e}")
         
 
-    def load_workflow(self, workflow_path: Path | str, tool_name: str = None) -> Dict:
+    async def load_workflow(self, workflow_path: Path | str, tool_name: str = None, save_manifest: bool = True) -> Dict:
         """Load single workflow
         
         Args:
             workflow_path: Workflow file path
             tool_name: Tool name, priority higher than workflow file name
-            save_workflow_if_not_exists: Whether to save workflow file to workflow directory (if target file does not exist)
+            save_manifest: Whether to persist the manifest after loading, batch loads save it once at the end
         """
         try:
             if isinstance(workflow_path, str):
@@ -177,7 +133,7 @@ class WorkflowManager:
                 }
             
             # Use new parser to parse workflow metadata
-            metadata = self.parse_workflow_metadata(workflow_path, tool_name)
+            metadata = await self.parse_workflow_metadata(workflow_path, tool_name)
             if not metadata:
                 logger.error(f"Cannot parse workflow metadata: {workflow_path}")
                 return {
@@ -196,32 +152,18 @@ class WorkflowManager:
                     "error": f"Tool name '{title}' format is invalid. Only letters, digits, underscores, dots, and hyphens are allowed."
                 }
             
-            # Generate parameter string
-            params_str = self._generate_params_str(metadata.params)
-            
-            # Create tool handler function
-            exec_locals = {}
-            
-            # Generate workflow execution function
-            func_def, target_workflow_path = self._generate_workflow_function(title, params_str)
-            # Execute function definition, pass workflow path as variable to execution environment
-            exec(func_def, {
-                "metadata": metadata, 
-                "logger": logger, 
-                "Field": Field,
-                "execute_workflow": execute_workflow,
-                "WORKFLOW_PATH": target_workflow_path,
-            }, exec_locals)
-            
-            dynamic_function = exec_locals[title]
-            if metadata.description:
-                dynamic_function.__doc__ = metadata.description
+            # Build tool function from metadata, executed against the copy in the workflow directory
+            workflow_tool = WorkflowTool.from_metadata(metadata, self.workflows_dir / f"{title}.json")
             
             # Register and record workflow
-            self._register_workflow(title, dynamic_function, metadata)
+            self._register_workflow(title, workflow_tool, metadata)
             
             # Save workflow file to workflow directory
-            self._save_workflow_if_needed(workflow_path, title)
+            self._save_workflow_if_needed(workflow_path, title, metadata)
+            
+            # Persist the manifest entry, so restarts and other workers skip parsing this file
+            if save_manifest:
+                self.manifest.save()
             
             logger.debug(f"Workflow '{title}' successfully loaded as MCP tool")
             return {
@@ -258,6 +200,8 @@ class WorkflowManager:
             
             # Delete from record
             del self.loaded_workflows[workflow_name]
+            self.manifest.remove(f"{workflow_name}.json")
+            self.manifest.save()
             
             logger.info(f"Successfully unloaded workflow: {workflow_name}")
             
@@ -275,7 +219,7 @@ class WorkflowManager:
             }
     
     
-    def load_all_workflows(self) -> Dict:
+    async def load_all_workflows(self) -> Dict:
         """Load all workflows"""
         results = {
             "success": [],
@@ -285,9 +229,16 @@ class WorkflowManager:
         # Ensure directory exists
         self.workflows_dir.mkdir(parents=True, exist_ok=True)
         
-        # Load all JSON files
-        for json_file in self.workflows_dir.glob("*.json"):
-            result = self.load_workflow(json_file)
+        # Load all JSON files in parallel, bounded so RunningHub is not flooded on cold start
+        json_files = sorted(self.workflows_dir.glob("*.json"))
+        semaphore = asyncio.Semaphore(max(1, settings.workflow_load_concurrency))
+        
+        async def load_one(json_file: Path) -> tuple[Path, Dict]:
+            async with semaphore:
+                return json_file, await self.load_workflow(json_file, save_manifest=False)
+        
+        start_time = time.time()
+        for json_file, result in await asyncio.gather(*(load_one(f) for f in json_files)):
             if result["success"]:
                 results["success"].append(result["workflow"])
             else:
@@ -296,6 +247,80 @@ class WorkflowManager:
                     "error": result["error"]
                 })
         
+        # Persist manifest so unchanged workflows are registered without parsing on next boot
+        self.manifest.prune({f.name for f in json_files})
+        self.manifest.save()
+        
+        logger.info(f"Loaded {len(json_files)} workflow files in {time.time() - start_time:.2f}s")
+        return results
+    
+    def load_all_workflows_sync(self) -> Dict:
+        """Load all workflows from synchronous code (CLI), must not be called from a running event loop"""
+        async def load():
+            try:
+                return await self.load_all_workflows()
+            finally:
+                # The pooled session is bound to this short-lived loop
+                await close_runninghub_client()
+        
+        return asyncio.run(load())
+    
+    def _unregister_workflow(self, workflow_name: str) -> bool:
+        """Remove workflow tool from MCP server, the workflow file is left untouched"""
+        if workflow_name not in self.loaded_workflows:
+            return False
+        try:
+            mcp.remove_tool(workflow_name)
+        except Exception:
+            pass  # Tool already gone
+        del self.loaded_workflows[workflow_name]
+        logger.info(f"Unregistered workflow: {workflow_name}")
+        return True
+    
+    async def sync_workflow_files(self, changed_files: list[Path], removed_names: list[str]) -> Dict:
+        """Apply workflow file changes detected on disk
+        
+        Only changed files are parsed again, files whose content hash did not change are
+        skipped. Re-registering a tool replaces it in place, so clients never see it missing.
+        
+        Args:
+            changed_files: Added or modified workflow files
+            removed_names: Names of workflows whose file was deleted
+            
+        Returns:
+            Dict with "updated", "removed", "unchanged" and "failed" lists
+        """
+        results = {"updated": [], "removed": [], "unchanged": [], "failed": []}
+        semaphore = asyncio.Semaphore(max(1, settings.workflow_load_concurrency))
+        
+        async def sync_one(workflow_path: Path):
+            async with semaphore:
+                if not workflow_path.exists():
+                    return
+                title = workflow_path.stem
+                if title in self.loaded_workflows:
+                    # Touched but not modified (e.g. editor save without changes)
+                    if await asyncio.to_thread(self.manifest.is_unchanged, workflow_path):
+                        self.manifest.refresh_stat(workflow_path)
+                        results["unchanged"].append(title)
+                        return
+                result = await self.load_workflow(workflow_path, save_manifest=False)
+                if result["success"]:
+                    results["updated"].append(result["workflow"])
+                else:
+                    results["failed"].append({"file": workflow_path.name, "error": result["error"]})
+        
+        await asyncio.gather(*(sync_one(Path(f)) for f in changed_files))
+        
+        for workflow_name in removed_names:
+            self.manifest.remove(f"{workflow_name}.json")
+            if self._unregister_workflow(workflow_name):
+                results["removed"].append(workflow_name)
+        
+        self.manifest.save()
+        
+        if results["updated"] or results["removed"]:
+            await notify_tool_list_changed()
         return results
     
     def get_workflow_status(self) -> Dict:
@@ -311,21 +336,22 @@ class WorkflowManager:
             }
         }
     
-    def reload_all_workflows(self) -> Dict:
-        """Manually reload all workflows"""
+    async def reload_all_workflows(self) -> Dict:
+        """Manually reload all workflows
+        
+        Tools are re-registered in place rather than cleared first, so clients keep a
+        complete tool list while the reload runs. Tools whose file is gone are removed.
+        """
         logger.info("Start manually reloading all workflows")
         
-        # Clear all loaded workflows
+        existing = {f.stem for f in self.workflows_dir.glob("*.json")}
         for workflow_name in list(self.loaded_workflows.keys()):
-            try:
-                mcp.remove_tool(workflow_name)
-            except:
-                pass  # Ignore remove failure
-        
-        self.loaded_workflows.clear()
+            if workflow_name not in existing:
+                self._unregister_workflow(workflow_name)
         
         # Reload all workflows
-        results = self.load_all_workflows()
+        results = await self.load_all_workflows()
+        await notify_tool_list_changed()
         
         logger.info(f"Manually reloading completed: success {len(results['success'])}, failed {len(results['failed'])}")
         
@@ -340,11 +366,9 @@ class WorkflowManager:
 
 
 # Create workflow manager instance
+# Workflows are loaded on the server's event loop during app startup (see `pixelle.main`),
+# CLI commands use `load_all_workflows_sync`
 workflow_manager = WorkflowManager()
 
-# Initial load all workflows
-load_results = workflow_manager.load_all_workflows()
-logger.info(f"Initial workflow load results: {load_results}")
-
 # Export module-level variables and instance
 __all__ = ['workflow_manager', 'WorkflowManager', 'CUSTOM_WORKFLOW_DIR'] 
\ No newline at end of file
@@ -0,0 +1,163 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+Workflow manifest - persists parsed workflow metadata keyed by file fingerprint,
+so that unchanged workflows can be registered on the next boot without parsing them again.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from pixelle.logger import logger
+from pixelle.comfyui.workflow_parser import WorkflowMetadata
+
+MANIFEST_VERSION = 1
+
+
+def compute_file_hash(data: bytes) -> str:
+    """Compute the content hash used to detect changed workflow files"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class WorkflowManifest:
+    """Manifest of parsed workflows: file name -> (size, mtime, hash, metadata)"""
+
+    def __init__(self, manifest_path: str | Path):
+        self.manifest_path = Path(manifest_path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._changed: set[str] = set()
+        self.load()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        """Read manifest entries from disk, an unreadable or outdated manifest is ignored"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                return data.get("workflows", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to read workflow manifest {self.manifest_path}: {e}")
+        return {}
+
+    def load(self):
+        """Load manifest from disk"""
+        self.entries = self._read()
+        self._dirty = False
+        self._changed = set()
+
+    def save(self):
+        """Write manifest to disk if it changed
+
+        Entries written by other server workers since our last load are kept,
+        only the entries changed by this process overwrite them.
+        """
+        if not self._dirty:
+            return
+        try:
+            merged = self._read()
+            for file_name in self._changed:
+                if file_name in self.entries:
+                    merged[file_name] = self.entries[file_name]
+                else:
+                    merged.pop(file_name, None)
+            self.entries = merged
+
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial file
+            temp_path = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": MANIFEST_VERSION, "workflows": self.entries}, f, ensure_ascii=False)
+            os.replace(temp_path, self.manifest_path)
+            self._dirty = False
+            self._changed = set()
+        except Exception as e:
+            logger.warning(f"Failed to write workflow manifest {self.manifest_path}: {e}")
+
+    def _mark_changed(self, file_name: str):
+        self._changed.add(file_name)
+        self._dirty = True
+
+    def _unchanged_entry(self, workflow_path: Path) -> Optional[Dict[str, Any]]:
+        """Get the entry of a workflow file if the file did not change since it was recorded
+
+        Unchanged size and mtime are trusted without reading the file; otherwise the
+        file content hash decides.
+        """
+        entry = self.entries.get(workflow_path.name)
+        if not entry:
+            return None
+
+        stat = workflow_path.stat()
+        if entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+            if compute_file_hash(workflow_path.read_bytes()) != entry.get("sha256"):
+                return None
+        return entry
+
+    def is_unchanged(self, workflow_path: Path) -> bool:
+        """Check whether a workflow file is unchanged since it was recorded. Safe to call from a worker thread."""
+        return self._unchanged_entry(workflow_path) is not None
+
+    def lookup(self, workflow_path: Path, tool_name: str) -> Optional[WorkflowMetadata]:
+        """Look up cached metadata for a workflow file. Safe to call from a worker thread."""
+        entry = self._unchanged_entry(workflow_path)
+        if not entry or "metadata" not in entry:
+            # Files recorded without metadata (RunningHub workflows) are always parsed again
+            return None
+
+        try:
+            metadata = WorkflowMetadata(**entry["metadata"])
+            metadata.title = tool_name
+            return metadata
+        except Exception as e:
+            logger.debug(f"Invalid manifest entry for {workflow_path.name}: {e}")
+            return None
+
+    def update(self, workflow_path: Path, metadata: WorkflowMetadata, content: bytes):
+        """Record parsed metadata for a workflow file"""
+        stat = workflow_path.stat()
+        self.entries[workflow_path.name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": compute_file_hash(content),
+            "metadata": metadata.model_dump(),
+        }
+        self._mark_changed(workflow_path.name)
+
+    def record_stat(self, workflow_path: Path, content: bytes):
+        """Record a workflow file without metadata, only to detect whether it changed"""
+        stat = workflow_path.stat()
+        self.entries[workflow_path.name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": compute_file_hash(content),
+        }
+        self._mark_changed(workflow_path.name)
+
+    def refresh_stat(self, workflow_path: Path):
+        """Remember the current size/mtime of a file whose content hash matched"""
+        entry = self.entries.get(workflow_path.name)
+        if not entry:
+            return
+        stat = workflow_path.stat()
+        if entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self._mark_changed(workflow_path.name)
+
+    def remove(self, file_name: str):
+        """Remove a workflow file from the manifest"""
+        if self.entries.pop(file_name, None) is not None:
+            self._mark_changed(file_name)
+
+    def prune(self, existing_file_names: set[str]):
+        """Remove entries for workflow files that no longer exist"""
+        for file_name in list(self.entries.keys()):
+            if file_name not in existing_file_names:
+                self.remove(file_name)
@@ -0,0 +1,140 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+Workflow tool factory - builds MCP tool functions directly from workflow metadata.
+
+The tool signature is assembled from `inspect.Parameter` objects instead of generating
+and exec-ing source code, so registering hundreds of workflows stays cheap and the
+resulting tools can be pickled and introspected.
+"""
+
+import asyncio
+import builtins
+import inspect
+from functools import lru_cache
+from pathlib import Path
+from typing import Annotated, Any, Dict, Optional
+
+from pydantic import Field
+
+from pixelle.comfyui.facade import execute_workflow
+from pixelle.comfyui.workflow_parser import WorkflowMetadata, WorkflowParam
+from pixelle.logger import logger
+from pixelle.manager.job_store import job_store
+
+
+@lru_cache(maxsize=None)
+def _resolve_type(type_name: str) -> type:
+    """Resolve a parameter type name (e.g. "int") to a type, unknown names fall back to str"""
+    resolved = getattr(builtins, type_name, None)
+    return resolved if isinstance(resolved, type) else str
+
+
+@lru_cache(maxsize=1024)
+def _param_annotation(type_name: str, description: str) -> Any:
+    """Build the annotation of a tool parameter, shared between tools with identical params"""
+    return Annotated[_resolve_type(type_name), Field(description=description)]
+
+
+class WorkflowTool:
+    """A workflow exposed as MCP tool
+
+    Holds only plain data (name, workflow path, parameters), the tool function and its
+    signature are built lazily and dropped when pickled.
+    """
+
+    def __init__(self, name: str, workflow_path: str | Path,
+                 params: Dict[str, WorkflowParam], description: Optional[str] = None):
+        self.name = name
+        self.workflow_path = str(workflow_path)
+        self.params = params
+        self.description = description
+        self._signature: Optional[inspect.Signature] = None
+        self._function = None
+
+    @classmethod
+    def from_metadata(cls, metadata: WorkflowMetadata, workflow_path: str | Path) -> "WorkflowTool":
+        """Create workflow tool from parsed workflow metadata"""
+        return cls(metadata.title, workflow_path, metadata.params, metadata.description)
+
+    @property
+    def signature(self) -> inspect.Signature:
+        """Signature of the tool function, required parameters first"""
+        if self._signature is None:
+            required_params = []
+            optional_params = []
+            for param_name, param in self.params.items():
+                annotation = _param_annotation(param.type, param.description or '')
+                if param.default is not None:
+                    optional_params.append(inspect.Parameter(
+                        param_name, inspect.Parameter.KEYWORD_ONLY,
+                        default=param.default, annotation=annotation))
+                else:
+                    required_params.append(inspect.Parameter(
+                        param_name, inspect.Parameter.KEYWORD_ONLY, annotation=annotation))
+            self._signature = inspect.Signature(required_params + optional_params)
+        return self._signature
+
+    @property
+    def function(self):
+        """Async function registered as MCP tool, arguments are validated against `signature`"""
+        if self._function is None:
+            async def workflow_tool(**params):
+                return await self.run(params)
+
+            signature = self.signature
+            workflow_tool.__name__ = self.name
+            workflow_tool.__qualname__ = self.name
+            workflow_tool.__doc__ = self.description
+            workflow_tool.__signature__ = signature
+            workflow_tool.__annotations__ = {p.name: p.annotation for p in signature.parameters.values()}
+            workflow_tool.workflow_tool = self
+            self._function = workflow_tool
+        return self._function
+
+    async def run(self, params: Dict[str, Any]) -> str:
+        """Execute the workflow with tool arguments, the job is recorded in the shared job store"""
+        job_id = await self._record_job_start(params)
+        try:
+            result = await execute_workflow(self.workflow_path, params)
+            await self._record_job_finish(job_id, result.status, result.to_llm_result(), result.msg)
+
+            # Convert the result to a format friendly to LLM
+            if result.status == "completed":
+                return result.to_llm_result()
+            else:
+                return "Workflow execution failed: " + str(result.msg or result.status)
+
+        except asyncio.CancelledError:
+            await self._record_job_finish(job_id, "cancelled", None, None)
+            raise
+        except Exception as e:
+            logger.error(f"Workflow execution failed {self.name!r}: {e}", exc_info=True)
+            await self._record_job_finish(job_id, "error", None, str(e))
+            return "Workflow execution exception: " + str(e)
+
+    async def _record_job_start(self, params: Dict[str, Any]) -> Optional[str]:
+        try:
+            return await job_store.create_job(self.name, params)
+        except Exception as e:
+            logger.warning(f"Failed to record job for workflow {self.name!r}: {e}")
+            return None
+
+    async def _record_job_finish(self, job_id: Optional[str], status: str,
+                                 result: Optional[str], error: Optional[str]):
+        if job_id is None:
+            return
+        try:
+            await job_store.finish_job(job_id, status, result, error)
+        except Exception as e:
+            logger.warning(f"Failed to update job {job_id}: {e}")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_signature"] = None
+        state["_function"] = None
+        return state
+
+    def __repr__(self) -> str:
+        return f"WorkflowTool(name={self.name!r}, workflow_path={self.workflow_path!r})"
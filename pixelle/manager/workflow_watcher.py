@@ -0,0 +1,97 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+Workflow directory watcher - picks up added, changed and removed workflow files
+and re-registers only the affected MCP tools.
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from pixelle.logger import logger
+from pixelle.settings import settings
+
+FileStat = Tuple[int, int]  # (size, mtime_ns)
+
+
+class WorkflowWatcher:
+    """Poll the workflow directory and sync changes into the workflow manager
+
+    Changes are debounced: a burst of writes (e.g. copying many files) is applied
+    once the directory has been quiet for `debounce` seconds.
+    """
+
+    def __init__(self, manager, interval: float = None, debounce: float = None):
+        self.manager = manager
+        self.workflows_dir = Path(manager.workflows_dir)
+        self.interval = interval or settings.workflow_watch_interval
+        self.debounce = debounce if debounce is not None else settings.workflow_watch_debounce
+        self._task: Optional[asyncio.Task] = None
+
+    def _scan(self) -> Dict[str, FileStat]:
+        """Snapshot workflow files in the directory"""
+        snapshot = {}
+        try:
+            with os.scandir(self.workflows_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json") or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        return snapshot
+
+    def start(self):
+        """Start watching in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Watching workflow directory for changes: {self.workflows_dir}")
+
+    async def stop(self):
+        """Stop watching"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        applied = await asyncio.to_thread(self._scan)
+        seen = applied
+        last_change_at = 0.0
+
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                current = await asyncio.to_thread(self._scan)
+                now = time.monotonic()
+                if current != seen:
+                    # Still changing, wait for the burst to settle
+                    seen = current
+                    last_change_at = now
+                    if self.debounce > 0:
+                        continue
+
+                if seen != applied and now - last_change_at >= self.debounce:
+                    await self._apply(applied, seen)
+                    applied = seen
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Workflow watcher error: {e}", exc_info=True)
+
+    async def _apply(self, before: Dict[str, FileStat], after: Dict[str, FileStat]):
+        """Sync the difference between two snapshots into the workflow manager"""
+        changed = [self.workflows_dir / name for name, stat in after.items() if before.get(name) != stat]
+        removed = [Path(name).stem for name in before.keys() - after.keys()]
+
+        logger.info(f"Workflow files changed: {len(changed)} added/modified, {len(removed)} removed")
+        results = await self.manager.sync_workflow_files(changed, removed)
+        logger.info(f"Workflow hot reload results: {results}")
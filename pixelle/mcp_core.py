@@ -1,9 +1,221 @@
 # Copyright (C) 2025 AIDC-AI
 # This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+import asyncio
+import base64
+import functools
+import hashlib
+import json
+import time
+import weakref
+from dataclasses import dataclass
+from typing import List, Optional
+
 from fastmcp import FastMCP
+from fastmcp.server.context import Context
+from fastmcp.server.middleware import Middleware, MiddlewareContext, CallNext
+from mcp import types
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.exceptions import McpError
+from mcp.types import Tool as MCPTool
+
+from pixelle.logger import logger
+from pixelle.settings import settings
+
+
+class SessionTrackingMiddleware(Middleware):
+    """Remember client sessions so that server-side tool changes can be broadcast to them"""
+
+    def __init__(self):
+        self.sessions = weakref.WeakSet()
+
+    async def on_request(self, context: MiddlewareContext, call_next: CallNext):
+        if context.fastmcp_context is not None:
+            try:
+                self.sessions.add(context.fastmcp_context.session)
+            except Exception:
+                pass  # No request context available
+        return await call_next(context)
+
 
 # initialize MCP server
 mcp = FastMCP(
     name="pixelle-mcp-server",
     on_duplicate_tools="replace",
 )
+
+session_tracker = SessionTrackingMiddleware()
+mcp.add_middleware(session_tracker)
+
+
+async def notify_tool_list_changed():
+    """Send `notifications/tools/list_changed` to every known client session
+
+    FastMCP only notifies the session of the current request, changes made outside
+    a request (e.g. file watcher) would otherwise go unnoticed by clients.
+    """
+    for session in list(session_tracker.sessions):
+        try:
+            await session.send_tool_list_changed()
+        except Exception as e:
+            # Session is closed or its stream is gone
+            logger.debug(f"Failed to send tool list changed notification: {e}")
+            session_tracker.sessions.discard(session)
+
+
+# Keys of the catalog ETag in tools/list `_meta`. Clients that send the ETag of the
+# catalog they hold in the request `_meta` get an empty "not modified" result instead.
+CATALOG_ETAG_META_KEY = "pixelle/etag"
+CATALOG_IF_NONE_MATCH_META_KEY = "pixelle/ifNoneMatch"
+CATALOG_NOT_MODIFIED_META_KEY = "pixelle/notModified"
+
+# Tag of the tools generated from workflows, exposed to clients in `_meta._fastmcp.tags`
+WORKFLOW_TOOL_TAG = "workflow"
+
+
+@dataclass
+class ToolCatalogSnapshot:
+    """Tool list of one catalog version with its pre-built tools/list pages"""
+    version: int
+    etag: str
+    tools: List[MCPTool]
+    pages: List[types.ServerResult]
+    page_size: int
+
+
+class ToolCatalog:
+    """Versioned tools/list catalog
+
+    FastMCP builds every tool definition again on each tools/list request, which grows
+    linearly with the number of workflow tools. The catalog builds the definitions and
+    result pages once, and is only rebuilt on the next listing after `invalidate()`
+    (called whenever a tool is registered or unregistered).
+
+    - Each result carries the catalog ETag (a hash of the tool definitions, identical
+      across worker processes) in `_meta`.
+    - With `mcp_tools_page_size` > 0 the catalog is paginated, cursors are bound to
+      the catalog ETag and rejected once the catalog changed.
+    """
+
+    def __init__(self, server: FastMCP):
+        self.server = server
+        self.version = 0
+        self._snapshot: Optional[ToolCatalogSnapshot] = None
+        self._lock = asyncio.Lock()
+
+    # Tool manager methods that change the listed tools, relies on FastMCP internals
+    # (the fastmcp version is pinned in pyproject.toml)
+    TOOL_MUTATORS = ("add_tool", "remove_tool", "add_tool_transformation", "remove_tool_transformation", "mount")
+
+    def install(self):
+        """Serve tools/list requests of the server from this catalog
+        
+        Every tool change of the server invalidates the catalog, whichever code makes it.
+        """
+        self.server._mcp_server.request_handlers[types.ListToolsRequest] = self._handle_list_tools
+        tool_manager = self.server._tool_manager
+        for name in self.TOOL_MUTATORS:
+            setattr(tool_manager, name, self._invalidating(getattr(tool_manager, name)))
+
+    def _invalidating(self, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.invalidate()
+        return wrapper
+
+    def invalidate(self):
+        """Mark the catalog stale, it is rebuilt on the next listing"""
+        self._snapshot = None
+
+    async def get_snapshot(self) -> ToolCatalogSnapshot:
+        """Get the current catalog, rebuilding it if it is stale"""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.page_size == settings.mcp_tools_page_size:
+            return snapshot
+        async with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.page_size != settings.mcp_tools_page_size:
+                snapshot = await self._build()
+                self._snapshot = snapshot
+        return snapshot
+
+    async def _build(self) -> ToolCatalogSnapshot:
+        start = time.perf_counter()
+        async with Context(fastmcp=self.server):
+            # Same tool selection as FastMCP's own handler, middleware included
+            tools = [
+                tool.to_mcp_tool(name=tool.key, include_fastmcp_meta=self.server.include_fastmcp_meta)
+                for tool in await self.server._list_tools()
+            ]
+        serialized = json.dumps(
+            [tool.model_dump(by_alias=True, mode="json", exclude_none=True) for tool in tools],
+            sort_keys=True,
+        )
+        etag = hashlib.sha1(serialized.encode()).hexdigest()[:16]
+        self.version += 1
+
+        page_size = settings.mcp_tools_page_size
+        chunks = [tools[i:i + page_size] for i in range(0, len(tools), page_size)] if page_size > 0 else []
+        chunks = chunks or [tools]
+        pages = []
+        for index, chunk in enumerate(chunks):
+            next_offset = (index + 1) * page_size
+            next_cursor = self._encode_cursor(etag, next_offset) if index + 1 < len(chunks) else None
+            pages.append(types.ServerResult(types.ListToolsResult(
+                tools=chunk,
+                nextCursor=next_cursor,
+                _meta={CATALOG_ETAG_META_KEY: etag},
+            )))
+
+        # Tool definitions the low-level server validates tool call arguments against
+        self.server._mcp_server._tool_cache = {tool.name: tool for tool in tools}
+
+        logger.debug(f"Built tool catalog v{self.version}: {len(tools)} tools, {len(pages)} pages, "
+                     f"{(time.perf_counter() - start) * 1000:.1f}ms")
+        return ToolCatalogSnapshot(self.version, etag, tools, pages, page_size)
+
+    async def _handle_list_tools(self, request: Optional[types.ListToolsRequest]) -> types.ServerResult:
+        try:
+            session_tracker.sessions.add(request_ctx.get().session)
+        except LookupError:
+            pass  # Called outside a request
+
+        snapshot = await self.get_snapshot()
+        params = request.params if request is not None else None
+        if params is None:
+            return snapshot.pages[0]
+
+        if params.meta is not None:
+            client_etag = (params.meta.model_extra or {}).get(CATALOG_IF_NONE_MATCH_META_KEY)
+            if client_etag == snapshot.etag and not params.cursor:
+                return types.ServerResult(types.ListToolsResult(
+                    tools=[],
+                    _meta={CATALOG_ETAG_META_KEY: snapshot.etag, CATALOG_NOT_MODIFIED_META_KEY: True},
+                ))
+
+        if not params.cursor:
+            return snapshot.pages[0]
+        etag, offset = self._decode_cursor(params.cursor)
+        if (etag != snapshot.etag or offset <= 0 or offset >= len(snapshot.tools)
+                or snapshot.page_size <= 0 or offset % snapshot.page_size):
+            raise McpError(types.ErrorData(
+                code=types.INVALID_PARAMS,
+                message="Invalid or expired cursor, the tool list changed. List tools again from the start.",
+            ))
+        return snapshot.pages[offset // snapshot.page_size]
+
+    def _encode_cursor(self, etag: str, offset: int) -> str:
+        return base64.urlsafe_b64encode(f"{etag}:{offset}".encode()).decode()
+
+    def _decode_cursor(self, cursor: str) -> tuple[str, int]:
+        try:
+            etag, _, offset = base64.urlsafe_b64decode(cursor.encode()).decode().partition(":")
+            return etag, int(offset)
+        except Exception:
+            return "", -1
+
+
+tool_catalog = ToolCatalog(mcp)
+tool_catalog.install()
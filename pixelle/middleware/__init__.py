@@ -8,5 +8,6 @@ Middleware package for Pixelle MCP.
 from .static_cache_middleware import StaticCacheMiddleware
 from .html_cdn_replace_middleware import HTMLCDNReplaceMiddleware
 from .app_js_middleware import AppJsMiddleware
+from .mcp_fast_path_middleware import MCPFastPathMiddleware
 
-__all__ = ['StaticCacheMiddleware', 'HTMLCDNReplaceMiddleware', 'AppJsMiddleware']
+__all__ = ['StaticCacheMiddleware', 'HTMLCDNReplaceMiddleware', 'AppJsMiddleware', 'MCPFastPathMiddleware']
@@ -2,57 +2,132 @@
 # This project is licensed under the MIT License (SPDX-License-identifier: MIT).
 
 """
-App.js middleware for development - always serve fresh content for /public/app.js
+App.js middleware - serves /public/app.js from memory with ETag revalidation,
+or always fresh from disk in development mode
 """
 
+import hashlib
+import os
+import time
 from pathlib import Path
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from typing import Optional, Tuple
+
 from starlette.responses import Response
-from starlette.status import HTTP_404_NOT_FOUND
+from starlette.status import HTTP_304_NOT_MODIFIED, HTTP_404_NOT_FOUND
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from pixelle.logger import logger
 from pixelle.utils.os_util import get_src_path
 
+APP_JS_URL = "/public/app.js"
+
+# Min seconds between checks whether app.js changed on disk
+APP_JS_CHECK_INTERVAL = 1.0
 
-class AppJsMiddleware(BaseHTTPMiddleware):
+
+class AppJsMiddleware:
     """
-    Middleware to always serve fresh /public/app.js content without caching.
-    Perfect for development when you need immediate file updates.
+    Middleware to serve /public/app.js.
+
+    - Production mode: file bytes are cached in memory with a content ETag, browsers
+      revalidate on every page load and get a `304` while the file is unchanged. The
+      file is read again only when its mtime changes.
+    - Development mode: fresh content is read on every request and never cached.
     """
-    
-    def __init__(self, app):
-        super().__init__(app)
+
+    def __init__(self, app: ASGIApp, dev_mode: bool = False):
+        """
+        Args:
+            app: The ASGI application
+            dev_mode: Always serve fresh content without caching
+        """
+        self.app = app
+        self.dev_mode = dev_mode
         # Get the path to the app.js file
         self.app_js_path = Path(get_src_path("public/app.js"))
-    
-    async def dispatch(self, request: Request, call_next):
+        # (mtime_ns, content, etag) of the cached file
+        self._cached: Optional[Tuple[int, bytes, str]] = None
+        self._last_check = 0.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process the request and handle /public/app.js specially.
         """
         # Check if this is a request for /public/app.js
-        if request.url.path == "/public/app.js" and request.method == "GET":
-            return await self._serve_app_js(request)
-        
+        if scope["type"] == "http" and scope["path"] == APP_JS_URL and scope["method"] == "GET":
+            if self.dev_mode:
+                response = self._serve_fresh_app_js()
+            else:
+                response = self._serve_cached_app_js(scope)
+            await response(scope, receive, send)
+            return
+
         # For all other requests, continue with normal processing
-        return await call_next(request)
-    
-    async def _serve_app_js(self, request: Request) -> Response:
+        await self.app(scope, receive, send)
+
+    def _serve_cached_app_js(self, scope: Scope) -> Response:
+        """
+        Serve app.js from memory, answering conditional requests with 304.
+        """
+        try:
+            cached = self._load_cached()
+            if cached is None:
+                return self._not_found_response()
+            _, content, etag = cached
+
+            headers = {
+                'ETag': etag,
+                # Revalidate on every page load, unchanged files cost a 304
+                'Cache-Control': 'no-cache',
+            }
+            for name, value in scope["headers"]:
+                if name == b"if-none-match":
+                    client_etags = {tag.strip() for tag in value.decode("latin-1").split(",")}
+                    if etag in client_etags or f"W/{etag}" in client_etags or "*" in client_etags:
+                        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+                    break
+
+            return Response(content=content, media_type="application/javascript", headers=headers)
+
+        except Exception as e:
+            logger.error(f"Error serving app.js: {e}")
+            return self._error_response(e)
+
+    def _load_cached(self) -> Optional[Tuple[int, bytes, str]]:
+        """
+        Get cached app.js, reloading it if its mtime changed since the last check.
+        """
+        now = time.monotonic()
+        if self._cached is not None and now - self._last_check < APP_JS_CHECK_INTERVAL:
+            return self._cached
+        self._last_check = now
+
+        try:
+            mtime_ns = os.stat(self.app_js_path).st_mtime_ns
+        except FileNotFoundError:
+            logger.warning(f"app.js file not found: {self.app_js_path}")
+            self._cached = None
+            return None
+
+        if self._cached is None or self._cached[0] != mtime_ns:
+            content = self.app_js_path.read_bytes()
+            etag = f'"{hashlib.sha1(content).hexdigest()[:16]}"'
+            self._cached = (mtime_ns, content, etag)
+            logger.debug(f"Loaded app.js content from: {self.app_js_path}")
+        return self._cached
+
+    def _serve_fresh_app_js(self) -> Response:
         """
         Serve the app.js file with fresh content and no-cache headers.
         """
         try:
             if not self.app_js_path.exists():
                 logger.warning(f"app.js file not found: {self.app_js_path}")
-                return Response(
-                    content="// app.js file not found",
-                    status_code=HTTP_404_NOT_FOUND,
-                    media_type="application/javascript"
-                )
-            
+                return self._not_found_response()
+
             # Read the file content fresh every time
             content = self.app_js_path.read_text(encoding='utf-8')
-            
+
             # Create response with no-cache headers
             response = Response(
                 content=content,
@@ -63,14 +138,24 @@ class AppJsMiddleware(BaseHTTPMiddleware):
                     'Expires': '0',
                 }
             )
-            
+
             logger.debug(f"Served fresh app.js content from: {self.app_js_path}")
             return response
-            
+
         except Exception as e:
             logger.error(f"Error serving app.js: {e}")
-            return Response(
-                content=f"// Error loading app.js: {e}",
-                status_code=500,
-                media_type="application/javascript"
-            )
+            return self._error_response(e)
+
+    def _not_found_response(self) -> Response:
+        return Response(
+            content="// app.js file not found",
+            status_code=HTTP_404_NOT_FOUND,
+            media_type="application/javascript"
+        )
+
+    def _error_response(self, e: Exception) -> Response:
+        return Response(
+            content=f"// Error loading app.js: {e}",
+            status_code=500,
+            media_type="application/javascript"
+        )
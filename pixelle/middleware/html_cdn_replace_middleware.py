@@ -3,142 +3,189 @@ Copyright (C) 2025 AIDC-AI
 This project is licensed under the MIT License (SPDX-License-identifier: MIT).
 """
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-from starlette.types import ASGIApp
-from starlette.requests import Request
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from pixelle.logger import logger
 from pixelle.settings import settings
 
+# Max number of rewritten HTML documents kept in memory
+HTML_CACHE_SIZE = 32
+
 
-class HTMLCDNReplaceMiddleware(BaseHTTPMiddleware):
+class HTMLCDNReplaceMiddleware:
     """
     HTML CDN Replace Middleware
-    
+
     Intelligently replaces CDN links based on configuration and user language preferences.
     Mainly solves the problem of slow loading of KaTeX, Google Fonts and other resources in China.
-    
+
     CDN Strategy (controlled by cdn_strategy setting):
     - "auto": Detect by Accept-Language header (Chinese users get China CDN)
     - "china": Always use China CDN mirrors
     - "global": Always use original global CDNs
-    
+
     Supported CDN replacements:
     - jsdelivr.net -> unpkg.shop.jd.com (for KaTeX and other npm packages)
     - fonts.googleapis.com -> fonts.loli.net (for Google Fonts CSS)
     - fonts.gstatic.com -> gstatic.loli.net (for Google Fonts static files)
+
+    Implemented as a plain ASGI middleware: requests that keep the global CDNs and all
+    non-HTML responses are streamed through untouched. Rewritten HTML is cached per
+    (upstream ETag or body hash, CDN strategy), so each document is rewritten once.
     """
 
     def __init__(self, app: ASGIApp):
         """
         Initialize the middleware
-        
+
         Args:
             app: ASGI application
         """
-        super().__init__(app)
+        self.app = app
         # CDN prefix replacements for China users
         self.cdn_prefix_replacements = {
             # jsdelivr CDN replacement
             'https://cdn.jsdelivr.net/npm': 'https://unpkg.shop.jd.com',
-            
+
             # Google Fonts API replacement
             'https://fonts.googleapis.com': 'https://fonts.loli.net',
-            
+
             # Google Fonts static files replacement
             'https://fonts.gstatic.com': 'https://gstatic.loli.net',
         }
+        self._byte_replacements = [
+            (original.encode(), replacement.encode())
+            for original, replacement in self.cdn_prefix_replacements.items()
+        ]
+        self._cache: OrderedDict[Tuple[bytes, str], bytes] = OrderedDict()
 
-    def _should_use_china_cdn(self, request: Request) -> bool:
+    def _should_use_china_cdn(self, scope: Scope) -> bool:
         """
         Determine if China CDN should be used based on configuration and user preferences
-        
+
         Args:
-            request: HTTP request object
-            
+            scope: ASGI connection scope
+
         Returns:
             bool: True if China CDN should be used, False for global CDN
         """
         # Check configuration setting
         cdn_strategy = settings.cdn_strategy.lower()
-        
+
         if cdn_strategy == "china":
-            logger.debug("Using China CDN (forced by configuration)")
             return True
         elif cdn_strategy == "global":
-            logger.debug("Using global CDN (forced by configuration)")
             return False
         elif cdn_strategy == "auto":
             # Auto-detect based on Accept-Language header
-            accept_lang = request.headers.get("accept-language", "").lower()
-            is_chinese = "zh" in accept_lang
-            logger.debug(f"Auto-detect CDN: Accept-Language='{accept_lang}', using {'China' if is_chinese else 'global'} CDN")
-            return is_chinese
+            for name, value in scope["headers"]:
+                if name == b"accept-language":
+                    return b"zh" in value.lower()
+            return False
         else:
             logger.warning(f"Unknown cdn_strategy: {cdn_strategy}, defaulting to global CDN")
             return False
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request and replace CDN links in HTML response
         """
-        response = await call_next(request)
-        
-        # Only process HTML responses
-        content_type = response.headers.get("content-type", "")
-        if not content_type.startswith("text/html"):
-            return response
-        
+        if (scope["type"] != "http"
+                or scope["method"] == "HEAD"
+                or not self._should_use_china_cdn(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        body_chunks: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                if message["status"] != 200 or not self._is_plain_html(message):
+                    # Only process complete, uncompressed HTML responses
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if message["type"] == "http.response.body" and start_message is not None:
+                body_chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                await self._send_rewritten(send, start_message, b"".join(body_chunks))
+                return
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _is_plain_html(self, start_message: Message) -> bool:
+        """Check whether a response is an uncompressed HTML document"""
+        is_html = False
+        for name, value in start_message.get("headers", []):
+            if name == b"content-type":
+                is_html = value.startswith(b"text/html")
+            elif name == b"content-encoding" and value.lower() != b"identity":
+                return False
+        return is_html
+
+    async def _send_rewritten(self, send: Send, start_message: Message, body: bytes):
+        """Send the HTML response with China CDN prefixes applied"""
         try:
-            # Read response body
-            body = b""
-            async for chunk in response.body_iterator:
-                body += chunk
-            
-            if not body:
-                return response
-            
-            # Decode HTML content
-            html_content = body.decode('utf-8')
-            original_content = html_content
-            
-            # Determine if China CDN should be used
-            use_china_cdn = self._should_use_china_cdn(request)
-            
-            if use_china_cdn:
-                # Execute CDN prefix replacements for China users
-                replacements_made = 0
-                for original_prefix, replacement_prefix in self.cdn_prefix_replacements.items():
-                    if original_prefix in html_content:
-                        old_content = html_content
-                        html_content = html_content.replace(original_prefix, replacement_prefix)
-                        if html_content != old_content:
-                            replacements_made += 1
-                            logger.debug(f"HTML CDN prefix replaced: {original_prefix} -> {replacement_prefix}")
-                
-                if replacements_made > 0:
-                    logger.info(f"Applied China CDN replacements: {replacements_made} replacements")
-            else:
-                logger.debug("Using original global CDNs (no replacement)")
-            
-            # If content changed, return new response
-            if html_content != original_content:
-                return Response(
-                    content=html_content,
-                    status_code=response.status_code,
-                    headers=dict(response.headers),
-                    media_type="text/html"
-                )
-            
-            # No content change, return original response
-            return Response(
-                content=body,
-                status_code=response.status_code,
-                headers=dict(response.headers)
-            )
-            
+            rewritten = self._rewrite(start_message, body)
         except Exception as e:
             logger.warning(f"HTML CDN replace middleware error: {e}")
             # Return original response on error
-            return response
+            rewritten = body
+
+        headers = [
+            (name, value) for name, value in start_message.get("headers", [])
+            if name != b"content-length"
+        ]
+        headers.append((b"content-length", str(len(rewritten)).encode()))
+        await send({**start_message, "headers": headers})
+        await send({"type": "http.response.body", "body": rewritten})
+
+    def _rewrite(self, start_message: Message, body: bytes) -> bytes:
+        """Replace CDN prefixes, cached per (upstream ETag or body hash, CDN strategy)"""
+        if not body:
+            return body
+
+        etag = None
+        for name, value in start_message.get("headers", []):
+            if name == b"etag":
+                etag = value
+                break
+        key = (etag or hashlib.sha1(body).digest(), "china")
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        rewritten = body
+        replacements_made = 0
+        for original_prefix, replacement_prefix in self._byte_replacements:
+            if original_prefix in rewritten:
+                rewritten = rewritten.replace(original_prefix, replacement_prefix)
+                replacements_made += 1
+                logger.debug(f"HTML CDN prefix replaced: {original_prefix.decode()} -> {replacement_prefix.decode()}")
+        if replacements_made > 0:
+            logger.info(f"Applied China CDN replacements: {replacements_made} replacements")
+
+        self._cache[key] = rewritten
+        if len(self._cache) > HTML_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return rewritten
@@ -0,0 +1,55 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+MCP fast path middleware - dispatches MCP requests straight to the MCP app,
+bypassing the UI middleware and route table of the combined app.
+"""
+
+from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class MCPFastPathMiddleware:
+    """
+    Route requests under `prefix` to a lean MCP sub-stack (CORS + MCP app).
+
+    Added as the outermost user middleware, so MCP requests skip the static file,
+    HTML rewrite and Chainlit middlewares as well as the Chainlit routes.
+    """
+
+    def __init__(self, app: ASGIApp, mcp_app: ASGIApp, prefix: str = "/pixelle"):
+        """
+        Args:
+            app: The ASGI application serving everything else
+            mcp_app: The MCP ASGI application, normally also mounted at `prefix`
+            prefix: URL prefix of the MCP app
+        """
+        self.app = app
+        self.prefix = prefix.rstrip("/")
+        self.prefix_slash = self.prefix + "/"
+        self.mcp_stack = CORSMiddleware(
+            mcp_app,
+            allow_origins=["*"],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            root_path = scope.get("root_path", "")
+            path = scope["path"]
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path):]
+            if path.startswith(self.prefix_slash):
+                # Same scope as a `Mount(prefix, mcp_app)` match would produce
+                child_scope = {
+                    **scope,
+                    "app_root_path": scope.get("app_root_path", root_path),
+                    "root_path": root_path + self.prefix,
+                }
+                await self.mcp_stack(child_scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
@@ -4,213 +4,359 @@
 """
 Static file cache middleware to fix HTTP caching issues with Chainlit's static file serving.
 This middleware intercepts requests to static assets and implements proper HTTP caching protocol.
+
+Static files are resolved through an in-memory index built at startup, so conditional
+requests are answered without touching the filesystem. Unknown URLs trigger a rate
+limited rebuild in a worker thread, the event loop never walks the directories. Implemented as a plain ASGI
+middleware: non-static requests are passed through without any wrapping.
+
+Compressible files are served from pre-built gzip/brotli variants when the client accepts them.
 """
 
-import os
-import hashlib
+import asyncio
 import mimetypes
-from datetime import datetime, timezone
+import os
+import time
+from dataclasses import dataclass
+from datetime import timezone
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response, FileResponse
-from starlette.status import HTTP_304_NOT_MODIFIED, HTTP_404_NOT_FOUND
+from starlette.responses import FileResponse
+from starlette.status import HTTP_304_NOT_MODIFIED
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from pixelle.logger import logger
+from pixelle.middleware.static_compression import (
+    ENCODINGS,
+    StaticCompressionCache,
+    is_compressible,
+    parse_accept_encoding,
+)
+
+# Minimum seconds between index rebuilds triggered by unknown static URLs
+INDEX_REFRESH_INTERVAL = 10.0
 
 
-class StaticCacheMiddleware(BaseHTTPMiddleware):
+@dataclass(frozen=True)
+class StaticFileEntry:
+    """Indexed static file with everything needed to answer a request"""
+    path: Path
+    size: int
+    mtime: float
+    mtime_ns: int
+    etag: str
+    last_modified: str
+    content_type: Optional[str]
+    compressible: bool
+    # Headers of 304 responses, prebuilt so that revalidation needs no work
+    not_modified_headers: List[Tuple[bytes, bytes]]
+
+
+def get_static_search_dirs() -> List[Path]:
+    """Get directories that may contain Chainlit's static files"""
+    search_paths = []
+    try:
+        import chainlit
+        chainlit_package_dir = Path(chainlit.__file__).parent
+
+        # Common Chainlit static directories
+        search_paths.extend([
+            chainlit_package_dir / "frontend" / "dist",
+            chainlit_package_dir / "frontend" / "build",
+            chainlit_package_dir / "static",
+            chainlit_package_dir / "public",
+        ])
+    except Exception as e:
+        logger.debug(f"Could not locate Chainlit package: {e}")
+
+    # Also try common static directories
+    search_paths.extend([
+        Path.cwd() / "static",
+        Path.cwd() / "public",
+    ])
+    return search_paths
+
+
+class StaticCacheMiddleware:
     """
     Middleware to handle static file caching properly.
-    
+
     Fixes the issue where Chainlit/Uvicorn doesn't correctly handle conditional requests
     for static assets, causing browsers to re-download large files even when they haven't changed.
     """
-    
-    def __init__(self, app, static_paths: list[str] = None, max_age: int = 86400):
+
+    def __init__(self, app: ASGIApp, static_paths: list[str] = None, max_age: int = 86400,
+                 search_dirs: list[Path] = None, compress: bool = True,
+                 compression_cache: StaticCompressionCache = None):
         """
         Initialize the static cache middleware.
-        
+
         Args:
             app: The ASGI application
             static_paths: List of URL paths to intercept (default: ['/assets/', '/static/'])
             max_age: Cache max age in seconds (default: 24 hours)
+            search_dirs: Directories to serve files from (default: Chainlit's static directories)
+            compress: Serve pre-compressed variants of compressible files (default: True)
+            compression_cache: Cache of compressed variants (default: stored in the data directory)
         """
-        super().__init__(app)
+        self.app = app
         self.static_paths = static_paths or ['/assets/', '/static/', '/_next/static/']
+        self.static_prefixes = tuple(self.static_paths)
         self.max_age = max_age
-    
-    async def dispatch(self, request: Request, call_next):
+        self.cache_control = f'public, max-age={self.max_age}'.encode()
+        self.search_dirs = search_dirs if search_dirs is not None else get_static_search_dirs()
+        self.compression = (compression_cache or StaticCompressionCache()) if compress else None
+
+        self.index: Dict[str, StaticFileEntry] = {}
+        self._last_index_build = 0.0
+        self.rebuild_index()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process the request and handle static file caching if applicable.
         """
         # Check if this is a request for a static file we should handle
-        if not self._should_handle_request(request):
-            return await call_next(request)
-        
+        if (scope["type"] != "http"
+                or scope["method"] not in ("GET", "HEAD")
+                or not scope["path"].startswith(self.static_prefixes)):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        entry = self.index.get(path)
+        if entry is None:
+            entry = await self._lookup_after_refresh(path)
+            if entry is None:
+                # Fallback to original handling
+                await self.app(scope, receive, send)
+                return
+
+        if self._is_not_modified(scope, entry):
+            await self._send_not_modified(send, entry)
+            return
+
+        # Serving the body touches the file anyway, make sure the index is still accurate
+        try:
+            stat = os.stat(entry.path)
+        except OSError:
+            self.index.pop(path, None)
+            await self.app(scope, receive, send)
+            return
+        if stat.st_size != entry.size or stat.st_mtime_ns != entry.mtime_ns:
+            entry = self._make_entry(entry.path, stat)
+            self.index[path] = entry
+            if self._is_not_modified(scope, entry):
+                await self._send_not_modified(send, entry)
+                return
+
+        if entry.compressible and self.compression is not None:
+            response = self._create_compressed_response(scope, entry)
+            if response is not None:
+                await response(scope, receive, send)
+                return
+
+        response = self._create_file_response(entry, stat)
+        await response(scope, receive, send)
+
+    def rebuild_index(self):
+        """
+        Build the URL -> static file index from the search directories.
+
+        URLs resolve the same way as a direct lookup would: for each static path in order,
+        each search directory in order, first `<dir>/<path after prefix>`, then `<dir>/<full path>`.
+        """
+        start_time = time.time()
+        files_by_dir = []
+        for search_dir in self.search_dirs:
+            files = {}
+            if search_dir.is_dir():
+                for root, _, file_names in os.walk(search_dir):
+                    for file_name in file_names:
+                        file_path = Path(root) / file_name
+                        files[file_path.relative_to(search_dir).as_posix()] = file_path
+            files_by_dir.append(files)
+
+        index: Dict[str, Path] = {}
+        for static_path in self.static_paths:
+            full_prefix = static_path.lstrip('/')
+            for files in files_by_dir:
+                for relative_path, file_path in files.items():
+                    # Direct mapping first (for /assets/ -> <dir>/...)
+                    url_path = static_path + relative_path
+                    if url_path not in index:
+                        index[url_path] = file_path
+                for relative_path, file_path in files.items():
+                    # Static path prefix included (for /assets/ -> <dir>/assets/...)
+                    if relative_path.startswith(full_prefix):
+                        url_path = '/' + relative_path
+                        if url_path not in index:
+                            index[url_path] = file_path
+
+        entries = {}
+        for url_path, file_path in index.items():
+            try:
+                entries[url_path] = self._make_entry(file_path, file_path.stat())
+            except OSError:
+                continue
+
+        # Swap in one assignment, requests in flight keep using the old index
+        self.index = entries
+        self._last_index_build = time.monotonic()
+        logger.debug(f"Static file index built: {len(entries)} URLs in {time.time() - start_time:.3f}s")
+
+        if self.compression is not None:
+            # Compress in the background, files are served uncompressed until their variants exist
+            files = [
+                (entry.path, entry.etag, entry.size, entry.mtime_ns)
+                for entry in entries.values() if entry.compressible
+            ]
+            # Variants of removed or changed files (e.g. after a Chainlit upgrade) are deleted
+            self.compression.prune(files)
+            self.compression.schedule_all(files)
+
+    async def _lookup_after_refresh(self, url_path: str) -> Optional[StaticFileEntry]:
+        """Rebuild the index for an unknown URL, at most once per refresh interval"""
+        if time.monotonic() - self._last_index_build < INDEX_REFRESH_INTERVAL:
+            return None
+        # Claim the interval up front, concurrent unknown URLs don't start more rebuilds
+        self._last_index_build = time.monotonic()
         try:
-            # Try to handle as cached static file
-            response = await self._handle_static_file(request)
-            if response:
-                # Log cache hits for monitoring
-                if response.status_code == HTTP_304_NOT_MODIFIED:
-                    logger.debug(f"Static cache HIT (304): {request.url.path}")
-                else:
-                    logger.debug(f"Static cache SERVE: {request.url.path}")
-                return response
+            await asyncio.to_thread(self.rebuild_index)
         except Exception as e:
-            logger.warning(f"Static cache middleware error for {request.url.path}: {e}")
-        
-        # Fallback to original handling
-        logger.debug(f"Static cache FALLBACK: {request.url.path}")
-        return await call_next(request)
-    
-    def _should_handle_request(self, request: Request) -> bool:
-        """
-        Check if this request should be handled by the middleware.
-        """
-        path = request.url.path
-        return (
-            request.method == "GET" and
-            any(path.startswith(static_path) for static_path in self.static_paths)
+            logger.warning(f"Failed to rebuild static file index: {e}")
+            return None
+        return self.index.get(url_path)
+
+    def _make_entry(self, file_path: Path, stat: os.stat_result) -> StaticFileEntry:
+        """Create an index entry from file stats"""
+        etag = self._generate_etag(stat.st_size, stat.st_mtime_ns)
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        content_type, _ = mimetypes.guess_type(str(file_path))
+        compressible = self.compression is not None and is_compressible(content_type, stat.st_size)
+        not_modified_headers = [
+            (b"etag", etag.encode()),
+            (b"last-modified", last_modified.encode()),
+            (b"cache-control", self.cache_control),
+        ]
+        if compressible:
+            not_modified_headers.append((b"vary", b"Accept-Encoding"))
+        return StaticFileEntry(
+            path=file_path,
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            mtime_ns=stat.st_mtime_ns,
+            etag=etag,
+            last_modified=last_modified,
+            content_type=content_type,
+            compressible=compressible,
+            not_modified_headers=not_modified_headers,
         )
-    
-    async def _handle_static_file(self, request: Request) -> Optional[Response]:
+
+    def _generate_etag(self, file_size: int, mtime_ns: int) -> str:
         """
-        Handle static file request with proper caching.
+        Generate ETag for a file based on size and modification time.
         """
-        file_path = await self._find_static_file(request.url.path)
-        if not file_path or not file_path.exists():
-            return None
-        
-        # Get file stats
-        stat = file_path.stat()
-        file_size = stat.st_size
-        modified_time = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
-        
-        # Generate ETag based on file path, size and modification time
-        etag = self._generate_etag(file_path, file_size, modified_time)
-        
-        # Check conditional requests
-        if_none_match = request.headers.get('if-none-match')
-        if_modified_since = request.headers.get('if-modified-since')
-        
-        # Handle If-None-Match (ETag validation)
-        if if_none_match:
-            # Remove quotes if present
-            client_etag = if_none_match.strip('"')
-            if client_etag == etag.strip('"'):
-                return self._create_304_response(etag, modified_time)
-        
+        return f'"{mtime_ns:x}-{file_size:x}"'
+
+    def _is_not_modified(self, scope: Scope, entry: StaticFileEntry) -> bool:
+        """
+        Check conditional request headers against the indexed file.
+        """
+        if_none_match = None
+        if_modified_since = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value
+            elif name == b"if-modified-since":
+                if_modified_since = value
+
+        # Handle If-None-Match (ETag validation), takes precedence over If-Modified-Since
+        if if_none_match is not None:
+            etag = entry.etag.strip('"').encode()
+            for tag in if_none_match.split(b","):
+                tag = tag.strip().removeprefix(b"W/").strip(b'"')
+                # Compressed variants carry the encoding as ETag suffix, they share freshness
+                if tag == b"*" or tag == etag or tag.rpartition(b"-")[0] == etag:
+                    return True
+            return False
+
         # Handle If-Modified-Since
-        if if_modified_since:
+        if if_modified_since is not None:
+            if if_modified_since.decode("latin-1") == entry.last_modified:
+                return True
             try:
-                client_time = datetime.strptime(
-                    if_modified_since, '%a, %d %b %Y %H:%M:%S %Z'
-                ).replace(tzinfo=timezone.utc)
+                client_time = parsedate_to_datetime(if_modified_since.decode("latin-1"))
+                if client_time.tzinfo is None:
+                    client_time = client_time.replace(tzinfo=timezone.utc)
                 # Use integer seconds comparison to avoid microsecond differences
-                if int(modified_time.timestamp()) <= int(client_time.timestamp()):
-                    return self._create_304_response(etag, modified_time)
-            except ValueError:
+                return int(entry.mtime) <= int(client_time.timestamp())
+            except (TypeError, ValueError):
                 # Invalid date format, ignore
                 pass
-        
-        # Return file with proper cache headers
-        return self._create_file_response(file_path, etag, modified_time)
-    
-    async def _find_static_file(self, url_path: str) -> Optional[Path]:
+        return False
+
+    async def _send_not_modified(self, send: Send, entry: StaticFileEntry):
         """
-        Find the actual file path for a static asset URL.
+        Send a 304 Not Modified response.
         """
-        # Try to find Chainlit's static files in multiple possible locations
-        search_paths = []
-        
-        try:
-            import chainlit
-            chainlit_package_dir = Path(chainlit.__file__).parent
-            
-            # Common Chainlit static directories
-            possible_static_dirs = [
-                chainlit_package_dir / "frontend" / "dist",
-                chainlit_package_dir / "frontend" / "build", 
-                chainlit_package_dir / "static",
-                chainlit_package_dir / "public",
-            ]
-            
-            search_paths.extend(possible_static_dirs)
-            
-        except Exception as e:
-            logger.debug(f"Could not locate Chainlit package: {e}")
-        
-        # Also try common static directories
-        search_paths.extend([
-            Path.cwd() / "static",
-            Path.cwd() / "public",
-        ])
-        
-        # Search for the file in all possible locations
-        for static_path in self.static_paths:
-            if url_path.startswith(static_path):
-                relative_path = url_path[len(static_path):]
-                
-                for search_dir in search_paths:
-                    if search_dir.exists():
-                        # Try direct mapping first (for /assets/ -> assets/)
-                        file_path = search_dir / relative_path
-                        if file_path.exists() and file_path.is_file():
-                            logger.debug(f"Found static file: {file_path} for URL: {url_path}")
-                            return file_path
-                        
-                        # Try with the static path prefix included (for /assets/ -> /assets/)
-                        # This handles cases where the URL path matches the directory structure
-                        full_relative_path = url_path.lstrip('/')
-                        file_path = search_dir / full_relative_path
-                        if file_path.exists() and file_path.is_file():
-                            logger.debug(f"Found static file: {file_path} for URL: {url_path}")
-                            return file_path
-        
-        logger.debug(f"Static file not found for URL: {url_path}")
-        return None
-    
-    def _generate_etag(self, file_path: Path, file_size: int, modified_time: datetime) -> str:
+        await send({
+            "type": "http.response.start",
+            "status": HTTP_304_NOT_MODIFIED,
+            "headers": entry.not_modified_headers,
+        })
+        await send({"type": "http.response.body", "body": b""})
+
+    def _create_compressed_response(self, scope: Scope, entry: StaticFileEntry) -> Optional[FileResponse]:
         """
-        Generate ETag for a file based on path, size, and modification time.
+        Create a response from a pre-compressed variant the client accepts, if one is built.
         """
-        # Create a hash based on file path, size, and modification time
-        content = f"{file_path}:{file_size}:{modified_time.timestamp()}"
-        hash_object = hashlib.md5(content.encode())
-        return f'"{hash_object.hexdigest()}"'
-    
-    def _create_304_response(self, etag: str, modified_time: datetime) -> Response:
+        variants = self.compression.get_variants(entry.path, entry.etag)
+        if variants is None:
+            self.compression.schedule(entry.path, entry.etag, entry.size, entry.mtime_ns)
+            return None
+
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value
+                break
+        accepted = parse_accept_encoding(accept_encoding)
+
+        for encoding, _ in ENCODINGS:
+            if encoding in accepted and encoding in variants:
+                variant_path, variant_stat = variants[encoding]
+                return FileResponse(
+                    path=variant_path,
+                    media_type=entry.content_type,
+                    stat_result=variant_stat,
+                    headers={
+                        'etag': f'{entry.etag[:-1]}-{encoding}"',
+                        'last-modified': entry.last_modified,
+                        'cache-control': f'public, max-age={self.max_age}',
+                        'content-encoding': encoding,
+                        'vary': 'Accept-Encoding',
+                        'accept-ranges': 'bytes',
+                    }
+                )
+        return None
+
+    def _create_file_response(self, entry: StaticFileEntry, stat: os.stat_result) -> FileResponse:
         """
-        Create a 304 Not Modified response.
+        Create a file response with proper cache headers.
         """
         headers = {
-            'etag': etag,
-            'last-modified': modified_time.strftime('%a, %d %b %Y %H:%M:%S GMT'),
+            'etag': entry.etag,
+            'last-modified': entry.last_modified,
             'cache-control': f'public, max-age={self.max_age}',
+            'accept-ranges': 'bytes',
         }
-        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
-    
-    def _create_file_response(self, file_path: Path, etag: str, modified_time: datetime) -> FileResponse:
-        """
-        Create a file response with proper cache headers.
-        """
-        # Determine content type
-        content_type, _ = mimetypes.guess_type(str(file_path))
-        
-        # Create file response
-        response = FileResponse(
-            path=str(file_path),
-            media_type=content_type,
-            headers={
-                'etag': etag,
-                'last-modified': modified_time.strftime('%a, %d %b %Y %H:%M:%S GMT'),
-                'cache-control': f'public, max-age={self.max_age}',
-                'accept-ranges': 'bytes',
-            }
+        if entry.compressible:
+            headers['vary'] = 'Accept-Encoding'
+        return FileResponse(
+            path=entry.path,
+            media_type=entry.content_type,
+            stat_result=stat,
+            headers=headers,
         )
-        
-        return response
@@ -0,0 +1,188 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+Pre-compressed static assets - gzip/brotli variants of static files are built once,
+stored in the data directory and served to clients that accept them.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pixelle.logger import logger
+from pixelle.utils.os_util import get_data_path
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, only gzip variants are built without it
+    brotli = None
+
+STATIC_COMPRESSION_DIR = get_data_path("static_compressed")
+
+# Files smaller than this gain nothing from compression
+MIN_COMPRESS_SIZE = 1024
+
+# Temp files older than this are left behind by crashed workers and removed
+STALE_TEMP_AGE = 3600
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "application/wasm",
+    "image/svg+xml",
+)
+
+# Content encodings in order of preference and the file suffix of their variant
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")] if brotli is not None else [("gzip", ".gz")]
+
+Variant = Tuple[Path, os.stat_result]
+
+
+def is_compressible(content_type: Optional[str], size: int) -> bool:
+    """Check whether a file is worth compressing"""
+    return bool(content_type) and size >= MIN_COMPRESS_SIZE and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def parse_accept_encoding(header: Optional[bytes]) -> set[str]:
+    """Get the content encodings a client accepts (q=0 means refused)"""
+    if not header:
+        return set()
+    accepted = set()
+    for item in header.decode("latin-1").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding == "*":
+            accepted.update(encoding for encoding, _ in ENCODINGS)
+        elif coding:
+            accepted.add(coding)
+    return accepted
+
+
+class StaticCompressionCache:
+    """Build-once cache of compressed static file variants
+
+    Variants are named after the source file path and its size/mtime, so a changed file
+    gets new variants and stale ones are never served. Compression runs in a background
+    thread; until a variant exists the file is served uncompressed.
+    """
+
+    def __init__(self, cache_dir: str | Path = STATIC_COMPRESSION_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # (source path, etag) -> {encoding: variant}
+        self._variants: Dict[Tuple[Path, str], Dict[str, Variant]] = {}
+        self._pending: set[Tuple[Path, str]] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="static-compress")
+
+    def _variant_base(self, source: Path, size: int, mtime_ns: int) -> Path:
+        path_hash = hashlib.sha1(str(source).encode()).hexdigest()[:16]
+        return self.cache_dir / f"{path_hash}-{mtime_ns:x}-{size:x}{source.suffix}"
+
+    def get_variants(self, source: Path, etag: str) -> Optional[Dict[str, Variant]]:
+        """Get the compressed variants of a file, None if they are not built yet"""
+        return self._variants.get((source, etag))
+
+    def schedule(self, source: Path, etag: str, size: int, mtime_ns: int):
+        """Build the compressed variants of a file in the background"""
+        key = (source, etag)
+        with self._lock:
+            if key in self._variants or key in self._pending:
+                return
+            self._pending.add(key)
+        self._executor.submit(self._build, key, size, mtime_ns)
+
+    def schedule_all(self, files: List[Tuple[Path, str, int, int]]):
+        """Build the compressed variants of many files in the background
+
+        Args:
+            files: (source path, etag, size, mtime_ns) of each file
+        """
+        for source, etag, size, mtime_ns in files:
+            self.schedule(source, etag, size, mtime_ns)
+
+    def prune(self, files: List[Tuple[Path, str, int, int]]):
+        """Delete variants of files that are gone or changed in the background
+
+        Args:
+            files: (source path, etag, size, mtime_ns) of all current files
+        """
+        keep = {self._variant_base(source, size, mtime_ns).name for source, _, size, mtime_ns in files}
+        current = {(source, etag) for source, etag, _, _ in files}
+        with self._lock:
+            for key in [key for key in self._variants if key not in current]:
+                del self._variants[key]
+        self._executor.submit(self._prune_files, keep)
+
+    def _prune_files(self, keep: set[str]):
+        removed = 0
+        now = time.time()
+        suffixes = {suffix for _, suffix in ENCODINGS}
+        for variant_path in self.cache_dir.iterdir():
+            name = variant_path.name
+            try:
+                if name.endswith(".tmp"):
+                    # In use by a worker compressing right now, unless left behind long ago
+                    if now - variant_path.stat().st_mtime < STALE_TEMP_AGE:
+                        continue
+                else:
+                    base, _, suffix = name.rpartition(".")
+                    if base in keep and f".{suffix}" in suffixes:
+                        continue
+                variant_path.unlink()
+                removed += 1
+            except OSError as e:
+                logger.debug(f"Failed to remove stale static variant {variant_path}: {e}")
+        if removed:
+            logger.info(f"Removed {removed} stale compressed static files")
+
+    def close(self):
+        """Stop compressing, queued files are dropped instead of delaying shutdown"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _build(self, key: Tuple[Path, str], size: int, mtime_ns: int):
+        source, _ = key
+        try:
+            base = self._variant_base(source, size, mtime_ns)
+            variants = {}
+            data = None
+            for encoding, suffix in ENCODINGS:
+                variant_path = base.with_name(base.name + suffix)
+                if not variant_path.exists():
+                    if data is None:
+                        data = source.read_bytes()
+                    compressed = self._compress(encoding, data)
+                    # Only keep variants that are actually smaller
+                    if len(compressed) >= size:
+                        continue
+                    temp_path = variant_path.with_name(f"{variant_path.name}.{os.getpid()}.tmp")
+                    temp_path.write_bytes(compressed)
+                    os.replace(temp_path, variant_path)
+                variants[encoding] = (variant_path, variant_path.stat())
+            with self._lock:
+                self._variants[key] = variants
+        except Exception as e:
+            logger.warning(f"Failed to compress static file {source}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _compress(self, encoding: str, data: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=11)
+        return gzip.compress(data, compresslevel=9, mtime=0)
@@ -29,6 +29,14 @@ class Settings(BaseSettings):
     port: int = 9004
     public_read_url: Optional[str] = None
     local_storage_path: str = "files"
+    upload_workers: int = 4  # Threads for file uploads from async code
+    dev_mode: bool = False  # Serve frontend files fresh from disk without caching
+    workers: int = 1  # > 1 runs multiple server processes sharing workflows and job state on disk
+    job_retention_days: int = 30  # Days finished workflow jobs are kept in data/jobs.db, 0 keeps them forever
+    job_retention_max_rows: int = 10000  # Max finished workflow jobs kept, 0 means unlimited
+    mcp_lean_stack: bool = True  # Serve /pixelle/mcp without the web UI middleware stack
+    mcp_tools_page_size: int = 0  # Tools per tools/list page, 0 returns all tools in one page
+    mcp_only: bool = False  # Serve only the MCP server, without the web UI and LLM clients (Chainlit, LiteLLM)
     
     # ComfyUI integration configuration
     comfyui_base_url: str = "http://localhost:8188"
@@ -41,11 +49,33 @@ class Settings(BaseSettings):
     runninghub_api_key: str = ""
     runninghub_timeout: int = 3600
     runninghub_retry_count: int = 0
+    runninghub_max_connections: int = 20
+    runninghub_metadata_cache_ttl: int = 86400  # seconds, <= 0 means cached workflows never expire
+    # Status polling of outstanding RunningHub tasks (shared across all executions)
+    runninghub_poll_queued_interval: float = 5.0
+    runninghub_poll_running_interval: float = 2.0
+    runninghub_poll_concurrency: int = 5
+    runninghub_poll_rate_limit: float = 5.0  # max status requests per second
+    
+    # Workflow loading configuration
+    workflow_load_concurrency: int = 8
+    workflow_watch_enabled: bool = True  # Hot reload workflow files changed on disk
+    workflow_watch_interval: float = 2.0  # Seconds between directory scans
+    workflow_watch_debounce: float = 1.0  # Quiet period before applying a burst of changes
     
     # Chainlit configuration
     chainlit_auth_secret: str = "changeme-generate-a-secure-secret-key"
     chainlit_auth_enabled: bool = True
     chainlit_save_starter_enabled: bool = False
+    chainlit_tool_retrieval_enabled: bool = True  # Send the LLM only the workflow tools relevant to the message
+    chainlit_tool_retrieval_top_k: int = 8  # Max workflow tools sent per request when retrieval is enabled
+    chainlit_tool_call_concurrency: int = 4  # Max tool calls of one LLM response executed at the same time
+    chainlit_context_window: int = 0  # Context window in tokens for all models, 0 looks it up per model
+    chainlit_stream_flush_interval_ms: int = 30  # Max delay of streamed tokens, batches them into fewer UI events
+    chainlit_stream_flush_chars: int = 64  # Streamed characters that are sent at once without waiting
+    chainlit_llm_cache_enabled: bool = False  # Replay cached responses for identical LLM requests, requests use temperature 0
+    chainlit_llm_cache_ttl: int = 3600  # Seconds a cached LLM response stays valid
+    chainlit_prompt_caching_enabled: bool = True  # Mark system prompt and tools cacheable for providers that need it
 
     # --- NEU: SSH Konfiguration ---
     ssh_host: str = ""  # Standardwert (Fallback)
@@ -90,6 +120,17 @@ class Settings(BaseSettings):
     # Default model
     chainlit_chat_default_model: str = "gpt-4o-mini"
     
+    # LLM provider connections
+    llm_timeout: float = 30.0  # Seconds per LLM request
+    llm_max_concurrency: int = 16  # Max concurrent requests per provider, 0 means unlimited
+    llm_provider_overrides: str = ""  # Per provider limits, e.g. "claude.timeout=60,ollama.max_concurrency=2"
+    llm_warmup_enabled: bool = True  # Open connections to the configured providers at startup
+
+    # LLM fallback routing
+    llm_fallback_models: str = ""  # Equivalent models tried when a model is rate limited, failing or slow, e.g. "gpt-4o=claude-sonnet-4|qwen-max,gpt-4o-mini=deepseek-chat"
+    llm_hedge_after: float = 0.0  # Seconds without a first token before the next equivalent is raced, 0 disables hedging
+    llm_cooldown: float = 30.0  # Seconds a rate limited or repeatedly failing model is skipped
+    
     def get_configured_llm_providers(self) -> list[str]:
         """Get list of configured LLM providers"""
         providers = []
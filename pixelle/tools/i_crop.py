@@ -6,7 +6,7 @@ from PIL import Image
 
 from pixelle.logger import logger
 from pixelle.mcp_core import mcp
-from pixelle.utils.file_uploader import upload
+from pixelle.utils.file_uploader import aupload
 from pixelle.utils.file_util import download_files, create_temp_file
 
 @mcp.tool
@@ -51,7 +51,7 @@ async def i_crop(
             cropped_img.save(cropped_output_path, format='JPEG', quality=95)
             
             # Upload the processed image
-            result_url = upload(cropped_output_path, 'cropped_image.jpg')
+            result_url = await aupload(cropped_output_path, 'cropped_image.jpg')
             
             logger.info(f"[crop] Original size: {original_width}x{original_height}")
             logger.info(f"[crop] Cropped size: {new_width}x{new_height}")
@@ -13,7 +13,7 @@ from pixelle.logger import logger
 from pixelle.mcp_core import mcp
 from pixelle.manager.workflow_manager import workflow_manager, CUSTOM_WORKFLOW_DIR
 from pixelle.utils.file_util import download_files
-from pixelle.utils.file_uploader import upload
+from pixelle.utils.file_uploader import aupload
 from pixelle.utils.runninghub_util import handle_runninghub_workflow_save
 
 
@@ -62,7 +62,7 @@ async def save_workflow_tool(
             # Handle URL - use existing download logic
             logger.info(f"Processing workflow from URL: {workflow_source}")
             async with download_files(workflow_source) as temp_workflow_path:
-                return workflow_manager.load_workflow(temp_workflow_path, tool_name=tool_name)
+                return await workflow_manager.load_workflow(temp_workflow_path, tool_name=tool_name)
         else:
             # Handle RunningHub workflow_id
             logger.info(f"Processing workflow from RunningHub workflow_id: {workflow_source}")
@@ -71,7 +71,7 @@ async def save_workflow_tool(
                 return error(result["error"])
             
             # Load the workflow using the created file
-            return workflow_manager.load_workflow(result["workflow_file_path"], tool_name=tool_name)
+            return await workflow_manager.load_workflow(result["workflow_file_path"], tool_name=tool_name)
             
     except Exception as e:
         logger.error(f"Failed to save workflow: {e}", exc_info=True)
@@ -93,7 +93,7 @@ async def reload_workflows_tool():
     """
     Reload all MCP tools that were generated by workflows.
     """
-    return workflow_manager.reload_all_workflows()
+    return await workflow_manager.reload_all_workflows()
         
 @mcp.tool(name="list_workflows_tool")
 async def list_workflows_tool():
@@ -141,7 +141,7 @@ async def get_workflow_tool_detail(
         
         # Upload workflow file and get URL
         try:
-            workflow_file_url = upload(workflow_file_path, f"{workflow_name}.json")
+            workflow_file_url = await aupload(workflow_file_path, f"{workflow_name}.json")
         except Exception as e:
             logger.error(f"Failed to upload workflow file: {e}")
             return error(f"Failed to upload workflow file: {str(e)}")
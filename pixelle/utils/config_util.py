@@ -40,13 +40,16 @@ def has_minimal_execution_engine_config(env_vars: Dict[str, str]) -> bool:
     return has_comfyui or has_runninghub
 
 
-def detect_config_status_from_env(env_vars: Dict[str, str]) -> str:
-    """Compute config status: 'first_time'|'incomplete'|'complete'."""
+def detect_config_status_from_env(env_vars: Dict[str, str], require_llm: bool = True) -> str:
+    """Compute config status: 'first_time'|'incomplete'|'complete'.
+
+    An LLM provider is not needed when only the MCP server is served (`require_llm=False`).
+    """
     # At least one execution engine must be configured
     if not has_minimal_execution_engine_config(env_vars):
         return "incomplete"
     # At least one LLM provider must be configured
-    if not has_minimal_llm_config(env_vars):
+    if require_llm and not has_minimal_llm_config(env_vars):
         return "incomplete"
     return "complete"
 
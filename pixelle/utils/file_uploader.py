@@ -1,8 +1,11 @@
 # Copyright (C) 2025 AIDC-AI
 # This project is licensed under the MIT License (SPDX-License-identifier: MIT).
 
+import asyncio
 import os
+import shutil
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Union, Optional, Tuple
 from urllib.parse import urlparse
@@ -30,16 +33,25 @@ class LocalFileUploader:
             str: file access URL
         """
         try:
-            # process different types of input
-            file_content, file_name = self._process_input(data, filename)
-            
-            # generate file id, keep consistent with LocalStorage
-            file_id = self._generate_file_id(file_name)
-            file_path = self.storage_path / file_id
-            
-            # write file
-            with open(file_path, 'wb') as f:
-                f.write(file_content)
+            if isinstance(data, (str, Path)) and not str(data).startswith(('http://', 'https://')):
+                # local file, copied without loading it into memory
+                source_path = Path(data)
+                if not source_path.exists():
+                    raise FileNotFoundError(f"File not found: {source_path}")
+                file_id = self._generate_file_id(filename or source_path.name)
+                file_path = self.storage_path / file_id
+                shutil.copyfile(source_path, file_path)
+            else:
+                # process different types of input
+                file_content, file_name = self._process_input(data, filename)
+                
+                # generate file id, keep consistent with LocalStorage
+                file_id = self._generate_file_id(file_name)
+                file_path = self.storage_path / file_id
+                
+                # write file
+                with open(file_path, 'wb') as f:
+                    f.write(file_content)
             
             # generate file URL
             file_url = self._get_file_url(file_id)
@@ -145,6 +157,9 @@ class LocalFileUploader:
 # create default uploader instance
 default_uploader = LocalFileUploader()
 
+# bounded pool for uploads from async code, file copies and downloads never block the event loop
+_upload_executor = ThreadPoolExecutor(max_workers=max(1, settings.upload_workers), thread_name_prefix="upload")
+
 
 def upload(data: Union[bytes, str, Path], filename: Optional[str] = None) -> str:
     """
@@ -157,4 +172,19 @@ def upload(data: Union[bytes, str, Path], filename: Optional[str] = None) -> str
     Returns:
         str: file access URL
     """
-    return default_uploader.upload(data, filename) 
\ No newline at end of file
+    return default_uploader.upload(data, filename)
+
+
+async def aupload(data: Union[bytes, str, Path], filename: Optional[str] = None) -> str:
+    """
+    async interface for uploading files, runs the upload in a bounded worker pool
+    
+    Args:
+        data: file data, can be bytes, file path or URL
+        filename: optional file name
+        
+    Returns:
+        str: file access URL
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_upload_executor, default_uploader.upload, data, filename)
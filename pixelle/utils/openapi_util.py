@@ -37,9 +37,9 @@ def create_custom_openapi_function(app: FastAPI):
         except AttributeError as e:
             # Fallback: generate OpenAPI only for safe routes when OAuth2PasswordBearerWithCookie causes issues
             if "model" in str(e):
-                # Only include /files routes in API docs (exclude /pixelle MCP routes)
+                # Only include /files and /llm routes in API docs (exclude /pixelle MCP routes)
                 safe_routes = [r for r in app.routes 
-                              if hasattr(r, 'path') and r.path.startswith('/files')]
+                              if hasattr(r, 'path') and r.path.startswith(('/files', '/llm'))]
                 app.openapi_schema = get_openapi(
                     title=app.title,
                     version=getattr(app, 'version', "0.1.0"),
@@ -7,9 +7,7 @@ RunningHub utility functions - centralized logic for RunningHub workflow handlin
 
 import json
 import os
-import tempfile
-import asyncio
-import concurrent.futures
+import time
 from pathlib import Path
 from typing import Optional, Dict, Any
 
@@ -18,6 +16,8 @@ from pixelle.settings import settings
 from pixelle.utils.os_util import get_data_path
 from pixelle.utils.workflow_source_util import get_workflow_source, get_workflow_source_data, create_workflow_source_file
 
+RUNNINGHUB_CACHE_DIR = get_data_path("runninghub_cache")
+
 
 def is_runninghub_workflow(workflow_file: str | Path) -> bool:
     """Check if the workflow file is a RunningHub workflow
@@ -93,19 +93,167 @@ async def validate_runninghub_workflow_id(workflow_id: str) -> bool:
         # Test if workflow exists by trying to fetch it
         from pixelle.comfyui.runninghub_client import get_runninghub_client
         client = get_runninghub_client()
-        await client.get_workflow_json(workflow_id)
+        workflow_json = await client.get_workflow_json(workflow_id)
+        # Keep the freshly fetched workflow so that loading it does not fetch it again
+        save_runninghub_workflow_cache(workflow_id, workflow_json)
         return True
     except Exception as e:
         logger.error(f"Failed to validate RunningHub workflow_id {workflow_id}: {e}")
         return False
 
 
-async def fetch_runninghub_workflow_metadata(workflow_file: str | Path, tool_name: str = None):
-    """Fetch and parse RunningHub workflow metadata by fetching from API
+def get_runninghub_cache_path(workflow_id: str) -> Path:
+    """Get the cache file path for a RunningHub workflow
+    
+    Args:
+        workflow_id: RunningHub workflow ID
+        
+    Returns:
+        Path: Cache file path under the data directory
+    """
+    return Path(RUNNINGHUB_CACHE_DIR) / f"{workflow_id}.json"
+
+
+def load_runninghub_workflow_cache(workflow_id: str, max_age: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Load cached RunningHub workflow data
+    
+    Args:
+        workflow_id: RunningHub workflow ID
+        max_age: Max cache age in seconds, defaults to `settings.runninghub_metadata_cache_ttl`,
+                 values <= 0 mean the cache never expires
+        
+    Returns:
+        Optional[Dict]: Cache entry with `workflow_json`, `metadata` and `fetched_at`,
+                        None if missing, unreadable or expired
+    """
+    if max_age is None:
+        max_age = settings.runninghub_metadata_cache_ttl
+    
+    cache_path = get_runninghub_cache_path(workflow_id)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Failed to read RunningHub workflow cache {cache_path}: {e}")
+        return None
+    
+    if max_age > 0 and time.time() - entry.get("fetched_at", 0) > max_age:
+        logger.debug(f"RunningHub workflow cache expired for workflow_id: {workflow_id}")
+        return None
+    return entry
+
+
+def save_runninghub_workflow_cache(workflow_id: str, workflow_json: Dict[str, Any], metadata=None) -> None:
+    """Save RunningHub workflow JSON and (optionally) parsed metadata to the cache
+    
+    Args:
+        workflow_id: RunningHub workflow ID
+        workflow_json: API-format workflow JSON fetched from RunningHub
+        metadata: Optional parsed WorkflowMetadata
+    """
+    entry = {
+        "workflow_id": workflow_id,
+        "fetched_at": time.time(),
+        "workflow_json": workflow_json,
+        "metadata": metadata.model_dump() if metadata else None,
+    }
+    
+    cache_path = get_runninghub_cache_path(workflow_id)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial file
+        temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"Failed to write RunningHub workflow cache {cache_path}: {e}")
+
+
+def clear_runninghub_workflow_cache(workflow_id: Optional[str] = None) -> int:
+    """Remove cached RunningHub workflow data
+    
+    Args:
+        workflow_id: Workflow ID to remove, removes all cache entries if None
+        
+    Returns:
+        int: Number of removed cache entries
+    """
+    if workflow_id:
+        cache_files = [get_runninghub_cache_path(workflow_id)]
+    else:
+        cache_files = list(Path(RUNNINGHUB_CACHE_DIR).glob("*.json"))
+    
+    removed = 0
+    for cache_file in cache_files:
+        try:
+            cache_file.unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to remove RunningHub workflow cache {cache_file}: {e}")
+    return removed
+
+
+def _metadata_from_cache_entry(entry: Dict[str, Any], workflow_id: str, tool_name: str):
+    """Build WorkflowMetadata from a cache entry, parsing the cached workflow JSON if needed"""
+    from pixelle.comfyui.workflow_parser import WorkflowParser, WorkflowMetadata
+    
+    if entry.get("metadata"):
+        metadata = WorkflowMetadata(**entry["metadata"])
+        metadata.title = tool_name
+    else:
+        metadata = WorkflowParser().parse_workflow(entry["workflow_json"], tool_name)
+        if metadata:
+            save_runninghub_workflow_cache(workflow_id, entry["workflow_json"], metadata)
+    
+    if metadata:
+        metadata.workflow_id = workflow_id
+        metadata.is_runninghub = True
+    return metadata
+
+
+def get_cached_runninghub_workflow_metadata(workflow_file: str | Path, tool_name: str = None, max_age: Optional[int] = None):
+    """Get RunningHub workflow metadata from the local cache without any network access
+    
+    Args:
+        workflow_file: Path to the RunningHub workflow file
+        tool_name: Optional tool name for metadata, defaults to the file name
+        max_age: Max cache age in seconds, see `load_runninghub_workflow_cache`
+        
+    Returns:
+        Optional[WorkflowMetadata]: Cached metadata or None on cache miss
+    """
+    data = get_workflow_source_data(workflow_file)
+    if not data or data.get("_source") != "runninghub":
+        return None
+    
+    workflow_id = data["workflow_id"]
+    entry = load_runninghub_workflow_cache(workflow_id, max_age=max_age)
+    if not entry:
+        return None
+    
+    try:
+        return _metadata_from_cache_entry(entry, workflow_id, tool_name or Path(workflow_file).stem)
+    except Exception as e:
+        logger.warning(f"Invalid RunningHub workflow cache for workflow_id {workflow_id}: {e}")
+        return None
+
+
+async def fetch_runninghub_workflow_metadata(workflow_file: str | Path, tool_name: str = None, refresh: bool = False):
+    """Fetch and parse RunningHub workflow metadata
+    
+    The local cache is used when it is fresh; otherwise the workflow is fetched from
+    the API and cached. If fetching fails, a stale cache entry is used as fallback,
+    except on refresh where the failure is reported.
     
     Args:
         workflow_file: Path to the RunningHub workflow file
         tool_name: Optional tool name for metadata
+        refresh: Ignore the cache and always fetch from the API, no stale fallback
         
     Returns:
         Optional[WorkflowMetadata]: Parsed metadata or None if failed
@@ -117,49 +265,43 @@ async def fetch_runninghub_workflow_metadata(workflow_file: str | Path, tool_nam
             return None
         
         workflow_id = data["workflow_id"]
+        tool_name = tool_name or Path(workflow_file).stem
+        
+        if not refresh:
+            metadata = get_cached_runninghub_workflow_metadata(workflow_file, tool_name)
+            if metadata:
+                logger.debug(f"Using cached RunningHub workflow metadata for workflow_id: {workflow_id}")
+                return metadata
+        
         logger.info(f"Parsing RunningHub workflow metadata for workflow_id: {workflow_id}")
         
-        # Get RunningHub client and fetch actual workflow
-        async def fetch_and_parse():
-            from pixelle.comfyui.runninghub_client import get_runninghub_client
-            from pixelle.comfyui.workflow_parser import WorkflowParser
-            
+        from pixelle.comfyui.runninghub_client import get_runninghub_client
+        from pixelle.comfyui.workflow_parser import WorkflowParser
+        
+        try:
+            # Get RunningHub client and fetch actual workflow
             client = get_runninghub_client()
             workflow_json = await client.get_workflow_json(workflow_id)
-            
-            # Create temporary file with the actual workflow
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f:
-                json.dump(workflow_json, f, ensure_ascii=False, indent=2)
-                temp_file_path = f.name
-            
-            try:
-                # Parse using standard workflow parser
-                parser = WorkflowParser()
-                metadata = parser.parse_workflow_file(temp_file_path, tool_name)
-                
-                # Add RunningHub-specific metadata
-                if metadata:
-                    metadata.workflow_id = workflow_id
-                    metadata.is_runninghub = True
-                
-                return metadata
-            finally:
-                # Clean up temporary file
-                try:
-                    os.unlink(temp_file_path)
-                except Exception as cleanup_error:
-                    logger.warning(f"Failed to cleanup temporary file {temp_file_path}: {cleanup_error}")
-        
-        # Run the async function
-        try:
-            loop = asyncio.get_running_loop()
-            # If we're already in an async context, create a new task
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, fetch_and_parse())
-                return future.result()
-        except RuntimeError:
-            # No running loop, we can use asyncio.run
-            return asyncio.run(fetch_and_parse())
+        except Exception as e:
+            # Fall back to a stale cache entry rather than failing the workflow,
+            # an explicit refresh must report that nothing was refreshed
+            stale_entry = None if refresh else load_runninghub_workflow_cache(workflow_id, max_age=0)
+            if stale_entry:
+                logger.warning(f"Failed to fetch RunningHub workflow {workflow_id}, using cached metadata: {e}")
+                return _metadata_from_cache_entry(stale_entry, workflow_id, tool_name)
+            raise
+        
+        # Parse using standard workflow parser
+        parser = WorkflowParser()
+        metadata = parser.parse_workflow(workflow_json, tool_name)
+        
+        # Add RunningHub-specific metadata
+        if metadata:
+            metadata.workflow_id = workflow_id
+            metadata.is_runninghub = True
+            save_runninghub_workflow_cache(workflow_id, workflow_json, metadata)
+        
+        return metadata
             
     except Exception as e:
         logger.error(f"Failed to fetch RunningHub workflow metadata: {e}")
@@ -16,7 +16,7 @@ from pixelle.web.chat.chat_handler import handle_mcp_connect, handle_mcp_disconn
 from pixelle.web.chat.chat_settings import setup_chat_settings, setup_settings_update
 from pixelle.web.chat import chat_handler as tool_handler
 from pixelle.web import auth
-from pixelle.utils.file_uploader import upload
+from pixelle.utils.file_uploader import aupload
 
 
 @cl.set_chat_profiles
@@ -82,13 +82,18 @@ async def on_message(message: cl.Message):
             or isinstance(element, cl.Video)
         if is_media and element.path and not element.url:
             element.size = "small"
-            element.url = upload(element.path, filename=element.name)
+            element.url = await aupload(element.path, filename=element.name)
             need_update = True
     if need_update:
         await message.update()
     
     cl_messages = cl.chat_context.get()
-    messages = messages_from_chaintlit_to_openai(cl_messages)
+    # Converted messages are cached per session, only new or edited ones are converted
+    message_cache = cl.user_session.get("message_cache")
+    if message_cache is None:
+        message_cache = {}
+        cl.user_session.set("message_cache", message_cache)
+    messages = await messages_from_chaintlit_to_openai(cl_messages, message_cache)
     
     # Use tool processor to process streaming response and tool calls
     chat_profile = cl.user_session.get("chat_profile")
@@ -2,6 +2,7 @@
 # This project is licensed under the MIT License (SPDX-License-identifier: MIT).
 
 from datetime import timedelta
+import asyncio
 import json
 import os
 import time
@@ -11,11 +12,21 @@ from mcp import ClientSession
 import re
 from pixelle.web.utils.llm_util import ModelInfo, ModelType
 
-from litellm import acompletion
-
+from pixelle.web.chat.context_manager import fit_messages
+from pixelle.web.chat.llm_cache import DETERMINISTIC_PARAMS, apply_prompt_caching, llm_response_cache
 from pixelle.web.chat.starters import build_save_action
+from pixelle.web.chat.token_coalescer import TokenCoalescer
+from pixelle.web.utils.llm_clients import llm_clients
+from pixelle.web.utils.llm_router import llm_router
+from pixelle.web.chat.tool_retrieval import (
+    ALL_TOOLS_TOOL_NAME,
+    ALL_TOOLS_TOOL_RESULT,
+    requested_all_tools,
+    select_tools,
+)
 from pixelle.web.utils.time_util import format_duration
 from pixelle.logger import logger
+from pixelle.mcp_core import CATALOG_ETAG_META_KEY, WORKFLOW_TOOL_TAG
 from pixelle.settings import settings
 
 save_starter_enabled = settings.chainlit_save_starter_enabled
@@ -302,39 +313,42 @@ async def _execute_tool_calls(
         "tool_calls": tool_calls_list
     })
     
-    # Execute all tool calls
-    for tool_call in tool_calls_list:
+    # Execute tool calls concurrently, results are appended in call order
+    semaphore = asyncio.Semaphore(max(1, settings.chainlit_tool_call_concurrency))
+    
+    async def run_tool_call(tool_call: Dict[str, Any]) -> str:
         tool_name = tool_call["function"]["name"]
-        tool_args_str = tool_call["function"]["arguments"]
+        if tool_name == ALL_TOOLS_TOOL_NAME:
+            # Not an MCP tool, the next request of this turn gets the full tool set
+            return ALL_TOOLS_TOOL_RESULT
         
         try:
             # Parse tool arguments
-            tool_args = json.loads(tool_args_str)
+            tool_args = json.loads(tool_call["function"]["arguments"])
             
             # Execute tool call
-            tool_response = await execute_tool(tool_name, tool_args)
-            
-            # Add tool response to message history
-            messages.append({
-                "role": "tool",
-                "tool_call_id": tool_call["id"],
-                "content": tool_response
-            })
+            async with semaphore:
+                return await execute_tool(tool_name, tool_args)
             
         except Exception as e:
             error_message = f"Tool call error: {str(e)}"
             logger.error(error_message)
-            # Add error response to message history
-            messages.append({
-                "role": "tool",
-                "tool_call_id": tool_call["id"],
-                "content": error_message
-            })
+            return error_message
+    
+    tool_responses = await asyncio.gather(*(run_tool_call(tool_call) for tool_call in tool_calls_list))
+    
+    # Add tool responses to message history
+    for tool_call, tool_response in zip(tool_calls_list, tool_responses):
+        messages.append({
+            "role": "tool",
+            "tool_call_id": tool_call["id"],
+            "content": tool_response
+        })
     
     return messages
 
 
-async def _handle_stream_chunk(chunk, msg, current_tool_calls, current_args):
+async def _handle_stream_chunk(chunk, stream: TokenCoalescer, current_tool_calls, current_args):
     """Process a single chunk of streaming response"""
     choice = chunk.choices[0]
     delta = choice.delta
@@ -351,7 +365,7 @@ async def _handle_stream_chunk(chunk, msg, current_tool_calls, current_args):
     
     # Handle regular text response
     elif delta.content:
-        await msg.stream_token(delta.content)
+        await stream.add(delta.content)
     
     return has_tool_call, choice.finish_reason
 
@@ -360,30 +374,64 @@ async def _handle_response(model_info, api_params, enhanced_messages, messages):
     """Handle streaming response"""
     # Create independent message object for this round of response
     msg = cl.Message(content="")
+    # Deltas are sent to the UI in batches, flushed before msg.content is used
+    stream = TokenCoalescer(msg)
     
     current_tool_calls = {}
     current_args = {}
     has_tool_call = False
+    stream_finish_reason = None
     
-    try:
+    # Identical deterministic requests are answered from the response cache when it is enabled
+    cache_key = None
+    cached_response = None
+    if llm_response_cache.cacheable(api_params):
+        cache_key = llm_response_cache.make_key(model_info, api_params["messages"], api_params.get("tools"))
+        cached_response = llm_response_cache.get(cache_key)
+    
+    # Provider concurrency slot and latency metrics of the request, released once the stream ends
+    llm_request = None
+    routed = None
+    
+    def finish_request(error: Exception | None = None):
+        if llm_request is not None:
+            llm_request.finish(error)
+    
+    def build_litellm_params(target: ModelInfo) -> Dict[str, Any]:
         # Prepare LiteLLM parameters - directly pass all necessary parameters
         litellm_params = {
-            "model": f"{model_info.provider}/{model_info.model}",
+            "model": f"{target.provider}/{target.model}",
             "stream": True,
             "num_retries": 0,
-            "timeout": 30,
-            "api_key": model_info.api_key,
-            "base_url": model_info.base_url or None,
+            "api_key": target.api_key,
+            "base_url": target.base_url or None,
+            **llm_clients.get_client(target).completion_kwargs(),
             **api_params,
         }
-        
-        logger.info(f"Call LLM: {model_info.provider}/{model_info.model}")
-        response = await acompletion(**litellm_params)
+        apply_prompt_caching(target, litellm_params)
+        return litellm_params
+    
+    try:
+        if cached_response is not None:
+            logger.info(f"LLM response cache hit: {model_info.provider}/{model_info.model}")
+            response = llm_response_cache.replay(cached_response)
+        else:
+            logger.info(f"Call LLM: {model_info.provider}/{model_info.model}")
+            # May be served by a configured equivalent if the model is rate limited or slow
+            routed = await llm_router.open_stream(model_info, build_litellm_params)
+            llm_request = routed.request
+            if cache_key and routed.model_info is not model_info:
+                # The response is stored under the model that actually answered
+                cache_key = llm_response_cache.make_key(
+                    routed.model_info, api_params["messages"], api_params.get("tools")
+                )
+            model_info = routed.model_info
+            response = routed.chunks()
         
         try:
             async for chunk in response:
                 chunk_has_tool_call, finish_reason = await _handle_stream_chunk(
-                    chunk, msg, current_tool_calls, current_args
+                    chunk, stream, current_tool_calls, current_args
                 )
                 
                 if chunk_has_tool_call:
@@ -391,6 +439,12 @@ async def _handle_response(model_info, api_params, enhanced_messages, messages):
                 
                 # Check completion status
                 if finish_reason == 'tool_calls':
+                    await stream.flush()
+                    finish_request()
+                    if cache_key and cached_response is None:
+                        llm_response_cache.put(cache_key, msg.content, [
+                            {"function": dict(tool_call["function"])} for tool_call in current_tool_calls.values()
+                        ])
                     try:
                         # First send the current round's message (if there's content)
                         if msg.content and msg.content.strip():
@@ -412,8 +466,14 @@ async def _handle_response(model_info, api_params, enhanced_messages, messages):
                 
                 elif finish_reason:
                     # Other completion reasons, end streaming processing
+                    stream_finish_reason = finish_reason
                     break
             
+            await stream.flush()
+            finish_request()
+            if cache_key and cached_response is None and stream_finish_reason == "stop" and not has_tool_call:
+                llm_response_cache.put(cache_key, msg.content, [])
+            
             # Process media markers and send message
             if not has_tool_call:
                 await _process_media_markers(msg)
@@ -441,6 +501,8 @@ async def _handle_response(model_info, api_params, enhanced_messages, messages):
             error_str = str(e)
             error_message = format_llm_error_message(model_info.name, error_str)
             logger.error(f"Stream processing error: {error_str}")
+            finish_request(e)
+            await stream.flush()
             await msg.stream_token(f"\n{error_message}\n")
             # Process media markers even if there's an error
             await _process_media_markers(msg)
@@ -451,11 +513,21 @@ async def _handle_response(model_info, api_params, enhanced_messages, messages):
         error_str = str(e)
         error_message = format_llm_error_message(model_info.name, error_str)
         logger.error(f"LiteLLM call failed: {error_str}")
+        finish_request(e)
+        await stream.flush()
         await msg.stream_token(f"\n{error_message}\n")
         # Process media markers even if there's an error
         await _process_media_markers(msg)
         await msg.send()
         return messages, False
+    except asyncio.CancelledError:
+        # Stopped by the user, neither a success nor a failure of the model
+        if routed is not None:
+            await routed.cancel()
+        raise
+    finally:
+        # Any other exit must give the slot back too
+        finish_request()
 
 
 async def process_streaming_response(
@@ -491,15 +563,25 @@ async def process_streaming_response(
             # Update steps
             cl.user_session.set("current_steps", filtered_steps)
     
-    tools = get_all_tools()
+    all_tools = get_all_tools()
     
     # Inject media display system instructions
     enhanced_messages = messages.copy()
     
     while True:  # Loop to handle tool calls
-        # Prepare API parameters
+        tools = all_tools
+        if settings.chainlit_tool_retrieval_enabled and not requested_all_tools(enhanced_messages):
+            # Only the workflow tools relevant to the conversation, unless the model asked for all
+            tools = select_tools(
+                cl.user_session.get("mcp_tools", {}),
+                cl.user_session.get("mcp_workflow_tools", {}),
+                enhanced_messages,
+                settings.chainlit_tool_retrieval_top_k,
+            ) or all_tools
+        
+        # Prepare API parameters, the history is trimmed to the model's token budget
         api_params = {
-            "messages": enhanced_messages,
+            "messages": fit_messages(enhanced_messages, model_info, tools),
         }
         
         # If there are tools, add tool parameters
@@ -507,6 +589,10 @@ async def process_streaming_response(
             api_params["tools"] = tools
             api_params["tool_choice"] = "auto"
         
+        # Cached responses are only replayed for deterministic sampling
+        if llm_response_cache.enabled:
+            api_params.update(DETERMINISTIC_PARAMS)
+        
         
         # All parameters are passed through LiteLLM function parameters, not using environment variables
         try:
@@ -527,21 +613,63 @@ async def process_streaming_response(
             return enhanced_messages  # Return directly, don't continue loop
 
 
+# Converted tools per MCP connection: connection name -> (catalog ETag, openai tools, workflow tool names)
+_converted_tools_cache: Dict[str, tuple] = {}
+
+
+async def list_all_tools(session: ClientSession) -> tuple[list, str | None]:
+    """List tools of an MCP session across all pages
+    
+    Returns:
+        The tools, and the catalog ETag if the server sends one
+    """
+    tools = []
+    etag = None
+    cursor = None
+    while True:
+        tools_result = await session.list_tools(cursor)
+        tools.extend(tools_result.tools)
+        if tools_result.meta:
+            etag = tools_result.meta.get(CATALOG_ETAG_META_KEY)
+        cursor = tools_result.nextCursor
+        if not cursor:
+            return tools, etag
+
+
+def _is_workflow_tool(tool) -> bool:
+    fastmcp_meta = (tool.meta or {}).get("_fastmcp") or {}
+    return WORKFLOW_TOOL_TAG in (fastmcp_meta.get("tags") or [])
+
+
 # MCP connection management convenience functions
 async def handle_mcp_connect(connection, session: ClientSession, tools_converter_func):
     """Handle common logic for MCP connections"""
-    tools_result = await session.list_tools()
-    openai_tools = tools_converter_func(tools_result.tools)
+    tools, etag = await list_all_tools(session)
+    cached = _converted_tools_cache.get(connection.name)
+    if etag and cached and cached[0] == etag:
+        # Same tool catalog as a previous connection, skip converting it again
+        _, openai_tools, workflow_tools = cached
+    else:
+        openai_tools = tools_converter_func(tools)
+        workflow_tools = frozenset(tool.name for tool in tools if _is_workflow_tool(tool))
+        if etag:
+            _converted_tools_cache[connection.name] = (etag, openai_tools, workflow_tools)
     
     mcp_tools = cl.user_session.get("mcp_tools", {})
     mcp_tools[connection.name] = openai_tools
     cl.user_session.set("mcp_tools", mcp_tools)
+    
+    mcp_workflow_tools = cl.user_session.get("mcp_workflow_tools", {})
+    mcp_workflow_tools[connection.name] = workflow_tools
+    cl.user_session.set("mcp_workflow_tools", mcp_workflow_tools)
 
 async def handle_mcp_disconnect(name: str):
     """Handle common logic for MCP disconnections"""
     mcp_tools = cl.user_session.get("mcp_tools", {})
     if name in mcp_tools:
         del mcp_tools[name]
-    cl.user_session.set("mcp_tools", mcp_tools) 
-
- 
\ No newline at end of file
+    cl.user_session.set("mcp_tools", mcp_tools)
+    
+    mcp_workflow_tools = cl.user_session.get("mcp_workflow_tools", {})
+    mcp_workflow_tools.pop(name, None)
+    cl.user_session.set("mcp_workflow_tools", mcp_workflow_tools)
@@ -0,0 +1,202 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+Conversation context management - fits the messages sent to the LLM into the token
+budget of the model.
+
+When the conversation is over budget:
+1. Tool results of earlier tool call rounds are truncated (head and tail are kept)
+2. The oldest turns are dropped
+
+System messages and the current turn (from the last user message on) are always kept.
+The message history itself is never modified, only the request built from it.
+"""
+
+import json
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import litellm
+
+from pixelle.logger import logger
+from pixelle.settings import settings
+from pixelle.web.utils.llm_util import ModelInfo
+
+# Context window used when it is neither configured nor known to LiteLLM
+DEFAULT_CONTEXT_WINDOW = 32768
+# Tokens left free for the model's response
+OUTPUT_TOKEN_RESERVE = 4096
+
+# Characters kept from the start and end of a truncated tool result
+TOOL_RESULT_HEAD_CHARS = 600
+TOOL_RESULT_TAIL_CHARS = 300
+
+# Max number of cached per-message token counts
+TOKEN_CACHE_SIZE = 4096
+
+_token_cache: "OrderedDict[tuple, int]" = OrderedDict()
+
+
+@lru_cache(maxsize=64)
+def _lookup_context_window(provider: str, model: str) -> Optional[int]:
+    for kwargs in ({}, {"custom_llm_provider": provider}):
+        try:
+            info = litellm.get_model_info(model, **kwargs)
+            window = info.get("max_input_tokens") or info.get("max_tokens")
+            if window:
+                return int(window)
+        except Exception:
+            continue
+    return None
+
+
+def get_context_window(model_info: ModelInfo) -> int:
+    """Get the context window of a model in tokens
+
+    Order: `context_window` of the model, `CHAINLIT_CONTEXT_WINDOW` setting,
+    LiteLLM model registry, `DEFAULT_CONTEXT_WINDOW`.
+    """
+    if model_info.context_window:
+        return model_info.context_window
+    if settings.chainlit_context_window > 0:
+        return settings.chainlit_context_window
+    return _lookup_context_window(model_info.provider or "", model_info.model or model_info.name) \
+        or DEFAULT_CONTEXT_WINDOW
+
+
+def _cache_key(model: str, message: Dict[str, Any]) -> tuple:
+    content = message.get("content")
+    if not isinstance(content, str):
+        content = json.dumps(content, sort_keys=True, ensure_ascii=False)
+    tool_calls = message.get("tool_calls")
+    # Strings cache their hash, so repeated lookups of the same message are O(1)
+    return (
+        model,
+        message.get("role"),
+        content,
+        json.dumps(tool_calls, sort_keys=True) if tool_calls else None,
+    )
+
+
+def count_message_tokens(model: str, message: Dict[str, Any]) -> int:
+    """Count the tokens of one message, cached per model and message content"""
+    key = _cache_key(model, message)
+    count = _token_cache.get(key)
+    if count is not None:
+        _token_cache.move_to_end(key)
+        return count
+
+    try:
+        # Images count with a fixed estimate, measuring them would download them on the event loop
+        count = litellm.token_counter(model=model, messages=[message], use_default_image_token_count=True)
+    except Exception:
+        # Rough estimate for models without a known tokenizer
+        count = len(json.dumps(message, ensure_ascii=False)) // 3 + 4
+
+    _token_cache[key] = count
+    if len(_token_cache) > TOKEN_CACHE_SIZE:
+        _token_cache.popitem(last=False)
+    return count
+
+
+def _count_tools_tokens(model: str, tools: Optional[List[Dict[str, Any]]]) -> int:
+    if not tools:
+        return 0
+    return count_message_tokens(model, {"role": "system", "content": json.dumps(tools, ensure_ascii=False)})
+
+
+def _truncate_tool_result(message: Dict[str, Any]) -> Dict[str, Any]:
+    content = message.get("content")
+    if not isinstance(content, str) or len(content) <= TOOL_RESULT_HEAD_CHARS + TOOL_RESULT_TAIL_CHARS:
+        return message
+    omitted = len(content) - TOOL_RESULT_HEAD_CHARS - TOOL_RESULT_TAIL_CHARS
+    return {
+        **message,
+        "content": (
+            f"{content[:TOOL_RESULT_HEAD_CHARS]}\n...[{omitted} characters of an earlier tool result omitted]...\n"
+            f"{content[-TOOL_RESULT_TAIL_CHARS:]}"
+        ),
+    }
+
+
+def _group_turns(messages: List[Dict[str, Any]]) -> List[List[int]]:
+    """Group message indexes into turns, each starting at a user message
+
+    Dropping whole turns keeps assistant tool calls together with their results, and
+    the kept conversation still starts with a user message.
+    """
+    groups = []
+    for i, message in enumerate(messages):
+        if message.get("role") == "system":
+            continue
+        if message.get("role") == "user" or not groups:
+            groups.append([i])
+        else:
+            groups[-1].append(i)
+    return groups
+
+
+def fit_messages(
+    messages: List[Dict[str, Any]],
+    model_info: ModelInfo,
+    tools: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Fit messages into the token budget of a model
+
+    Args:
+        messages: Full message history, left unmodified
+        model_info: Model the messages are sent to
+        tools: Tool definitions sent with the messages, they count towards the budget
+
+    Returns:
+        The messages to send, the history itself if it fits
+    """
+    model = model_info.model or model_info.name
+    context_window = get_context_window(model_info)
+    budget = context_window - min(OUTPUT_TOKEN_RESERVE, context_window // 4) - _count_tools_tokens(model, tools)
+
+    counts = [count_message_tokens(model, message) for message in messages]
+    total = sum(counts)
+    if total <= budget:
+        return messages
+
+    # The current turn starts at the last user message
+    turn_start = len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].get("role") == "user":
+            turn_start = i
+            break
+    # Tool results of the last tool call round are kept whole
+    last_round = len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].get("tool_calls"):
+            last_round = i
+            break
+
+    fitted = list(messages)
+    for i, message in enumerate(messages):
+        if total <= budget:
+            break
+        if message.get("role") == "tool" and i < last_round:
+            fitted[i] = _truncate_tool_result(message)
+            if fitted[i] is not message:
+                new_count = count_message_tokens(model, fitted[i])
+                total += new_count - counts[i]
+                counts[i] = new_count
+
+    if total > budget:
+        dropped = set()
+        for group in _group_turns(messages):
+            if total <= budget or group[0] >= turn_start:
+                break
+            dropped.update(group)
+            total -= sum(counts[i] for i in group)
+        fitted = [message for i, message in enumerate(fitted) if i not in dropped]
+        if dropped:
+            logger.info(f"Context over budget, dropped {len(dropped)} of {len(messages)} messages")
+
+    if total > budget:
+        logger.warning(f"Context still exceeds budget after trimming: {total} > {budget} tokens")
+    return fitted
@@ -0,0 +1,148 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+LLM request caching.
+
+- Response cache (opt-in, `CHAINLIT_LLM_CACHE_ENABLED`): completed responses are stored
+  per (model, normalized messages, tool set) and replayed as a stream for identical
+  requests, e.g. starters and common first messages. Tool calls of a replayed response
+  are executed again, only the LLM round trip is skipped. A sampled response is one of
+  many possible answers, so with the cache enabled requests are sent with temperature 0
+  and only such deterministic requests are cached.
+- Prompt caching: for providers that need explicit markers (Anthropic), the system
+  prompt and tool definitions are marked cacheable so the static prefix is billed and
+  processed once per cache lifetime. OpenAI-compatible providers cache prefixes
+  automatically.
+"""
+
+import hashlib
+import json
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from pixelle.settings import settings
+from pixelle.web.utils.llm_util import ModelInfo, ModelType
+
+# Max number of cached responses
+LLM_CACHE_SIZE = 256
+
+# Providers that only cache prompts marked with `cache_control`
+PROMPT_CACHE_CONTROL_TYPES = {ModelType.CLAUDE}
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Characters per replayed content chunk
+REPLAY_CHUNK_CHARS = 64
+
+# Sampling parameters of cacheable requests
+DETERMINISTIC_PARAMS = {"temperature": 0}
+
+
+@dataclass
+class CachedResponse:
+    content: str
+    tool_calls: List[Dict[str, Any]]
+    created_at: float
+
+
+def _normalize_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop the parts of messages that differ between identical conversations
+
+    Tool call ids are generated by the provider, they are replaced with their position.
+    """
+    id_map: Dict[str, str] = {}
+    normalized = []
+    for message in messages:
+        item = {"role": message.get("role")}
+        content = message.get("content")
+        item["content"] = content.strip() if isinstance(content, str) else content
+        if message.get("tool_calls"):
+            item["tool_calls"] = []
+            for tool_call in message["tool_calls"]:
+                id_map.setdefault(tool_call.get("id"), str(len(id_map)))
+                item["tool_calls"].append({
+                    "id": id_map[tool_call.get("id")],
+                    "name": tool_call["function"]["name"],
+                    "arguments": tool_call["function"]["arguments"],
+                })
+        if message.get("tool_call_id"):
+            item["tool_call_id"] = id_map.get(message["tool_call_id"], message["tool_call_id"])
+        normalized.append(item)
+    return normalized
+
+
+class LLMResponseCache:
+    """In-memory LRU cache of completed LLM responses"""
+
+    def __init__(self, max_entries: int = LLM_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.chainlit_llm_cache_enabled
+
+    def cacheable(self, params: Dict[str, Any]) -> bool:
+        """Whether the request samples deterministically, other responses are not cached"""
+        return self.enabled and all(params.get(name) == value for name, value in DETERMINISTIC_PARAMS.items())
+
+    def make_key(self, model_info: ModelInfo, messages: List[Dict[str, Any]],
+                 tools: Optional[List[Dict[str, Any]]]) -> str:
+        """Cache key of a request: model, normalized messages and the exact tool set"""
+        payload = json.dumps(
+            [f"{model_info.provider}/{model_info.model}", _normalize_messages(messages), tools or []],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.created_at > settings.chainlit_llm_cache_ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, content: str, tool_calls: List[Dict[str, Any]]):
+        self._entries[key] = CachedResponse(content, tool_calls, time.time())
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def replay(self, entry: CachedResponse) -> AsyncIterator[Any]:
+        """Replay a cached response as stream chunks shaped like LiteLLM's"""
+        def chunk(content=None, tool_calls=None, finish_reason=None):
+            delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+            return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+        for i in range(0, len(entry.content), REPLAY_CHUNK_CHARS):
+            yield chunk(content=entry.content[i:i + REPLAY_CHUNK_CHARS])
+        for index, tool_call in enumerate(entry.tool_calls):
+            # Fresh ids, a replayed call must not clash with earlier calls of the conversation
+            yield chunk(tool_calls=[SimpleNamespace(
+                index=index,
+                id=f"call_{uuid.uuid4().hex[:24]}",
+                function=SimpleNamespace(**tool_call["function"]),
+            )])
+        yield chunk(finish_reason="tool_calls" if entry.tool_calls else "stop")
+
+
+llm_response_cache = LLMResponseCache()
+
+
+def apply_prompt_caching(model_info: ModelInfo, litellm_params: Dict[str, Any]):
+    """Mark the static prompt prefix (system prompt, tools) cacheable for the provider"""
+    if not settings.chainlit_prompt_caching_enabled or model_info.type not in PROMPT_CACHE_CONTROL_TYPES:
+        return
+    litellm_params["cache_control_injection_points"] = [{"location": "message", "role": "system"}]
+    tools = litellm_params.get("tools")
+    if tools:
+        # A marker on the last tool caches all tool definitions before it
+        litellm_params["tools"] = tools[:-1] + [{**tools[-1], "cache_control": CACHE_CONTROL}]
@@ -0,0 +1,75 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+Token coalescer - batches streamed LLM deltas before they are sent to the UI, so a
+response costs a few dozen websocket events instead of one per token.
+"""
+
+import asyncio
+import time
+
+from pixelle.settings import settings
+
+
+class TokenCoalescer:
+    """
+    Buffer stream tokens of a message and emit them in batches.
+
+    A batch is emitted once `interval_ms` passed since the last emit or `max_chars`
+    characters are buffered, whichever comes first. A timer flushes the buffer when no
+    further content delta arrives in time (tool call deltas, provider stalls), so no
+    delta is held back longer than `interval_ms`. `flush()` must still be called before
+    the message content is used or sent.
+    The first token is emitted right away to keep time-to-first-token unchanged.
+    """
+
+    def __init__(self, msg, interval_ms: int | None = None, max_chars: int | None = None):
+        """
+        Args:
+            msg: The Chainlit message to stream into
+            interval_ms: Max milliseconds a delta is held back, 0 emits every delta
+            max_chars: Max buffered characters before emitting
+        """
+        self.msg = msg
+        self.interval = (settings.chainlit_stream_flush_interval_ms if interval_ms is None else interval_ms) / 1000
+        self.max_chars = settings.chainlit_stream_flush_chars if max_chars is None else max_chars
+        self._buffer: list[str] = []
+        self._buffered_chars = 0
+        self._last_emit = 0.0
+        self._timer: asyncio.Task | None = None
+        # Keeps batches in order when the timer and `add()` flush at the same time
+        self._emit_lock = asyncio.Lock()
+        self.emitted_events = 0
+
+    async def add(self, token: str):
+        """Add a streamed delta, emitting the buffer if the batch window is full"""
+        if not token:
+            return
+        self._buffer.append(token)
+        self._buffered_chars += len(token)
+        if (self._buffered_chars >= self.max_chars
+                or time.monotonic() - self._last_emit >= self.interval):
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Emit all buffered deltas"""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffered_chars = 0
+        self._last_emit = time.monotonic()
+        self.emitted_events += 1
+        async with self._emit_lock:
+            await self.msg.stream_token(text)
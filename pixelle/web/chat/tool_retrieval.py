@@ -0,0 +1,212 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+Tool retrieval - selects the tools relevant to a user message, so the LLM is not sent
+the full definition of every workflow tool on every request.
+
+Workflow tools are ranked with BM25 over their name, description and parameters.
+All other tools (system tools, tools of other MCP servers) are always sent, together
+with a tool the model can call to get the full tool set for the rest of the turn.
+"""
+
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+from pixelle.logger import logger
+
+# Tool offered to the model to switch to the full tool set
+ALL_TOOLS_TOOL_NAME = "load_all_tools"
+ALL_TOOLS_TOOL = {
+    "type": "function",
+    "function": {
+        "name": ALL_TOOLS_TOOL_NAME,
+        "description": (
+            "Only a subset of the available tools is currently offered. Call this to get "
+            "all tools if none of the offered tools fits the user's request."
+        ),
+        "parameters": {"type": "object", "properties": {}, "required": []},
+    },
+}
+ALL_TOOLS_TOOL_RESULT = "All tools are now available."
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Name tokens count this many times, names are the strongest signal
+NAME_WEIGHT = 3
+
+# Max number of tool indexes kept in memory
+INDEX_CACHE_SIZE = 8
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+")
+_CAMEL_CASE_PATTERN = re.compile(r"([a-z0-9])([A-Z])")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into search tokens
+
+    Latin text is split on non-alphanumerics, snake_case and camelCase. CJK text has no
+    word boundaries and is indexed as single characters plus character bigrams.
+    """
+    if not text:
+        return []
+    text = _CAMEL_CASE_PATTERN.sub(r"\1 \2", text).lower()
+    tokens = []
+    for match in _TOKEN_PATTERN.findall(text):
+        if match[0].isascii():
+            tokens.append(match)
+        else:
+            tokens.extend(match)
+            tokens.extend(match[i:i + 2] for i in range(len(match) - 1))
+    return tokens
+
+
+def _tool_tokens(tool: Dict[str, Any]) -> List[str]:
+    function = tool.get("function", {})
+    tokens = tokenize(function.get("name", "")) * NAME_WEIGHT
+    tokens += tokenize(function.get("description") or "")
+    properties = function.get("parameters", {}).get("properties", {})
+    for param_name, param in properties.items():
+        tokens += tokenize(param_name)
+        if isinstance(param, dict):
+            tokens += tokenize(param.get("description") or "")
+    return tokens
+
+
+class ToolIndex:
+    """BM25 index over a fixed list of OpenAI tool definitions"""
+
+    def __init__(self, tools: List[Dict[str, Any]]):
+        self.tools = tools
+        self._term_freqs = [Counter(_tool_tokens(tool)) for tool in tools]
+        self._doc_lens = [sum(freqs.values()) for freqs in self._term_freqs]
+        self._avg_doc_len = (sum(self._doc_lens) / len(tools)) if tools else 0.0
+        doc_freqs = Counter(term for freqs in self._term_freqs for term in freqs)
+        n = len(tools)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freqs.items()
+        }
+
+    def search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Get the `top_k` tools best matching a query, tools without any match are left out"""
+        query_terms = set(tokenize(query)) & self._idf.keys()
+        if not query_terms:
+            return []
+
+        scores = []
+        for i, freqs in enumerate(self._term_freqs):
+            score = 0.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lens[i] / (self._avg_doc_len or 1))
+            for term in query_terms:
+                tf = freqs.get(term)
+                if tf:
+                    score += self._idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+            if score > 0:
+                scores.append((score, i))
+
+        scores.sort(key=lambda item: (-item[0], item[1]))
+        return [self.tools[i] for _, i in scores[:top_k]]
+
+
+# Index per tool set, keyed by the identity of the per-connection tool lists and name
+# sets. Those are replaced (not mutated) when tools change, so a new key means new tools.
+_index_cache: "OrderedDict[tuple, tuple[list, ToolIndex]]" = OrderedDict()
+
+
+def _get_index(sources: List[tuple[str, List[Dict[str, Any]], Set[str]]]) -> ToolIndex:
+    key = tuple((name, id(tools), id(names)) for name, tools, names in sources)
+    cached = _index_cache.get(key)
+    if cached is not None:
+        _index_cache.move_to_end(key)
+        return cached[1]
+
+    index = ToolIndex([
+        tool for _, tools, names in sources for tool in tools
+        if tool["function"]["name"] in names
+    ])
+    # Keep the sources alive, so their ids are not reused while the entry exists
+    _index_cache[key] = (sources, index)
+    if len(_index_cache) > INDEX_CACHE_SIZE:
+        _index_cache.popitem(last=False)
+    return index
+
+
+def _used_tool_names(messages: List[Dict[str, Any]]) -> Set[str]:
+    """Names of the tools already called in the conversation"""
+    names = set()
+    for message in messages:
+        for tool_call in message.get("tool_calls") or []:
+            names.add(tool_call["function"]["name"])
+    return names
+
+
+def _last_user_text(messages: List[Dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            content = message.get("content")
+            if isinstance(content, str):
+                return content
+            if isinstance(content, list):
+                return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+            return ""
+    return ""
+
+
+def select_tools(
+    mcp_tools: Dict[str, List[Dict[str, Any]]],
+    retrievable_names: Dict[str, Set[str]],
+    messages: List[Dict[str, Any]],
+    top_k: int,
+) -> Optional[List[Dict[str, Any]]]:
+    """Select the tools to send to the LLM for a conversation
+
+    Args:
+        mcp_tools: OpenAI tool definitions per MCP connection
+        retrievable_names: Names of the tools per MCP connection that are selected by
+            relevance (workflow tools), all other tools are always included
+        messages: Conversation messages, the last user message is the search query
+        top_k: Max number of retrieved tools
+
+    Returns:
+        The selected tools, or None if the full tool set should be used
+    """
+    sources = []
+    always_on = []
+    for connection_name, tools in mcp_tools.items():
+        names = retrievable_names.get(connection_name)
+        if not names:
+            always_on.extend(tools)
+            continue
+        sources.append((connection_name, tools, names))
+        always_on.extend(tool for tool in tools if tool["function"]["name"] not in names)
+
+    if not sources:
+        return None
+    index = _get_index(sources)
+    if len(index.tools) <= top_k:
+        return None
+    selected = index.search(_last_user_text(messages), top_k)
+
+    # Tools called earlier in the conversation stay available for follow-up requests
+    selected_names = {tool["function"]["name"] for tool in selected}
+    used_names = _used_tool_names(messages) - selected_names
+    if used_names:
+        selected += [tool for tool in index.tools if tool["function"]["name"] in used_names]
+
+    logger.info(f"Tool retrieval: {len(selected)} of {len(index.tools)} workflow tools selected")
+    return always_on + selected + [ALL_TOOLS_TOOL]
+
+
+def requested_all_tools(messages: List[Dict[str, Any]]) -> bool:
+    """Check whether the model asked for the full tool set in the current turn"""
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return False
+        for tool_call in message.get("tool_calls") or []:
+            if tool_call["function"]["name"] == ALL_TOOLS_TOOL_NAME:
+                return True
+    return False
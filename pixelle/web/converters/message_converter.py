@@ -1,26 +1,74 @@
 # Copyright (C) 2025 AIDC-AI
 # This project is licensed under the MIT License (SPDX-License-identifier: MIT).
 
-from pixelle.utils.file_uploader import upload
+import asyncio
+from typing import Dict, Optional, Tuple
+
+from pixelle.utils.file_uploader import aupload
 import chainlit as cl
 
-def messages_from_chaintlit_to_openai(cl_messages: list[cl.Message]) -> list[dict]:
+
+async def _element_url(element) -> str:
+    """Get the URL of a message element, uploading its file once"""
+    if not element.url:
+        # Remember the URL on the element, so the file is not uploaded again next turn
+        element.url = await aupload(element.path)
+    return element.url
+
+
+async def _convert_message(cl_message: cl.Message) -> dict:
+    content = cl_message.content
+    elements = cl_message.elements
+    if elements:
+        urls = await asyncio.gather(*(_element_url(element) for element in elements))
+        ext_info = f"\n\nAttachments of current message:"
+        for i, (element, url) in enumerate(zip(elements, urls)):
+            ext_info += f"\n{i+1}. Type: {element.mime}, Name: {element.name}, URL: {url}"
+        content += ext_info
+
+    if cl_message.type == "assistant_message":
+        return {"role": "assistant", "content": content}
+    elif cl_message.type == "user_message":
+        return {"role": "user", "content": content}
+    else:
+        return {"role": "system", "content": content}
+
+
+async def messages_from_chaintlit_to_openai(
+    cl_messages: list[cl.Message],
+    cache: Optional[Dict[str, Tuple[int, dict]]] = None,
+) -> list[dict]:
+    """Convert Chainlit messages to OpenAI messages
+
+    Args:
+        cl_messages: Chainlit messages of the conversation
+        cache: Per-session conversion cache, message id -> (content hash, converted message).
+            Only new or edited messages are converted again, entries of messages no longer
+            in the conversation are removed.
+
+    Returns:
+        OpenAI messages
+    """
     messages = []
     for cl_message in cl_messages:
-        content = cl_message.content
-        elements = cl_message.elements
-        if elements:
-            ext_info = f"\n\nAttachments of current message:"
-            for i, element in enumerate(elements):
-                url = element.url or upload(element.path)
-                ext_info += f"\n{i+1}. Type: {element.mime}, Name: {element.name}, URL: {url}"
-            content += ext_info
-        
-        if cl_message.type == "assistant_message":
-            messages.append({"role": "assistant", "content": content})
-        elif cl_message.type == "user_message":
-            messages.append({"role": "user", "content": content})
-        else:
-            messages.append({"role": "system", "content": content})
+        key = hash((
+            cl_message.type,
+            cl_message.content,
+            tuple(element.id for element in cl_message.elements or []),
+        ))
+        cached = cache.get(cl_message.id) if cache is not None else None
+        if cached is not None and cached[0] == key:
+            messages.append(cached[1])
+            continue
+
+        converted = await _convert_message(cl_message)
+        if cache is not None:
+            cache[cl_message.id] = (key, converted)
+        messages.append(converted)
+
+    if cache is not None and len(cache) > len(cl_messages):
+        current_ids = {cl_message.id for cl_message in cl_messages}
+        for message_id in [message_id for message_id in cache if message_id not in current_ids]:
+            del cache[message_id]
 
     return messages
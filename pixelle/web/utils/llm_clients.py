@@ -0,0 +1,266 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+LLM provider clients - one pooled HTTP client per configured provider endpoint,
+with per-provider timeouts, concurrency limits, warm-up and latency metrics.
+
+OpenAI-compatible endpoints (OpenAI, Ollama, Gemini, Qwen) get their own
+`AsyncOpenAI` client, passed to LiteLLM, whose connections are kept alive across
+requests and opened at startup by `warm_up_all()`. Other providers use LiteLLM's
+internal clients and only get timeouts, limits and metrics.
+"""
+
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+from pixelle.logger import logger
+from pixelle.settings import settings
+from pixelle.web.utils.llm_util import ModelInfo, get_all_models
+
+try:
+    import h2  # noqa: F401  HTTP/2 support of httpx is optional
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Idle connections are kept this many seconds, so a message after a quiet period
+# does not pay for DNS and TLS again (httpx closes them after 5s by default)
+KEEPALIVE_EXPIRY = 300.0
+WARM_UP_TIMEOUT = 10.0
+
+# Number of recent requests the latency metrics are computed over
+METRICS_WINDOW = 100
+
+# Consecutive failures after which a model is skipped for `LLM_COOLDOWN` seconds,
+# rate limited models are skipped right away
+FAILURES_BEFORE_COOLDOWN = 3
+
+
+def _retry_after(error: BaseException, default: float) -> float:
+    """Seconds from the Retry-After header of a rate limit response, if the provider sent one"""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return default
+
+
+def _parse_provider_overrides(value: str) -> Dict[str, Dict[str, float]]:
+    """Parse `LLM_PROVIDER_OVERRIDES`, e.g. "claude.timeout=60,ollama.max_concurrency=2" """
+    overrides: Dict[str, Dict[str, float]] = {}
+    for item in value.split(","):
+        key, _, raw = item.strip().partition("=")
+        provider, _, option = key.strip().partition(".")
+        if not provider or option not in ("timeout", "max_concurrency") or not raw:
+            if item.strip():
+                logger.warning(f"Ignoring invalid LLM provider override: {item.strip()}")
+            continue
+        try:
+            overrides.setdefault(provider.lower(), {})[option] = float(raw)
+        except ValueError:
+            logger.warning(f"Ignoring invalid LLM provider override: {item.strip()}")
+    return overrides
+
+
+class ModelMetrics:
+    """Rolling request metrics of one model"""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.requests = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.ttft = deque(maxlen=METRICS_WINDOW)  # seconds to the first streamed token
+        self.durations = deque(maxlen=METRICS_WINDOW)  # seconds to the end of the stream
+        # (monotonic time, seconds to first token or None, succeeded) of recent requests
+        self.outcomes = deque(maxlen=METRICS_WINDOW)
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+
+    def record_outcome(self, ttft: Optional[float], error: Optional[BaseException]):
+        """Record a finished request, rate limits and repeated failures start a cooldown"""
+        now = time.monotonic()
+        self.outcomes.append((now, ttft, error is None))
+        if error is None:
+            self.consecutive_errors = 0
+            return
+        self.consecutive_errors += 1
+        if getattr(error, "status_code", None) == 429:
+            self.cooldown_until = now + _retry_after(error, settings.llm_cooldown)
+        elif self.consecutive_errors >= FAILURES_BEFORE_COOLDOWN:
+            self.cooldown_until = now + settings.llm_cooldown
+
+    @property
+    def cooling_down(self) -> bool:
+        return time.monotonic() < self.cooldown_until
+
+    def recent(self, window: float) -> Tuple[Optional[float], Optional[float], int]:
+        """Error rate, median time to first token and request count of the last `window` seconds"""
+        since = time.monotonic() - window
+        outcomes = [outcome for outcome in self.outcomes if outcome[0] >= since]
+        if not outcomes:
+            return None, None, 0
+        error_rate = sum(1 for _, _, ok in outcomes if not ok) / len(outcomes)
+        ttft = [value for _, value, _ in outcomes if value is not None]
+        return error_rate, statistics.median(ttft) if ttft else None, len(outcomes)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ttft = sorted(self.ttft)
+        return {
+            "provider": self.provider,
+            "requests": self.requests,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "ttft_p50_ms": round(statistics.median(ttft) * 1000, 1) if ttft else None,
+            "ttft_p95_ms": round(ttft[max(0, int(len(ttft) * 0.95) - 1)] * 1000, 1) if ttft else None,
+            "avg_duration_ms": round(statistics.mean(self.durations) * 1000, 1) if self.durations else None,
+            "cooldown_s": round(max(0.0, self.cooldown_until - time.monotonic()), 1),
+        }
+
+
+class LLMRequest:
+    """One in-flight LLM request, holds a concurrency slot of its provider until finished"""
+
+    def __init__(self, client: "ProviderClient", metrics: ModelMetrics):
+        self.client = client
+        self.metrics = metrics
+        self.started_at = time.perf_counter()
+        self._first_token_at: Optional[float] = None
+        self._finished = False
+        metrics.requests += 1
+
+    def first_token(self):
+        """Record the time to the first streamed token, only the first call counts"""
+        if self._first_token_at is None:
+            self._first_token_at = time.perf_counter()
+            self.metrics.ttft.append(self._first_token_at - self.started_at)
+
+    def finish(self, error: Optional[BaseException] = None):
+        """Release the concurrency slot and record the outcome, later calls are ignored"""
+        if self._finished:
+            return
+        self._finished = True
+        self.client.semaphore.release()
+        if error is not None:
+            self.metrics.errors += 1
+            self.metrics.last_error = str(error)[:200]
+        else:
+            self.metrics.durations.append(time.perf_counter() - self.started_at)
+        ttft = self._first_token_at - self.started_at if self._first_token_at is not None else None
+        self.metrics.record_outcome(ttft, error)
+
+    def cancel(self):
+        """Release the concurrency slot without recording an outcome, e.g. a lost hedged request"""
+        if self._finished:
+            return
+        self._finished = True
+        self.metrics.requests -= 1
+        self.client.semaphore.release()
+
+
+class ProviderClient:
+    """Pooled client and limits of one provider endpoint"""
+
+    def __init__(self, model_info: ModelInfo, timeout: float, max_concurrency: int):
+        self.name = model_info.type.value
+        self.base_url = model_info.base_url
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(max_concurrency if max_concurrency > 0 else 2 ** 31)
+        self.openai_client: Optional[AsyncOpenAI] = None
+        if model_info.provider == "openai":
+            http_client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=max_concurrency if max_concurrency > 0 else None,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+            )
+            self.openai_client = AsyncOpenAI(
+                api_key=model_info.api_key,
+                base_url=model_info.base_url or None,
+                timeout=timeout,
+                max_retries=0,
+                http_client=http_client,
+            )
+
+    def completion_kwargs(self) -> Dict[str, Any]:
+        """Extra LiteLLM `acompletion` parameters for this provider"""
+        kwargs: Dict[str, Any] = {"timeout": self.timeout}
+        if self.openai_client is not None:
+            kwargs["client"] = self.openai_client
+        return kwargs
+
+    async def warm_up(self):
+        """Open a pooled connection (DNS, TCP, TLS) ahead of the first request"""
+        if self.openai_client is None:
+            return
+        start = time.perf_counter()
+        try:
+            await self.openai_client.models.list(timeout=WARM_UP_TIMEOUT)
+        except Exception as e:
+            # Any HTTP response (e.g. 404 of endpoints without /models) leaves a warm connection
+            logger.debug(f"LLM warm-up request to {self.name} failed: {e}")
+        logger.info(f"Warmed up LLM provider {self.name} ({self.base_url}) in "
+                     f"{(time.perf_counter() - start) * 1000:.0f}ms")
+
+    async def close(self):
+        if self.openai_client is not None:
+            await self.openai_client.close()
+
+
+class LLMClientRegistry:
+    """Provider clients shared by all chat sessions, keyed by provider endpoint and API key"""
+
+    def __init__(self):
+        self._clients: Dict[tuple, ProviderClient] = {}
+        self._metrics: Dict[str, ModelMetrics] = {}
+        self._overrides = _parse_provider_overrides(settings.llm_provider_overrides)
+
+    def get_client(self, model_info: ModelInfo) -> ProviderClient:
+        key = (model_info.type, model_info.provider, model_info.base_url, model_info.api_key)
+        client = self._clients.get(key)
+        if client is None:
+            override = self._overrides.get(model_info.type.value, {})
+            client = ProviderClient(
+                model_info,
+                timeout=override.get("timeout", settings.llm_timeout),
+                max_concurrency=int(override.get("max_concurrency", settings.llm_max_concurrency)),
+            )
+            self._clients[key] = client
+        return client
+
+    def get_metrics(self, model_info: ModelInfo) -> ModelMetrics:
+        metrics = self._metrics.get(model_info.name)
+        if metrics is None:
+            metrics = self._metrics[model_info.name] = ModelMetrics(model_info.type.value)
+        return metrics
+
+    async def start_request(self, model_info: ModelInfo) -> LLMRequest:
+        """Wait for a concurrency slot of the model's provider and start a request"""
+        client = self.get_client(model_info)
+        await client.semaphore.acquire()
+        return LLMRequest(client, self.get_metrics(model_info))
+
+    async def warm_up_all(self):
+        """Create the clients of all configured models and warm up their connections"""
+        clients = {id(client): client for client in map(self.get_client, get_all_models())}
+        await asyncio.gather(*(client.warm_up() for client in clients.values()))
+
+    def metrics_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Latency and error metrics per model"""
+        return {name: metrics.snapshot() for name, metrics in self._metrics.items()}
+
+    async def close(self):
+        await asyncio.gather(*(client.close() for client in self._clients.values()), return_exceptions=True)
+        self._clients.clear()
+
+
+llm_clients = LLMClientRegistry()
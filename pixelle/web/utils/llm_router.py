@@ -0,0 +1,258 @@
+# Copyright (C) 2025 AIDC-AI
+# This project is licensed under the MIT License (SPDX-License-identifier: MIT).
+
+"""
+LLM fallback routing - picks the model that serves a request among the selected
+model and its configured equivalents (`LLM_FALLBACK_MODELS`).
+
+- Rate limited or repeatedly failing models are skipped during their cooldown.
+- A model with a high recent error rate, or a first token much slower than an
+  equivalent's, is tried after its equivalents.
+- Rate limits, timeouts, connection and server errors before the first token fail
+  over to the next equivalent. Once tokens are streamed, the response is not switched.
+- With `LLM_HEDGE_AFTER`, the next equivalent is started when no first token arrived
+  in time; the first stream to produce a token is used and the other is cancelled.
+- A token is the first content or tool call delta, role-only chunks don't count.
+"""
+
+import asyncio
+import inspect
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import litellm
+from litellm import acompletion
+
+from pixelle.logger import logger
+from pixelle.settings import settings
+from pixelle.web.utils.llm_clients import LLMRequest, llm_clients
+from pixelle.web.utils.llm_util import ModelInfo, get_all_models
+
+# Seconds of recent requests the routing decisions are based on, older samples are
+# ignored so a demoted model is tried again once it has been unused for a while
+ROUTING_WINDOW = 300.0
+# Min recent requests of a model before its error rate or latency is judged
+MIN_SAMPLES = 5
+# Recent error rate above which a model is tried after its equivalents
+MAX_ERROR_RATE = 0.5
+# A model is tried after its equivalents when its median time to first token is
+# this many times the fastest equivalent's
+SLOW_FACTOR = 2.0
+
+# Errors worth retrying on an equivalent model, other errors (e.g. an invalid API
+# key or request) are returned right away
+RETRYABLE_ERRORS = (
+    litellm.RateLimitError,
+    litellm.Timeout,
+    litellm.APIConnectionError,
+    litellm.ServiceUnavailableError,
+    litellm.InternalServerError,
+    asyncio.TimeoutError,
+)
+
+
+def _parse_fallback_models(value: str) -> Dict[str, List[str]]:
+    """Parse `LLM_FALLBACK_MODELS`, e.g. "gpt-4o=claude-sonnet-4|qwen-max,gpt-4o-mini=deepseek-chat" """
+    fallbacks: Dict[str, List[str]] = {}
+    for item in value.split(","):
+        name, _, equivalents = item.strip().partition("=")
+        names = [equivalent.strip() for equivalent in equivalents.split("|") if equivalent.strip()]
+        if not name.strip() or not names:
+            if item.strip():
+                logger.warning(f"Ignoring invalid LLM fallback mapping: {item.strip()}")
+            continue
+        fallbacks[name.strip()] = names
+    return fallbacks
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and status_code >= 500
+
+
+async def _close_stream(response: Any):
+    """Close the HTTP stream of an unused LiteLLM response"""
+    stream = getattr(response, "completion_stream", response)
+    close = getattr(stream, "aclose", None) or getattr(stream, "close", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.debug(f"Failed to close LLM stream: {e}")
+
+
+def _has_output(chunk: Any) -> bool:
+    """Whether a stream chunk carries content or tool calls, not only e.g. the role"""
+    for choice in getattr(chunk, "choices", None) or []:
+        delta = getattr(choice, "delta", None)
+        if getattr(delta, "content", None) or getattr(delta, "tool_calls", None):
+            return True
+    return False
+
+
+def _is_final(chunk: Any) -> bool:
+    return any(getattr(choice, "finish_reason", None) for choice in getattr(chunk, "choices", None) or [])
+
+
+@dataclass
+class RoutedStream:
+    """A started LLM stream whose first output (or end) has arrived"""
+    model_info: ModelInfo
+    request: LLMRequest
+    response: Any
+    # Chunks read up to the first one with output
+    first_chunks: List[Any]
+    # The stream ended before producing output
+    exhausted: bool = False
+
+    async def chunks(self) -> AsyncIterator[Any]:
+        for chunk in self.first_chunks:
+            yield chunk
+        if self.exhausted:
+            return
+        async for chunk in self.response:
+            yield chunk
+
+    async def cancel(self):
+        """Abandon the stream, e.g. stopped by the user, without recording an outcome"""
+        self.request.cancel()
+        await _close_stream(self.response)
+
+
+class LLMRouter:
+    """Routes LLM requests to a model and its configured equivalents"""
+
+    def __init__(self):
+        self._fallbacks = _parse_fallback_models(settings.llm_fallback_models)
+
+    def candidates(self, model_info: ModelInfo) -> List[ModelInfo]:
+        """The model and its equivalents, in the order they should be tried"""
+        models = {m.name: m for m in reversed(get_all_models())}
+        chain = [model_info]
+        for name in self._fallbacks.get(model_info.name, []):
+            fallback = models.get(name)
+            if fallback is None:
+                logger.warning(f"Fallback model `{name}` of `{model_info.name}` is not configured")
+            elif fallback.name not in {m.name for m in chain}:
+                chain.append(fallback)
+        if len(chain) == 1:
+            return chain
+
+        # Skip cooling down models, unless all of them are
+        available = [m for m in chain if not llm_clients.get_metrics(m).cooling_down] or chain
+
+        recent = {m.name: llm_clients.get_metrics(m).recent(ROUTING_WINDOW) for m in available}
+        ttfts = [ttft for _, ttft, count in recent.values() if ttft is not None and count >= MIN_SAMPLES]
+        fastest = min(ttfts) if ttfts else None
+
+        def degraded(m: ModelInfo) -> bool:
+            error_rate, ttft, count = recent[m.name]
+            if count < MIN_SAMPLES:
+                return False
+            if error_rate is not None and error_rate > MAX_ERROR_RATE:
+                return True
+            return ttft is not None and fastest is not None and ttft > fastest * SLOW_FACTOR
+
+        # Stable sort, healthy models keep their configured order
+        return sorted(available, key=degraded)
+
+    async def _open(self, model_info: ModelInfo, litellm_params: Dict[str, Any]) -> RoutedStream:
+        """Start a request and wait for its first content or tool call chunk"""
+        request = await llm_clients.start_request(model_info)
+        response = None
+        try:
+            response = await acompletion(**litellm_params)
+            response = response.__aiter__()
+            first_chunks = []
+            while True:
+                try:
+                    chunk = await response.__anext__()
+                except StopAsyncIteration:
+                    return RoutedStream(model_info, request, response, first_chunks, exhausted=True)
+                first_chunks.append(chunk)
+                # Role-only deltas don't count as the first token
+                if _has_output(chunk):
+                    request.first_token()
+                    return RoutedStream(model_info, request, response, first_chunks)
+                if _is_final(chunk):
+                    return RoutedStream(model_info, request, response, first_chunks)
+        except asyncio.CancelledError:
+            # Lost a hedge race, not a failure of the model
+            request.cancel()
+            if response is not None:
+                await _close_stream(response)
+            raise
+        except Exception as e:
+            request.finish(e)
+            raise
+
+    async def open_stream(
+        self,
+        model_info: ModelInfo,
+        build_params: Callable[[ModelInfo], Dict[str, Any]],
+    ) -> RoutedStream:
+        """Start a streaming completion on the model or one of its equivalents
+
+        Args:
+            model_info: The selected model
+            build_params: Builds the LiteLLM `acompletion` parameters for a model
+
+        Returns:
+            The stream that produced the first output, its request must be finished
+            (or the stream cancelled) by the caller
+
+        Raises:
+            The error of the last tried model, if none of them could start streaming
+        """
+        remaining = self.candidates(model_info)
+        attempts: Dict[asyncio.Task, ModelInfo] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch():
+            candidate = remaining.pop(0)
+            if candidate is not model_info:
+                logger.info(f"Call LLM: {candidate.provider}/{candidate.model} (equivalent of {model_info.name})")
+            attempts[asyncio.create_task(self._open(candidate, build_params(candidate)))] = candidate
+
+        launch()
+        try:
+            while attempts:
+                hedge_after = settings.llm_hedge_after if settings.llm_hedge_after > 0 and remaining else None
+                done, _ = await asyncio.wait(attempts, timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"No first token after {hedge_after}s, hedging with {remaining[0].name}")
+                    launch()
+                    continue
+
+                winner = None
+                for task in done:
+                    candidate = attempts.pop(task)
+                    try:
+                        stream = task.result()
+                    except Exception as e:
+                        logger.warning(f"LLM {candidate.name} failed before streaming: {e}")
+                        last_error = e
+                        continue
+                    if winner is None:
+                        winner = stream
+                    else:
+                        await stream.cancel()
+                if winner is not None:
+                    return winner
+
+                if not attempts and remaining and last_error is not None and is_retryable(last_error):
+                    launch()
+            raise last_error
+        finally:
+            for task in attempts:
+                task.cancel()
+            if attempts:
+                await asyncio.gather(*attempts, return_exceptions=True)
+
+
+llm_router = LLMRouter()
@@ -2,6 +2,7 @@
 # This project is licensed under the MIT License (SPDX-License-identifier: MIT).
 
 from enum import Enum
+from functools import lru_cache
 from typing import Union, Optional
 
 from pydantic import BaseModel, Field
@@ -9,103 +10,6 @@ from pydantic import BaseModel, Field
 from pixelle.logger import logger
 from pixelle.settings import settings
 
-# default model
-CHAINLIT_CHAT_DEFAULT_MODEL = settings.chainlit_chat_default_model
-logger.info(f"Default chat model: {CHAINLIT_CHAT_DEFAULT_MODEL}")
-
-
-# OpenAI config
-OPENAI_BASE_URL = settings.openai_base_url
-OPENAI_API_KEY = settings.openai_api_key
-CHAINLIT_CHAT_OPENAI_MODELS = settings.chainlit_chat_openai_models
-openai_models = [model.strip() for model in CHAINLIT_CHAT_OPENAI_MODELS.split(",") if model.strip()]
-if openai_models and not OPENAI_API_KEY:
-    openai_models.clear()
-    logger.warning("No OpenAI API key found, ignore OpenAI models, you can set `OPENAI_API_KEY` in `.env` to enable OpenAI models")
-logger.info(f"OPENAI_BASE_URL: {OPENAI_BASE_URL}")
-logger.info(f"OPENAI_API_KEY: {OPENAI_API_KEY}")
-logger.info(f"Found {len(openai_models)} OpenAI models: {openai_models}")
-
-
-# Ollama config
-OLLAMA_BASE_URL = settings.ollama_base_url
-OLLAMA_MODELS = settings.ollama_models
-OLLAMA_API_KEY = "ollama"
-ollama_models = [model.strip() for model in OLLAMA_MODELS.split(",") if model.strip()]
-if ollama_models and not OLLAMA_BASE_URL:
-    ollama_models.clear()
-    logger.warning("No Ollama base URL found, ignore Ollama models, you can set `OLLAMA_BASE_URL` in `.env` to enable Ollama models")
-logger.info(f"OLLAMA_BASE_URL: {OLLAMA_BASE_URL}")
-logger.info(f"Found {len(ollama_models)} Ollama models: {ollama_models}")
-
-
-# Gemini config
-GEMINI_BASE_URL = settings.gemini_base_url
-GEMINI_API_KEY = settings.gemini_api_key
-GEMINI_MODELS = settings.gemini_models
-gemini_models = [model.strip() for model in GEMINI_MODELS.split(",") if model.strip()]
-if gemini_models and not GEMINI_API_KEY:
-    gemini_models.clear()
-    logger.warning("No Gemini API key found, ignore Gemini models, you can set `GEMINI_API_KEY` in `.env` to enable Gemini models")
-logger.info(f"GEMINI_BASE_URL: {GEMINI_BASE_URL}")
-logger.info(f"GEMINI_API_KEY: {GEMINI_API_KEY}")
-logger.info(f"Found {len(gemini_models)} Gemini models: {gemini_models}")
-
-
-# DeepSeek config
-DEEPSEEK_BASE_URL = settings.deepseek_base_url
-DEEPSEEK_API_KEY = settings.deepseek_api_key
-DEEPSEEK_MODELS = settings.deepseek_models
-deepseek_models = [model.strip() for model in DEEPSEEK_MODELS.split(",") if model.strip()]
-if deepseek_models and not DEEPSEEK_API_KEY:
-    deepseek_models.clear()
-    logger.warning("No DeepSeek API key found, ignore DeepSeek models, you can set `DEEPSEEK_API_KEY` in `.env` to enable DeepSeek models")
-logger.info(f"DEEPSEEK_BASE_URL: {DEEPSEEK_BASE_URL}")
-logger.info(f"DEEPSEEK_API_KEY: {DEEPSEEK_API_KEY}")
-logger.info(f"Found {len(deepseek_models)} DeepSeek models: {deepseek_models}")
-
-
-# Claude config
-CLAUDE_BASE_URL = settings.claude_base_url
-CLAUDE_API_KEY = settings.claude_api_key
-CLAUDE_MODELS = settings.claude_models
-claude_models = [model.strip() for model in CLAUDE_MODELS.split(",") if model.strip()]
-if claude_models and not CLAUDE_API_KEY:
-    claude_models.clear()
-    logger.warning("No Claude API key found, ignore Claude models, you can set `CLAUDE_API_KEY` in `.env` to enable Claude models")
-logger.info(f"CLAUDE_BASE_URL: {CLAUDE_BASE_URL}")
-logger.info(f"CLAUDE_API_KEY: {CLAUDE_API_KEY}")
-logger.info(f"Found {len(claude_models)} Claude models: {claude_models}")
-
-
-# Qwen config
-QWEN_BASE_URL = settings.qwen_base_url
-QWEN_API_KEY = settings.qwen_api_key
-QWEN_MODELS = settings.qwen_models
-qwen_models = [model.strip() for model in QWEN_MODELS.split(",") if model.strip()]
-if qwen_models and not QWEN_API_KEY:
-    qwen_models.clear()
-    logger.warning("No Qwen API key found, ignore Qwen models, you can set `QWEN_API_KEY` in `.env` to enable Qwen models")
-logger.info(f"QWEN_BASE_URL: {QWEN_BASE_URL}")
-logger.info(f"QWEN_API_KEY: {QWEN_API_KEY}")
-logger.info(f"Found {len(qwen_models)} Qwen models: {qwen_models}")
-
-
-# At least one model should be configured
-if not any([
-    openai_models,
-    ollama_models,
-    gemini_models,
-    deepseek_models,
-    claude_models,
-    qwen_models,
-]):
-    raise ValueError(
-        "Configuration Error: No models configured; please set at least one model in `.env` "
-        "(OpenAI, Ollama, Gemini, DeepSeek, Claude, or Qwen)."
-    )
-
-
 
 class ModelType(Enum):
     OPENAI = "openai"
@@ -126,91 +30,113 @@ class ModelInfo(BaseModel):
     provider: Optional[str] = Field(default=None, description="LiteLLM provider")
     model: Optional[str] = Field(default=None, description="Actual model name for LiteLLM")
     
+    # Context window in tokens, looked up in LiteLLM's model registry when not set
+    context_window: Optional[int] = Field(default=None, description="Context window of the model in tokens")
+
+
+# Provider configuration: model type, LiteLLM provider and the settings holding the
+# base URL, API key and model list. Ollama needs no API key but a base URL.
+PROVIDERS = [
+    (ModelType.OPENAI, "openai", "openai_base_url", "openai_api_key", "chainlit_chat_openai_models"),
+    (ModelType.OLLAMA, "openai", "ollama_base_url", None, "ollama_models"),
+    (ModelType.GEMINI, "openai", "gemini_base_url", "gemini_api_key", "gemini_models"),
+    (ModelType.DEEPSEEK, "deepseek", "deepseek_base_url", "deepseek_api_key", "deepseek_models"),
+    (ModelType.CLAUDE, "anthropic", "claude_base_url", "claude_api_key", "claude_models"),
+    (ModelType.QWEN, "openai", "qwen_base_url", "qwen_api_key", "qwen_models"),
+]
+OLLAMA_API_KEY = "ollama"
 
-def get_openai_models() -> list[ModelInfo]:
-    return [
-        ModelInfo(
-            type=ModelType.OPENAI,
-            name=model,
-            base_url=OPENAI_BASE_URL,
-            api_key=OPENAI_API_KEY,
-            provider="openai",
-            model=model
+# Display names of the providers in log messages
+PROVIDER_NAMES = {
+    ModelType.OPENAI: "OpenAI",
+    ModelType.OLLAMA: "Ollama",
+    ModelType.GEMINI: "Gemini",
+    ModelType.DEEPSEEK: "DeepSeek",
+    ModelType.CLAUDE: "Claude",
+    ModelType.QWEN: "Qwen",
+}
+
+
+def _mask_api_key(api_key: str) -> str:
+    if not api_key:
+        return ""
+    return f"***{api_key[-4:]}" if len(api_key) > 8 else "***"
+
+
+@lru_cache(maxsize=None)
+def _load_models() -> dict[ModelType, tuple[ModelInfo, ...]]:
+    """Resolve the configured models of all providers, once on first use
+
+    Raises:
+        ValueError: If no model is configured
+    """
+    logger.info(f"Default chat model: {settings.chainlit_chat_default_model}")
+    models: dict[ModelType, tuple[ModelInfo, ...]] = {}
+    for model_type, provider, base_url_field, api_key_field, models_field in PROVIDERS:
+        name = PROVIDER_NAMES[model_type]
+        base_url = getattr(settings, base_url_field)
+        api_key = getattr(settings, api_key_field) if api_key_field else OLLAMA_API_KEY
+        model_names = [model.strip() for model in getattr(settings, models_field).split(",") if model.strip()]
+        if model_names and not api_key_field and not base_url:
+            model_names.clear()
+            logger.warning(f"No {name} base URL found, ignore {name} models, you can set "
+                           f"`{base_url_field.upper()}` in `.env` to enable {name} models")
+        elif model_names and not api_key:
+            model_names.clear()
+            logger.warning(f"No {name} API key found, ignore {name} models, you can set "
+                           f"`{api_key_field.upper()}` in `.env` to enable {name} models")
+        logger.info(f"{base_url_field.upper()}: {base_url}")
+        if api_key_field:
+            logger.info(f"{api_key_field.upper()}: {_mask_api_key(api_key)}")
+        logger.info(f"Found {len(model_names)} {name} models: {model_names}")
+        models[model_type] = tuple(
+            ModelInfo(
+                type=model_type,
+                name=model,
+                base_url=base_url,
+                api_key=api_key,
+                provider=provider,
+                model=model
+            )
+            for model in model_names
         )
-        for model in openai_models
-    ]
 
-def get_ollama_models() -> list[ModelInfo]:
-    return [
-        ModelInfo(
-            type=ModelType.OLLAMA,
-            name=model,
-            base_url=OLLAMA_BASE_URL,
-            api_key=OLLAMA_API_KEY,
-            provider="openai",
-            model=model
+    # At least one model should be configured
+    if not any(models.values()):
+        raise ValueError(
+            "Configuration Error: No models configured; please set at least one model in `.env` "
+            "(OpenAI, Ollama, Gemini, DeepSeek, Claude, or Qwen)."
         )
-        for model in ollama_models
-    ]
+    return models
+
+
+def get_models(model_type: ModelType) -> list[ModelInfo]:
+    return list(_load_models()[model_type])
+
+def get_openai_models() -> list[ModelInfo]:
+    return get_models(ModelType.OPENAI)
+
+def get_ollama_models() -> list[ModelInfo]:
+    return get_models(ModelType.OLLAMA)
 
 def get_gemini_models() -> list[ModelInfo]:
-    return [
-        ModelInfo(
-            type=ModelType.GEMINI,
-            name=model,
-            base_url=GEMINI_BASE_URL,
-            api_key=GEMINI_API_KEY,
-            provider="openai",
-            model=model
-        )
-        for model in gemini_models
-    ]
+    return get_models(ModelType.GEMINI)
 
 def get_deepseek_models() -> list[ModelInfo]:
-    return [
-        ModelInfo(
-            type=ModelType.DEEPSEEK,
-            name=model,
-            base_url=DEEPSEEK_BASE_URL,
-            api_key=DEEPSEEK_API_KEY,
-            provider="deepseek",
-            model=model
-        )
-        for model in deepseek_models
-    ]
+    return get_models(ModelType.DEEPSEEK)
 
 def get_claude_models() -> list[ModelInfo]:
-    return [
-        ModelInfo(
-            type=ModelType.CLAUDE,
-            name=model,
-            base_url=CLAUDE_BASE_URL,
-            api_key=CLAUDE_API_KEY,
-            provider="anthropic",
-            model=model
-        )
-        for model in claude_models
-    ]
+    return get_models(ModelType.CLAUDE)
 
 def get_qwen_models() -> list[ModelInfo]:
-    return [
-        ModelInfo(
-            type=ModelType.QWEN,
-            name=model,
-            base_url=QWEN_BASE_URL,
-            api_key=QWEN_API_KEY,
-            provider="openai",
-            model=model
-        )
-        for model in qwen_models
-    ]
+    return get_models(ModelType.QWEN)
 
 def get_all_models() -> list[ModelInfo]:
-    return get_openai_models() + get_ollama_models() + get_gemini_models() + get_deepseek_models() + get_claude_models() + get_qwen_models()
+    return [model_info for models in _load_models().values() for model_info in models]
 
 def get_default_model() -> Union[ModelInfo, None]:
     for model_info in get_all_models():
-        if model_info.name == CHAINLIT_CHAT_DEFAULT_MODEL:
+        if model_info.name == settings.chainlit_chat_default_model:
             return model_info
     return None
 